@@ -0,0 +1,157 @@
+# compile_bench.py
+"""
+Benchmark przepustowości kompilatora na syntetycznych programach (Benchmarks/corpus.py).
+
+Dla każdego rozmiaru generuje program, kompiluje go `--repeat` razy przez
+Main/main.py --time-report-file (osobny proces = świeży peak RSS) i zapisuje
+medianę czasu, linie/s i szczytową pamięć dla faz lex, parse, codegen i emit.
+Wynik to JSON, który można porównać z wynikiem z innego commita:
+
+    python Benchmarks/compile_bench.py --sizes 1,5,20 -o Output/bench/compile.json
+    python Benchmarks/compile_bench.py --sizes 1,5,20 --compare Output/bench/compile.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import scaled_program
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(ROOT_DIR, "Main", "main.py")
+PHASES = ("read", "lex", "parse", "codegen", "emit")
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def compile_once(source_path, work_dir):
+    """Jedna kompilacja w osobnym procesie; zwraca raport PhaseTimer albo opis błędu."""
+    report_path = os.path.join(work_dir, "time_report.json")
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    proc = subprocess.run(
+        [sys.executable, MAIN_SCRIPT, source_path, os.path.join(work_dir, "program.ll"),
+         "--time-report-file", report_path, "--no-parse-cache"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    report = None
+    if os.path.exists(report_path):
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {proc.returncode}"
+    return report, None
+
+def bench_size(scale, args, work_dir):
+    source_path = os.path.join(work_dir, f"synthetic_{scale}.jd")
+    text = scaled_program(scale, args.expr_depth, args.array_size, args.seed)
+    with open(source_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    lines = text.count("\n")
+    result = {"scale": scale, "lines": lines, "bytes": len(text.encode("utf-8")), "ok": True}
+
+    runs = []
+    for _ in range(args.repeat):
+        report, error = compile_once(source_path, work_dir)
+        if error is not None:
+            result.update(ok=False, error=error)
+            return result
+        runs.append(report)
+
+    phases = {}
+    for name in PHASES:
+        samples = [sum(p["seconds"] for p in r["phases"] if p["phase"] == name) for r in runs]
+        rss = [p["peak_rss"] for r in runs for p in r["phases"] if p["phase"] == name and p["peak_rss"]]
+        seconds = statistics.median(samples)
+        phases[name] = {
+            "seconds": seconds,
+            "lines_per_sec": lines / seconds if seconds > 0 else None,
+            "peak_rss": max(rss) if rss else None,
+        }
+    result["phases"] = phases
+    result["total_seconds"] = statistics.median(r["total_seconds"] for r in runs)
+    result["peak_rss"] = max((r["peak_rss"] or 0) for r in runs) or None
+    return result
+
+def print_results(results):
+    print(f"{'skala':>6}{'linie':>9}  " + "".join(f"{p + ' [l/s]':>16}" for p in PHASES[1:4])
+          + f"{'razem [s]':>11}{'RSS [MB]':>10}")
+    for r in results:
+        if not r["ok"]:
+            print(f"{r['scale']:>6}{r['lines']:>9}  BŁĄD: {r['error']}")
+            continue
+        rates = "".join(f"{r['phases'][p]['lines_per_sec'] or 0:16.0f}" for p in PHASES[1:4])
+        rss = r["peak_rss"] / (1024 * 1024) if r["peak_rss"] else 0
+        print(f"{r['scale']:>6}{r['lines']:>9}  {rates}{r['total_seconds']:11.2f}{rss:10.1f}")
+
+def print_comparison(results, baseline):
+    """Stosunek czasu nowy/stary dla każdej fazy (< 1.0 = szybciej)."""
+    old = {r["scale"]: r for r in baseline["results"]}
+    print(f"[bench] Porównanie z {baseline.get('commit') or '?'} (czas nowy / stary):")
+    for r in results:
+        prev = old.get(r["scale"])
+        if prev is None or not (r["ok"] and prev["ok"]):
+            continue
+        ratios = []
+        for name in PHASES[1:]:
+            before, after = prev["phases"][name]["seconds"], r["phases"][name]["seconds"]
+            ratios.append(f"{name} {after / before:5.2f}x" if before > 0 else f"{name}   -  ")
+        print(f"  skala {r['scale']:>4}: " + "  ".join(ratios))
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MyLang compile-throughput benchmark")
+    arg_parser.add_argument("--sizes", default="1,5,20",
+                            help="lista skal programu (scale=1 → ~150 linii)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="powtórzenia na rozmiar (mediana)")
+    arg_parser.add_argument("--expr-depth", type=int, default=8)
+    arg_parser.add_argument("--array-size", type=int, default=64)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("-o", "--output", default=os.path.join("Output", "bench", "compile_bench.json"))
+    arg_parser.add_argument("--compare", metavar="JSON", help="wcześniejszy wynik do porównania")
+    args = arg_parser.parse_args()
+
+    work_dir = os.path.join("Output", "bench")
+    os.makedirs(work_dir, exist_ok=True)
+    baseline = None
+    if args.compare:
+        # wczytaj przed zapisem – --compare i -o mogą wskazywać ten sam plik
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = []
+    for scale in (int(s) for s in args.sizes.split(",")):
+        print(f"[bench] skala {scale} ...", flush=True)
+        results.append(bench_size(scale, args, work_dir))
+
+    data = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"expr_depth": args.expr_depth, "array_size": args.array_size,
+                   "seed": args.seed, "repeat": args.repeat},
+        "results": results,
+    }
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    print_results(results)
+    if baseline is not None:
+        print_comparison(results, baseline)
+    print(f"[bench] Wyniki zapisane w: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
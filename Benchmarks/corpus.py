@@ -0,0 +1,131 @@
+# corpus.py
+"""
+Generator syntetycznych programów MyLang o zadanym rozmiarze – wejście dla
+Benchmarks/compile_bench.py.
+
+    python Benchmarks/corpus.py --scale 10 -o Output/bench/synthetic_10.jd
+"""
+import argparse
+import os
+import random
+
+def nested_expr(rng, depth, names):
+    """Wyrażenie całkowitoliczbowe zagnieżdżone na `depth` poziomów nawiasów."""
+    expr = rng.choice(names)
+    for _ in range(depth):
+        op = rng.choice(("+", "-", "*"))
+        leaf = rng.choice(names + [str(rng.randint(1, 9))])
+        expr = f"({expr} {op} {leaf})" if rng.random() < 0.5 else f"({leaf} {op} {expr})"
+    return expr
+
+def function_unit(rng, i, expr_depth):
+    body = nested_expr(rng, expr_depth, ["a", "b"])
+    return (
+        f"func f_{i}(int a, int b) {{\n"
+        f"    int r_{i} = {body};\n"
+        f"    if (r_{i} > 100) {{\n"
+        f"        r_{i} = r_{i} - 100;\n"
+        f"    }}\n"
+        f"    return r_{i};\n"
+        f"}}\n"
+        f"int v_{i} = f_{i}({rng.randint(0, 9)}, {rng.randint(0, 9)});\n"
+        f"print(v_{i});\n"
+    )
+
+def array_unit(rng, i, size):
+    values = ", ".join(str(rng.randint(-99, 99)) for _ in range(size))
+    return (
+        f"int[{size}] arr_{i} = {{{values}}};\n"
+        f"int sum_{i} = 0;\n"
+        f"for (int k_{i} = 0; k_{i} < {size}; k_{i} = k_{i} + 1) {{\n"
+        f"    sum_{i} = sum_{i} + arr_{i}[k_{i}];\n"
+        f"}}\n"
+        f"print(sum_{i});\n"
+    )
+
+def class_unit(rng, i, expr_depth):
+    body = nested_expr(rng, max(1, expr_depth // 2), ["self.x", "self.y", "n"])
+    return (
+        f"class C_{i} {{\n"
+        f"    int x;\n"
+        f"    int y;\n"
+        f"    constructor(int ax, int ay) {{\n"
+        f"        self.x = ax;\n"
+        f"        self.y = ay;\n"
+        f"    }}\n"
+        f"    func step(int n) {{\n"
+        f"        int s_{i} = {body};\n"
+        f"        self.y = s_{i};\n"
+        f"        return s_{i};\n"
+        f"    }}\n"
+        f"}}\n"
+        f"C_{i} o_{i} = new C_{i}({rng.randint(0, 9)}, {rng.randint(0, 9)});\n"
+        f"print(o_{i}.step({rng.randint(1, 5)}));\n"
+    )
+
+def generator_unit(rng, i):
+    return (
+        f"generator g_{i}(int start, int stop) {{\n"
+        f"    for (int j_{i} = start; j_{i} <= stop; j_{i} = j_{i} + 1) {{\n"
+        f"        yield j_{i} * {rng.randint(2, 5)};\n"
+        f"    }}\n"
+        f"}}\n"
+        f"generator<int> gen_{i} = g_{i}(1, {rng.randint(2, 6)});\n"
+        f"while (gen_{i}.next()) {{\n"
+        f"    print(gen_{i}.current);\n"
+        f"}}\n"
+    )
+
+def generate_program(functions=100, arrays=20, array_size=64, classes=20, generators=20,
+                     expr_depth=8, seed=0):
+    """Zwraca tekst programu; jednostki różnych rodzajów są przeplatane w losowej kolejności."""
+    rng = random.Random(seed)
+    units = ([("func", i) for i in range(functions)] + [("array", i) for i in range(arrays)]
+             + [("class", i) for i in range(classes)] + [("gen", i) for i in range(generators)])
+    rng.shuffle(units)
+    parts = [f"// synthetic MyLang program (seed={seed})\n"]
+    for kind, i in units:
+        if kind == "func":
+            parts.append(function_unit(rng, i, expr_depth))
+        elif kind == "array":
+            parts.append(array_unit(rng, i, array_size))
+        elif kind == "class":
+            parts.append(class_unit(rng, i, expr_depth))
+        else:
+            parts.append(generator_unit(rng, i))
+    return "".join(parts)
+
+def scaled_program(scale, expr_depth=8, array_size=64, seed=0):
+    """Program o rozmiarze proporcjonalnym do `scale` (scale=1 → ~10 funkcji)."""
+    return generate_program(functions=10 * scale, arrays=2 * scale, array_size=array_size,
+                            classes=2 * scale, generators=2 * scale, expr_depth=expr_depth, seed=seed)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Synthetic MyLang corpus generator")
+    arg_parser.add_argument("-o", "--output", required=True)
+    arg_parser.add_argument("--scale", type=int, default=None,
+                            help="rozmiar względny (nadpisuje liczności poniżej)")
+    arg_parser.add_argument("--functions", type=int, default=100)
+    arg_parser.add_argument("--arrays", type=int, default=20)
+    arg_parser.add_argument("--array-size", type=int, default=64)
+    arg_parser.add_argument("--classes", type=int, default=20)
+    arg_parser.add_argument("--generators", type=int, default=20)
+    arg_parser.add_argument("--expr-depth", type=int, default=8)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    if args.scale is not None:
+        text = scaled_program(args.scale, args.expr_depth, args.array_size, args.seed)
+    else:
+        text = generate_program(args.functions, args.arrays, args.array_size, args.classes,
+                                args.generators, args.expr_depth, args.seed)
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"[gen] {args.output}: {text.count(chr(10))} linii, {len(text)} bajtów")
+
+
+if __name__ == "__main__":
+    main()
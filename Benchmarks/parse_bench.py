@@ -0,0 +1,129 @@
+# parse_bench.py
+"""
+Benchmark parsowania: dwuetapowe SLL → LL (domyślne w main.py) kontra pełne LL.
+
+Każdy pomiar to osobny proces (ANTLR trzyma cache DFA w klasie parsera, więc
+kolejne parsowanie w tym samym procesie byłoby nieuczciwie szybsze). Mierzone
+jest tylko lexowanie i parsowanie – bez generowania IR:
+
+    python Benchmarks/parse_bench.py --sizes 5,20,50 -o Output/bench/parse.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import scaled_program
+from compile_bench import git_commit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("ll", "two-stage")
+
+def parse_worker(mode, source_path):
+    """Uruchamiane w procesie potomnym: wypisuje JSON z fazami PhaseTimer."""
+    sys.path.insert(0, os.path.join(ROOT_DIR, "Main"))
+    from antlr4 import FileStream
+    from main import parse
+    from PhaseTimer import PhaseTimer
+
+    timer = PhaseTimer()
+    tree, _parser, errors = parse(FileStream(source_path, encoding="utf-8"), timer, mode)
+    phases = {}
+    for p in timer.phases:
+        phases[p["phase"]] = phases.get(p["phase"], 0.0) + p["seconds"]
+    print(json.dumps({"phases": phases, "ok": tree is not None and not errors}))
+
+def parse_once(mode, source_path):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", mode, source_path],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return None, lines[-1] if lines else f"exit code {proc.returncode}"
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+def bench_size(scale, args, work_dir):
+    source_path = os.path.join(work_dir, f"synthetic_{scale}.jd")
+    text = scaled_program(scale, args.expr_depth, args.array_size, args.seed)
+    with open(source_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    result = {"scale": scale, "lines": text.count("\n"), "ok": True, "modes": {}}
+
+    for mode in MODES:
+        runs = []
+        for _ in range(args.repeat):
+            report, error = parse_once(mode, source_path)
+            if error is None and not report["ok"]:
+                error = "błąd składni"
+            if error is not None:
+                result.update(ok=False, error=f"{mode}: {error}")
+                return result
+            runs.append(report["phases"])
+        result["modes"][mode] = {
+            "lex": statistics.median(r.get("lex", 0.0) for r in runs),
+            "parse": statistics.median(r.get("parse", 0.0) + r.get("parse (LL)", 0.0) for r in runs),
+            # ile powtórzeń potrzebowało drugiego etapu (dla poprawnych programów powinno być 0)
+            "ll_fallbacks": sum(1 for r in runs if "parse (LL)" in r),
+        }
+    return result
+
+def print_results(results):
+    print(f"{'skala':>6}{'linie':>9}{'lex [s]':>10}{'LL [s]':>10}{'SLL→LL [s]':>12}"
+          f"{'przysp.':>9}{'fallback':>10}")
+    for r in results:
+        if not r["ok"]:
+            print(f"{r['scale']:>6}{r['lines']:>9}  BŁĄD: {r['error']}")
+            continue
+        ll, two = r["modes"]["ll"], r["modes"]["two-stage"]
+        speedup = ll["parse"] / two["parse"] if two["parse"] > 0 else 0
+        print(f"{r['scale']:>6}{r['lines']:>9}{two['lex']:10.2f}{ll['parse']:10.2f}{two['parse']:12.2f}"
+              f"{speedup:8.2f}x{two['ll_fallbacks']:>10}")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MyLang parse benchmark (SLL/LL)")
+    arg_parser.add_argument("--sizes", default="5,20,50",
+                            help="lista skal programu (scale=1 → ~150 linii)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="powtórzenia na tryb (mediana)")
+    arg_parser.add_argument("--expr-depth", type=int, default=8)
+    arg_parser.add_argument("--array-size", type=int, default=64)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("-o", "--output", default=os.path.join("Output", "bench", "parse_bench.json"))
+    arg_parser.add_argument("--worker", nargs=2, metavar=("MODE", "SOURCE"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.worker:
+        parse_worker(*args.worker)
+        return
+
+    work_dir = os.path.join("Output", "bench")
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for scale in (int(s) for s in args.sizes.split(",")):
+        print(f"[bench] skala {scale} ...", flush=True)
+        results.append(bench_size(scale, args, work_dir))
+
+    data = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"expr_depth": args.expr_depth, "array_size": args.array_size,
+                   "seed": args.seed, "repeat": args.repeat},
+        "results": results,
+    }
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    print_results(results)
+    print(f"[bench] Wyniki zapisane w: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# runtime_bench.py
+"""
+Benchmark czasu wykonania programów z Benchmarks/programs/ na różnych poziomach optymalizacji.
+
+Każdy program jest kompilowany raz do LLVM IR (Main/main.py), potem clangiem
+(opcjonalnie po potoku `opt --passes`) na każdym poziomie z --levels. Plik
+wykonywalny jest uruchamiany --repeat razy (po jednym przebiegu rozgrzewkowym),
+wyjście porównywane z <program>.expected, a raport podaje medianę i wariancję.
+
+    python Benchmarks/runtime_bench.py --levels 0,2,3 --repeat 7
+    python Benchmarks/runtime_bench.py --compare Output/bench/runtime_bench.json
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS_DIR = os.path.join(ROOT_DIR, "Benchmarks", "programs")
+MAIN_SCRIPT = os.path.join(ROOT_DIR, "Main", "main.py")
+sys.path.insert(0, ROOT_DIR)
+from builder import OPT_LEVELS, run_native_commands
+from compile_bench import git_commit
+
+def normalize(output):
+    return output.replace("\r\n", "\n").strip()
+
+def compile_ir(source_path, ll_file):
+    proc = subprocess.run([sys.executable, MAIN_SCRIPT, source_path, ll_file],
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    if proc.returncode != 0:
+        lines = proc.stdout.strip().splitlines()
+        return lines[-1] if lines else f"exit code {proc.returncode}"
+    return None
+
+def build_exe(ll_file, exe_file, level, passes):
+    """opt (opcjonalnie) + clang – te same polecenia co builder.py; zwraca opis błędu albo None."""
+    stage, message = run_native_commands(ll_file, exe_file, level, passes)
+    if message is None:
+        return None
+    return f"{stage}: {message}" if message else f"{stage} failed"
+
+def time_runs(exe_file, repeat, expected):
+    """Przebieg rozgrzewkowy + `repeat` pomiarów; zwraca (czasy, błąd)."""
+    times = []
+    for i in range(repeat + 1):
+        start = time.perf_counter()
+        proc = subprocess.run([exe_file], capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            return times, f"exit code {proc.returncode}"
+        if expected is not None and normalize(proc.stdout) != expected:
+            return times, "wrong output"
+        if i > 0:
+            times.append(elapsed)
+    return times, None
+
+def bench_program(source_path, levels, args, work_dir):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    expected_path = os.path.splitext(source_path)[0] + ".expected"
+    expected = None
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding="utf-8") as f:
+            expected = normalize(f.read())
+
+    ll_file = os.path.join(work_dir, f"{name}.ll")
+    error = compile_ir(source_path, ll_file)
+    if error is not None:
+        return [{"program": name, "level": level, "ok": False, "error": f"main.py: {error}"}
+                for level in levels]
+
+    results = []
+    for level in levels:
+        result = {"program": name, "level": level, "ok": False}
+        exe_file = os.path.join(work_dir, f"{name}_O{level}.exe")
+        error = build_exe(ll_file, exe_file, level, args.passes)
+        if error is None:
+            times, error = time_runs(exe_file, args.repeat, expected)
+        if error is not None:
+            result["error"] = error
+        else:
+            result.update(
+                ok=True,
+                times=times,
+                median=statistics.median(times),
+                variance=statistics.variance(times) if len(times) > 1 else 0.0,
+                stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+            )
+        results.append(result)
+    return results
+
+def print_results(results):
+    print(f"{'program':<24}{'-O':>4}{'mediana [ms]':>15}{'odch. std [ms]':>16}{'wariancja [ms²]':>17}")
+    for r in results:
+        if not r["ok"]:
+            print(f"{r['program']:<24}{r['level']:>4}  BŁĄD: {r['error']}")
+            continue
+        print(f"{r['program']:<24}{r['level']:>4}{r['median'] * 1e3:15.2f}{r['stdev'] * 1e3:16.2f}"
+              f"{r['variance'] * 1e6:17.3f}")
+
+def print_comparison(results, baseline):
+    """Stosunek median nowy/stary dla tych samych (program, poziom); < 1.0 = szybciej."""
+    old = {(r["program"], r["level"]): r for r in baseline["results"] if r["ok"]}
+    print(f"[bench] Porównanie z {baseline.get('commit') or '?'} (mediana nowa / stara):")
+    for r in results:
+        prev = old.get((r["program"], r["level"]))
+        if prev is not None and r["ok"] and prev["median"] > 0:
+            print(f"  {r['program']:<24} -O{r['level']}: {r['median'] / prev['median']:5.2f}x")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MyLang runtime benchmark")
+    arg_parser.add_argument("programs", nargs="*",
+                            help="pliki .jd (domyślnie wszystkie z Benchmarks/programs)")
+    arg_parser.add_argument("--levels", default="0,1,2,3",
+                            help=f"poziomy clanga, po przecinku (z {','.join(OPT_LEVELS)})")
+    arg_parser.add_argument("--passes", metavar="PIPELINE", help="potok opt uruchamiany przed clangiem")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="liczba mierzonych uruchomień")
+    arg_parser.add_argument("-o", "--output", default=os.path.join("Output", "bench", "runtime_bench.json"))
+    arg_parser.add_argument("--compare", metavar="JSON", help="wcześniejszy wynik do porównania")
+    args = arg_parser.parse_args()
+
+    levels = args.levels.split(",")
+    for level in levels:
+        if level not in OPT_LEVELS:
+            arg_parser.error(f"nieznany poziom optymalizacji: {level}")
+    programs = args.programs or sorted(glob.glob(os.path.join(PROGRAMS_DIR, "*.jd")))
+
+    work_dir = os.path.join("Output", "bench", "runtime")
+    os.makedirs(work_dir, exist_ok=True)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = []
+    for source_path in programs:
+        print(f"[bench] {os.path.basename(source_path)} ...", flush=True)
+        results.extend(bench_program(source_path, levels, args, work_dir))
+
+    data = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "params": {"levels": levels, "passes": args.passes, "repeat": args.repeat},
+        "results": results,
+    }
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+    print_results(results)
+    if baseline is not None:
+        print_comparison(results, baseline)
+    print(f"[bench] Wyniki zapisane w: {args.output}")
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from IRCache import compiler_version
+from ModuleLoader import resolve_import
+
+_IMPORT = re.compile(r'^\s*import\s+"([^"\r\n]*)"\s*;', re.MULTILINE)
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# stats.log powyżej tego rozmiaru jest zwijany do dwóch linii sum
+_STATS_LOG_MAX = 256 * 1024
+
+def grammar_digest():
+    """Skrót gramatyki zapisany przez builder.build_grammar (pusty, jeśli brak)."""
+    try:
+        with open(os.path.join(_ROOT_DIR, "LexerParser", ".grammar_stamp"), encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def source_closure(source_path):
+    """Plik źródłowy + wszystkie (rekurencyjnie) importowane pliki, w kolejności odkrycia."""
+    seen = []
+    pending = [os.path.abspath(source_path)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.append(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            continue
+        base = os.path.dirname(path)
+        for imported in _IMPORT.findall(text):
+            pending.append(resolve_import(imported, base) or os.path.abspath(os.path.join(base, imported)))
+    return seen
+
+
+class ArtifactCache:
+    """
+    Cache artefaktów (program.ll, program.opt.ll, obiekty, program.exe) adresowany treścią.
+
+    Klucz = bajty źródła i importów (ze ścieżkami względem katalogu pliku głównego,
+    więc dwa checkouty tego samego drzewa dzielą wpisy) + skrót gramatyki +
+    wersja kompilatora + flagi.
+    Każdy wpis to katalog <klucz>/ z plikami i meta.json; czas ostatniego użycia
+    (mtime meta.json) steruje usuwaniem najdawniej używanych wpisów po przekroczeniu
+    limitu rozmiaru. Trafienia/chybienia dopisywane są do stats.log, więc równoległe
+    procesy (--batch) nie nadpisują sobie liczników; po przekroczeniu
+    _STATS_LOG_MAX log zwijany jest do sum.
+    """
+
+    def __init__(self, cache_dir=os.path.join("Cache", "artifacts"), max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, source_path, flags=()):
+        h = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(source_path))
+        for path in source_closure(source_path):
+            try:
+                name = os.path.relpath(path, base)
+            except ValueError:              # inny dysk (Windows) – zostaje ścieżka bezwzględna
+                name = path
+            h.update(name.encode("utf-8") if path != os.path.abspath(source_path) else b"<main>")
+            try:
+                with open(path, "rb") as f:
+                    h.update(f.read())
+            except OSError:
+                h.update(b"<missing>")
+        h.update(grammar_digest().encode())
+        h.update(compiler_version().encode())
+        h.update(repr(tuple(flags)).encode())
+        return h.hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _log(self, event, size=0):
+        log_path = os.path.join(self.cache_dir, "stats.log")
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(f"{event} {size}\n")
+        try:
+            if os.path.getsize(log_path) > _STATS_LOG_MAX:
+                self._compact_log(log_path)
+        except OSError:
+            pass
+
+    def _read_log(self, log_path):
+        """Sumy z stats.log; linia to `zdarzenie bajty [liczba]` (liczba tylko w liniach sum)."""
+        hits = misses = saved = 0
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 2:
+                    continue                # ucięta linia z równoległego zapisu
+                count = int(parts[2]) if len(parts) > 2 else 1
+                if parts[0] == "hit":
+                    hits += count
+                    saved += int(parts[1])
+                elif parts[0] == "miss":
+                    misses += count
+        return hits, misses, saved
+
+    def _compact_log(self, log_path):
+        hits, misses, saved = self._read_log(log_path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix="stats.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(f"hit {saved} {hits}\nmiss 0 {misses}\n")
+        os.replace(tmp_path, log_path)
+
+    def lookup(self, key, out_dir):
+        """Przy trafieniu kopiuje artefakty do out_dir i zwraca listę plików, inaczej None."""
+        entry = self._entry_dir(key)
+        meta_path = os.path.join(entry, "meta.json")
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._log("miss")
+            return None
+
+        os.makedirs(out_dir, exist_ok=True)
+        restored = []
+        try:
+            for name in meta["files"]:
+                shutil.copy2(os.path.join(entry, name), os.path.join(out_dir, name))
+                restored.append(os.path.join(out_dir, name))
+            os.utime(meta_path)             # LRU: oznacz jako ostatnio użyty
+        except OSError:
+            # wpis usunięty w trakcie kopiowania (evict w innym procesie)
+            self._log("miss")
+            return None
+        self._log("hit", meta["size"])
+        return restored
+
+    def store(self, key, paths):
+        """Zapisuje istniejące pliki z `paths` jako wpis dla klucza i przycina cache."""
+        entry = self._entry_dir(key)
+        # unikalny katalog – serwer kompiluje w kilku wątkach jednego procesu
+        tmp_entry = tempfile.mkdtemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        files, size = [], 0
+        for path in paths:
+            if os.path.exists(path):
+                name = os.path.basename(path)
+                shutil.copy2(path, os.path.join(tmp_entry, name))
+                files.append(name)
+                size += os.path.getsize(path)
+        with open(os.path.join(tmp_entry, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"files": files, "size": size, "created": time.time()}, f)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            os.replace(tmp_entry, entry)
+        except OSError:
+            # inny proces zapisał ten sam klucz w międzyczasie – treść jest identyczna
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, "meta.json")
+            if name.endswith(".tmp") or not os.path.isfile(meta_path):
+                continue
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    size = json.load(f)["size"]
+                entries.append((os.path.getmtime(meta_path), size, name))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def evict(self):
+        """Usuwa najdawniej używane wpisy, dopóki cache przekracza max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(name), ignore_errors=True)
+            total -= size
+
+    def stats(self):
+        try:
+            hits, misses, saved = self._read_log(os.path.join(self.cache_dir, "stats.log"))
+        except OSError:
+            hits = misses = saved = 0
+        entries = self._entries()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "bytes_saved": saved,
+            "entries": len(entries),
+            "bytes_stored": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+
+_MAIN_DIR = os.path.dirname(os.path.abspath(__file__))
+_COMPILER_SOURCES = ("LLVMActions.py", "LLVMGenerator.py", "IRModel.py", "IRPasses.py", "IRCache.py")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z_0-9]*")
+_KEYWORDS = frozenset((
+    "static", "var", "print", "read", "if", "else", "while", "for", "in", "func", "generator",
+    "struct", "class", "constructor", "new", "return", "yield", "import", "int", "float",
+    "double", "bool", "string", "OR", "AND", "XOR", "NEG", "true", "false", "True", "False",
+))
+
+# pola LLVMActions, które deklaracja może zostawić zmienione dla dalszej części programu
+_ACTION_SCALARS = ("class_name", "current_function", "current_ret_type",
+                   "_yield_counter", "_current_gen_state", "_gen_current_type")
+_ACTION_TABLES = ("functions", "structs", "struct_sizes", "classes", "gen_elem_type")
+
+_compiler_version = None
+
+def compiler_version():
+    """Skrót źródeł kompilatora – zmiana generatora unieważnia wszystkie wpisy."""
+    global _compiler_version
+    if _compiler_version is None:
+        h = hashlib.sha256()
+        for name in _COMPILER_SOURCES:
+            with open(os.path.join(_MAIN_DIR, name), "rb") as f:
+                h.update(f.read())
+        _compiler_version = h.hexdigest()
+    return _compiler_version
+
+
+class IRCache:
+    """
+    Cache IR dla deklaracji najwyższego poziomu (func / generator / struct / class).
+
+    Klucz = tekst deklaracji + sygnatury wszystkiego, do czego się odwołuje
+    (funkcje, struktury, klasy, widoczne zmienne, liczniki nazw) + wersja kompilatora.
+    Wpis przechowuje *efekty* deklaracji: dopisane elementy modułu IR (definicje
+    funkcji, globale, typy), zmiany tablic LLVMActions oraz przyrosty liczników.
+    Liczniki, od których wynik faktycznie zależy (str_counter, temp_var_counter,
+    reg/label przy kodzie dopisanym do main), są zapisywane jako wymagania
+    i sprawdzane przy trafieniu.
+    """
+
+    def __init__(self, cache_dir=os.path.join("Cache", "ir")):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # region Keys
+
+    def _dependencies(self, actions, text):
+        deps = []
+        for name in sorted(set(_IDENTIFIER.findall(text)) - _KEYWORDS):
+            scope = next((s for s in reversed(actions.variables) if name in s), None)
+            deps.append((
+                name,
+                repr(scope[name]) if scope is not None else None,
+                actions.check_if_name_exists(name),
+                *(repr(getattr(actions, table).get(name)) for table in _ACTION_TABLES),
+            ))
+        return repr(deps)
+
+    def _key(self, actions, ctx):
+        start, stop = ctx.start, ctx.stop
+        text = start.getInputStream().getText(start.start, stop.stop)
+        h = hashlib.sha256()
+        h.update(compiler_version().encode())
+        h.update(text.encode("utf-8"))
+        h.update(self._dependencies(actions, text).encode("utf-8"))
+        # dostęp do symboli `static` zależy od modułu, w którym stoi deklaracja
+        h.update(repr(actions.module_stack[-1:]).encode("utf-8"))
+        return h.hexdigest()
+
+    # endregion
+
+    # region Snapshots
+
+    @staticmethod
+    def _counters(actions):
+        return dict(reg=actions.gen.reg, str_counter=actions.gen.str_counter,
+                    label_counter=actions.label_counter, temp_var_counter=actions.temp_var_counter)
+
+    def _snapshot(self, actions):
+        return dict(
+            counters=self._counters(actions),
+            items_len=len(actions.gen.module.items),
+            main_pos=actions.gen.module.main.position(),
+            variables_len=len(actions.variables),
+            top_scope=dict(actions.variables[-1]),
+            history_len=len(actions.scope_history),
+            tables={t: dict(getattr(actions, t)) for t in _ACTION_TABLES},
+        )
+
+    @staticmethod
+    def _pooled_strings(gen, items, main_tail):
+        """
+        Stałe napisów z puli, do których odwołuje się deklaracja – także te dodane
+        wcześniej, bo przy trafieniu pula może ich jeszcze nie mieć.
+        """
+        used = set()
+        for item in items:
+            used.update(item.symbols())
+        instructions, blocks = main_tail
+        for instruction in instructions:
+            used.update(instruction.symbols())
+        for block in blocks:
+            for instruction in block.instructions:
+                used.update(instruction.symbols())
+        return [gen.module.strings[name] for name in sorted(used) if name in gen.module.strings]
+
+    def _effects(self, actions, before):
+        """Różnica stanu po przetworzeniu deklaracji albo None, jeśli nie da się jej odtworzyć."""
+        if len(actions.gen.function_stack) != 1 or len(actions.variables) < before["variables_len"]:
+            return None
+        top_idx = before["variables_len"] - 1
+        top_scope = actions.variables[top_idx]
+        if before["top_scope"].keys() - top_scope.keys():
+            return None
+
+        after = self._counters(actions)
+        start = before["counters"]
+        main_tail = actions.gen.module.main.since(before["main_pos"])
+        items = actions.gen.module.items[before["items_len"]:]
+
+        # od czego zależą nazwy w wygenerowanym tekście
+        requires = {}
+        for counter in ("str_counter", "temp_var_counter"):
+            if after[counter] != start[counter]:
+                requires[counter] = start[counter]
+        if any(main_tail):
+            requires["reg"] = start["reg"]
+            requires["label_counter"] = start["label_counter"]
+
+        return dict(
+            requires=requires,
+            deltas={c: after[c] - start[c] for c in after},
+            items=items,
+            strings=self._pooled_strings(actions.gen, items, main_tail),
+            main=main_tail,
+            scope={k: v for k, v in top_scope.items() if before["top_scope"].get(k) is not v},
+            extra_scopes=actions.variables[before["variables_len"]:],
+            history=actions.scope_history[before["history_len"]:],
+            tables={t: {k: v for k, v in getattr(actions, t).items() if before["tables"][t].get(k) is not v}
+                    for t in _ACTION_TABLES},
+            scalars={a: getattr(actions, a) for a in _ACTION_SCALARS},
+        )
+
+    def _replay(self, actions, effects):
+        actions.gen.add_strings(effects["strings"])
+        actions.gen.module.items.extend(effects["items"])
+        actions.gen.module.main.extend(effects["main"])
+        deltas = effects["deltas"]
+        actions.gen.reg += deltas["reg"]
+        actions.gen.str_counter += deltas["str_counter"]
+        actions.label_counter += deltas["label_counter"]
+        actions.temp_var_counter += deltas["temp_var_counter"]
+
+        actions.variables[-1].update(effects["scope"])
+        actions.variables.extend(effects["extra_scopes"])
+        actions.scope_history.extend(effects["history"])
+        for table, entries in effects["tables"].items():
+            getattr(actions, table).update(entries)
+        for attr, value in effects["scalars"].items():
+            setattr(actions, attr, value)
+
+    # endregion
+
+    def visit(self, actions, ctx):
+        """Odwiedza deklarację najwyższego poziomu, korzystając z cache jeśli to możliwe."""
+        key = self._key(actions, ctx)
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+
+        effects = None
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    effects = pickle.load(f)
+            except Exception:               # uszkodzony / niepełny wpis = chybienie
+                effects = None
+        if effects is not None:
+            current = self._counters(actions)
+            if all(current[c] == v for c, v in effects["requires"].items()):
+                self._replay(actions, effects)
+                self.hits += 1
+                return None
+
+        self.misses += 1
+        before = self._snapshot(actions)
+        actions.visit(ctx)
+        effects = self._effects(actions, before)
+        if effects is not None:
+            # unikalny plik tymczasowy – serwer kompiluje w kilku wątkach jednego procesu
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(effects, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        return None
@@ -0,0 +1,300 @@
+"""
+Model IR w pamięci: Module → Function → BasicBlock → Instruction.
+
+LLVMGenerator buduje ten model zamiast list gotowych linii, a tekst .ll powstaje
+raz, na końcu (write_items / write_lines). Instrukcje sterujące (br, switch, phi)
+trzymają etykiety jako pola, więc można je uzupełniać i przepisywać bez
+cięcia napisów; pozostałe instrukcje to opkod + sformatowane argumenty.
+Klasy używają __slots__ – instrukcji są dziesiątki tysięcy na duży program.
+"""
+import math
+import re
+import struct
+
+TERMINATORS = frozenset(("ret", "br", "switch", "resume", "unreachable"))
+_SYMBOL = re.compile(r"[@%][\w.$]+")
+
+
+# region Constants
+
+class FloatConstant(float):
+    """
+    Stała float/double w tekście IR. LLVM przyjmuje tylko dokładne wartości:
+    repr() (najkrótszy dokładny zapis) gdy ma kropkę, inaczej bity double szesnastkowo.
+    Dla typu float wartość musi być już zaokrąglona do pojedynczej precyzji.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        text = repr(float(self))
+        if math.isfinite(self) and "." in text:
+            return text
+        return "0x%016X" % struct.unpack("<Q", struct.pack("<d", self))[0]
+
+    def __format__(self, spec):
+        return str(self) if not spec else float.__format__(self, spec)
+
+# endregion
+
+# region Instructions
+
+class Instruction:
+    """`result = opcode args`; result to numer rejestru (int), nazwa '%x' albo None."""
+    __slots__ = ("result", "opcode", "args")
+
+    def __init__(self, opcode, args="", result=None):
+        self.result = result
+        self.opcode = opcode
+        self.args = args
+
+    @property
+    def name(self):
+        result = self.result
+        return f"%{result}" if isinstance(result, int) else result
+
+    @property
+    def is_terminator(self):
+        return self.opcode in TERMINATORS
+
+    def successors(self):
+        return ()
+
+    def operands_text(self):
+        return f"{self.opcode} {self.args}" if self.args else self.opcode
+
+    def text(self):
+        if self.result is None:
+            return self.operands_text()
+        return f"{self.name} = {self.operands_text()}"
+
+    def symbols(self):
+        """Nazwy @globali i %wartości/etykiet użyte jako argumenty."""
+        return _SYMBOL.findall(self.operands_text())
+
+    def __repr__(self):
+        return f"<{self.text()}>"
+
+
+class Branch(Instruction):
+    """`br label %a` albo `br i1 cond, label %a, label %b`."""
+    __slots__ = ("cond", "targets")
+
+    def __init__(self, *targets, cond=None):
+        super().__init__("br")
+        self.cond = cond
+        self.targets = list(targets)
+
+    def successors(self):
+        return self.targets
+
+    def operands_text(self):
+        if self.cond is None:
+            return f"br label %{self.targets[0]}"
+        return f"br i1 {self.cond}, label %{self.targets[0]}, label %{self.targets[1]}"
+
+
+class Switch(Instruction):
+    """`switch TYPE value, label %default [ TYPE v, label %l ... ]` – przypadki można dopisywać."""
+    __slots__ = ("type", "value", "default", "cases")
+
+    def __init__(self, value_type, value, default, cases=()):
+        super().__init__("switch")
+        self.type = value_type
+        self.value = value
+        self.default = default
+        self.cases = list(cases)           # [(stała, etykieta)]
+
+    def successors(self):
+        return [self.default] + [label for _, label in self.cases]
+
+    def operands_text(self):
+        cases = " ".join(f"{self.type} {v}, label %{label}" for v, label in self.cases)
+        return f"switch {self.type} {self.value}, label %{self.default} [ {cases} ]"
+
+
+class Phi(Instruction):
+    """`%r = phi TYPE [ v, %blok ], ...`."""
+    __slots__ = ("type", "incoming")
+
+    def __init__(self, result, value_type, incoming):
+        super().__init__("phi", result=result)
+        self.type = value_type
+        self.incoming = list(incoming)     # [(wartość, etykieta)]
+
+    def operands_text(self):
+        incoming = ", ".join(f"[ {v}, %{label} ]" for v, label in self.incoming)
+        return f"phi {self.type} {incoming}"
+
+# endregion
+
+# region Blocks and functions
+
+class BasicBlock:
+    """Etykieta (None dla bloku wejściowego) i lista instrukcji."""
+    __slots__ = ("label", "instructions")
+
+    def __init__(self, label=None, instructions=None):
+        self.label = label
+        self.instructions = [] if instructions is None else instructions
+
+    @property
+    def terminator(self):
+        if self.instructions and self.instructions[-1].is_terminator:
+            return self.instructions[-1]
+        return None
+
+    def lines(self):
+        if self.label is not None:
+            yield f"{self.label}:"
+        for instruction in self.instructions:
+            yield instruction.text()
+
+
+class Function:
+    """Definicja funkcji; instrukcje trafiają zawsze do ostatniego bloku."""
+    __slots__ = ("name", "ret_type", "params", "linkage", "blocks", "allocas")
+
+    def __init__(self, name=None, ret_type="void", params="", linkage=""):
+        self.name = name
+        self.ret_type = ret_type
+        self.params = params
+        self.linkage = linkage
+        self.blocks = [BasicBlock()]
+        self.allocas = 0                # ile alloca stoi na początku bloku wejściowego
+
+    def append(self, instruction):
+        self.blocks[-1].instructions.append(instruction)
+
+    def add_alloca(self, instruction):
+        """Alloca zawsze na początek bloku wejściowego – tylko takie mem2reg zamienia na rejestry."""
+        self.blocks[0].instructions.insert(self.allocas, instruction)
+        self.allocas += 1
+
+    def start_block(self, label):
+        self.blocks.append(BasicBlock(label))
+
+    @property
+    def last_instruction(self):
+        instructions = self.blocks[-1].instructions
+        return instructions[-1] if instructions else None
+
+    def signature(self):
+        linkage = f"{self.linkage} " if self.linkage else ""
+        return f"define {linkage}{self.ret_type} @{self.name}({self.params}) {{"
+
+    def declaration(self):
+        return f"declare {self.ret_type} @{self.name}({self.params})"
+
+    def lines(self):
+        for block in self.blocks:
+            yield from block.lines()
+
+    def symbols(self):
+        yield from _SYMBOL.findall(f"{self.ret_type} {self.params}")
+        for block in self.blocks:
+            for instruction in block.instructions:
+                yield from instruction.symbols()
+
+    # pozycja w ciele i wszystko, co dopisano za nią (IRCache odtwarza kod main)
+    def position(self):
+        return len(self.blocks) - 1, len(self.blocks[-1].instructions)
+
+    def since(self, position):
+        block_idx, instr_idx = position
+        return self.blocks[block_idx].instructions[instr_idx:], self.blocks[block_idx + 1:]
+
+    def extend(self, tail):
+        instructions, blocks = tail
+        self.blocks[-1].instructions.extend(instructions)
+        self.blocks.extend(blocks)
+
+    def is_empty(self):
+        return len(self.blocks) == 1 and not self.blocks[0].instructions
+
+# endregion
+
+# region Module items
+
+class Global:
+    """`@nazwa = [linkage] global|constant TYPE init`."""
+    __slots__ = ("name", "type", "init", "kind", "linkage")
+
+    def __init__(self, name, value_type, init, kind="global", linkage=""):
+        self.name = name
+        self.type = value_type
+        self.init = init
+        self.kind = kind
+        self.linkage = linkage
+
+    def text(self):
+        linkage = f"{self.linkage} " if self.linkage else ""
+        return f"{self.name} = {linkage}{self.kind} {self.type} {self.init}"
+
+    def symbols(self):
+        return _SYMBOL.findall(f"{self.type} {self.init}")
+
+
+class TypeDef:
+    """`%nazwa = type { ... }`."""
+    __slots__ = ("name", "body")
+
+    def __init__(self, name, body):
+        self.name = name
+        self.body = body
+
+    def text(self):
+        return f"{self.name} = type {self.body}"
+
+    def symbols(self):
+        return _SYMBOL.findall(self.body)
+
+
+class Module:
+    """
+    Elementy modułu w kolejności emisji (Global / TypeDef / Function), kod najwyższego
+    poziomu i pula literałów napisów (nazwa → Global). Pula jest poza `items` i zapisywana
+    posortowana po nazwie – kolejność nie zależy od tego, co odtworzył IRCache.
+    """
+    __slots__ = ("items", "main", "strings")
+
+    def __init__(self):
+        self.items = []
+        self.main = Function("main", "i32")
+        self.strings = {}
+
+    def pooled_strings(self):
+        return [self.strings[name] for name in sorted(self.strings)]
+
+    def functions(self):
+        return [item for item in self.items if isinstance(item, Function)]
+
+    def globals(self):
+        return [item for item in self.items if isinstance(item, Global)]
+
+# endregion
+
+# region Text output
+
+def write_lines(out, lines, indent="", chunk_size=512):
+    for i in range(0, len(lines), chunk_size):
+        chunk = lines[i:i + chunk_size]
+        out.write(indent + f"\n{indent}".join(chunk) + "\n")
+
+def write_items(out, items, chunk_size=512):
+    """Zapisuje globale, typy i funkcje (ciała z wcięciem) porcjami po chunk_size linii."""
+    lines = []
+    for item in items:
+        if isinstance(item, Function):
+            lines.append(item.signature())
+            write_lines(out, lines, chunk_size=chunk_size)
+            lines = []
+            write_lines(out, list(item.lines()), "  ", chunk_size)
+            lines.append("}")
+        else:
+            lines.append(item.text())
+            if len(lines) >= chunk_size:
+                write_lines(out, lines, chunk_size=chunk_size)
+                lines = []
+    write_lines(out, lines, chunk_size=chunk_size)
+
+# endregion
@@ -0,0 +1,144 @@
+"""
+Przebiegi porządkujące model IR (IRModel) przed zapisem tekstu.
+
+LLVMGenerator.exit_function uruchamia simplify_function dla każdej zakończonej
+funkcji: kod za terminatorem (np. `br` po `return` w gałęzi if), bloki, do
+których nic nie skacze, oraz bloki zawierające tylko `br label %x` znikają.
+Kod najwyższego poziomu (main) nie jest przepisywany – IRCache odtwarza go
+według pozycji w blokach.
+
+live_items działa na całym module przy zapisie: zostawia tylko funkcje
+i globale osiągalne po odwołaniach @symbol z kodu main (i z symboli
+eksportowanych, gdy moduł kompilowany jest osobno).
+"""
+from IRModel import Branch, Function, Global, Phi, Switch
+
+
+def _successors(function, index):
+    block = function.blocks[index]
+    terminator = block.terminator
+    if terminator is not None:
+        return terminator.successors()
+    # blok bez terminatora (tylko ostatni w main) – zachowawczo „spada” do następnego
+    if index + 1 < len(function.blocks):
+        return [function.blocks[index + 1].label]
+    return []
+
+def _retarget(terminator, old, new):
+    if isinstance(terminator, Branch):
+        terminator.targets = [new if label == old else label for label in terminator.targets]
+    elif isinstance(terminator, Switch):
+        if terminator.default == old:
+            terminator.default = new
+        terminator.cases = [(value, new if label == old else label) for value, label in terminator.cases]
+
+def _phis(block):
+    for instruction in block.instructions:
+        if not isinstance(instruction, Phi):
+            break
+        yield instruction
+
+# region Passes
+
+def truncate_after_terminators(function):
+    """Usuwa instrukcje za pierwszym terminatorem w każdym bloku."""
+    for block in function.blocks:
+        for i, instruction in enumerate(block.instructions):
+            if instruction.is_terminator:
+                del block.instructions[i + 1:]
+                break
+
+def remove_unreachable_blocks(function):
+    """Zostawia bloki osiągalne z bloku wejściowego; phi tracą wejścia z usuniętych bloków."""
+    index_of = {block.label: i for i, block in enumerate(function.blocks)}
+    reachable = {0}
+    pending = [0]
+    while pending:
+        for label in _successors(function, pending.pop()):
+            i = index_of.get(label)
+            if i is not None and i not in reachable:
+                reachable.add(i)
+                pending.append(i)
+
+    if len(reachable) == len(function.blocks):
+        return
+    function.blocks = [block for i, block in enumerate(function.blocks) if i in reachable]
+    alive = {block.label for block in function.blocks}
+    for block in function.blocks:
+        for phi in _phis(block):
+            phi.incoming = [(value, label) for value, label in phi.incoming if label in alive]
+
+def collapse_jump_blocks(function):
+    """
+    Blok `X: br label %Y` zastępuje przekierowaniem poprzedników X prosto do Y.
+    Jeśli Y zaczyna się od phi z wejściem z X, wejście przechodzi na poprzedników X –
+    chyba że któryś z nich już jest poprzednikiem Y (phi miałoby dwa wejścia z jednego bloku)
+    albo jest nienazwanym blokiem wejściowym.
+    """
+    blocks = {block.label: block for block in function.blocks[1:]}
+    preds = {label: [] for label in blocks}
+    for i, block in enumerate(function.blocks):
+        for label in _successors(function, i):
+            if label in preds:
+                preds[label].append(block.label)
+
+    forward = {}                        # usunięty blok → blok, do którego skakał
+    for label, block in blocks.items():
+        instructions = block.instructions
+        if len(instructions) != 1 or not isinstance(instructions[0], Branch) or instructions[0].cond is not None:
+            continue
+        target = instructions[0].targets[0]
+        while target in forward:            # cel usunięty wcześniej w tej pętli
+            target = forward[target]
+        instructions[0].targets[0] = target
+        if target == label or target not in blocks:
+            continue
+        sources = [p for p in preds[label] if p not in forward]
+        phis = [phi for phi in _phis(blocks[target]) if any(l == label for _, l in phi.incoming)]
+        if phis and any(p is None or p in preds[target] for p in sources):
+            continue
+
+        source_blocks = [function.blocks[0] if source is None else blocks[source] for source in set(sources)]
+        if any(source_block.terminator is None for source_block in source_blocks):
+            continue
+
+        for source_block in source_blocks:
+            _retarget(source_block.terminator, label, target)
+        for phi in phis:
+            phi.incoming = [(value, p) for value, l in phi.incoming for p in (sources if l == label else [l])]
+        # jedyny następnik usuniętego bloku to target – tylko tam był poprzednikiem
+        preds[target] = [p for p in preds[target] if p != label] + sources
+        del preds[label]
+        forward[label] = target
+
+    if forward:
+        function.blocks = [block for block in function.blocks if block.label not in forward]
+
+def simplify_function(function):
+    truncate_after_terminators(function)
+    remove_unreachable_blocks(function)
+    collapse_jump_blocks(function)
+
+def live_items(items, roots):
+    """
+    Elementy `items` osiągalne z `roots` w grafie odwołań (wywołania, adresy globali,
+    funkcje generatorów i metody klas to zwykłe symbole @). Kolejność zostaje;
+    typy nie są usuwane. Nie modyfikuje listy – IRCache trzyma te same obiekty.
+    """
+    by_symbol = {}
+    for item in items:
+        if isinstance(item, Function):
+            by_symbol[f"@{item.name}"] = item
+        elif isinstance(item, Global):
+            by_symbol[item.name] = item
+
+    live = set()
+    pending = list(roots)
+    while pending:
+        item = pending.pop()
+        if id(item) not in live:
+            live.add(id(item))
+            pending.extend(by_symbol[symbol] for symbol in item.symbols() if symbol in by_symbol)
+    return [item for item in items if not isinstance(item, (Function, Global)) or id(item) in live]
+
+# endregion
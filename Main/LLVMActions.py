@@ -1,5 +1,11 @@
+import math
+import operator
+import os
 import sys
+from IRModel import FloatConstant
 from LLVMGenerator import LLVMGenerator
+from ModuleWriter import ModuleIR
+from PhaseTimer import PhaseTimer
 from antlr4 import *
 from LexerParser.MyLangParser import MyLangParser
 from LexerParser.MyLangVisitor import MyLangVisitor
@@ -10,19 +16,42 @@ import numpy as np
 [1] = type
 """
 
+# typy zmiennych lokalnych funkcji trzymanych w alloca (także jako elementy tablic)
+_LOCAL_TYPES = ("int", "float", "double", "bool", "string")
+
+# zwijanie stałych: operatory i ranking typów jak w cast_types / perform_operation
+_ARITHMETIC = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+_COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+                ">": operator.gt, "<=": operator.le, ">=": operator.ge}
+_NUMERIC_RANK = {"int": 1, "float": 2, "double": 3}
+_CAST_TYPES = ("int", "float", "double", "bool")
+# moduł kodu spoza importów (static_module symboli `static` z pliku głównego)
+_MAIN_MODULE = "<main>"
+
 class VariableInfo:
-    def __init__(self, name, type_info="Undefined"):
+    def __init__(self, name, type_info="Undefined", static_module=None):
         self.name = name
         self.type_info = type_info
+        self.static_module = static_module  # `static`: jedyny moduł, w którym symbol jest widoczny
 
     def __str__(self):
-        return f"VariableInfo(name={self.name}, type_info={self.type_info})"
+        static = f", static_module={self.static_module}" if self.static_module is not None else ""
+        return f"VariableInfo(name={self.name}, type_info={self.type_info}{static})"
 
     def __repr__(self):
         return self.__str__()
 
 class LLVMActions(MyLangVisitor):
-    def __init__(self):
+    def __init__(self, ir_cache=None, stream=None, timer=None, modules=None, separate=False):
+        self.gen = self.new_generator() # stan IR tej kompilacji
+        self.ir_cache = ir_cache        # IRCache albo None (bez kompilacji przyrostowej)
+        self.stream = stream            # plik/gniazdo, do którego IR jest zapisywany na końcu kompilacji
+        self.timer = timer or PhaseTimer(enabled=False)
+        self.modules = modules          # ModuleLoader z drzewami importowanych plików
+        self.imported = set()           # moduły już wkompilowane (każdy tylko raz)
+        self.module_stack = []          # aktualnie kompilowany importowany moduł (komunikaty błędów)
+        self.separate = separate        # osobny IR dla każdego modułu (kompilacja rozdzielna)
+        self.module_outputs = []        # [ModuleIR] w kolejności zakończenia modułów
         self.scope_history = []
         
         self.variables = [{}]
@@ -39,6 +68,7 @@ class LLVMActions(MyLangVisitor):
         self._current_gen_state = 0     
         self._gen_current_type = None 
         self.gen_elem_type = {}   
+        self._local_slots = []          # czy bieżąca funkcja trzyma zmienne w alloca (stos zagnieżdżeń)
 
     def _register_class(self, cname, llvm_fields, fields_map):
         """Record class meta-data and ask LLVMGenerator to emit the struct."""
@@ -46,6 +76,7 @@ class LLVMActions(MyLangVisitor):
         self.classes[cname] = dict(
             fields_map=fields_map,              #  name  → (index, type)
             methods_map={},                     #  name  → (ret, [param types])
+            static_methods={},                  #  name  → moduł metody `static`
             size=total_size
         )
 
@@ -64,8 +95,7 @@ class LLVMActions(MyLangVisitor):
                 self.variables[-1][other] = VariableInfo(src_name, type_info)
                 return src_name, type_info
 
-        idx = self.check_if_name_exists(var_name)
-        new_var_name = f"@{var_name}" if idx == 0 else f"@{var_name}_{idx}"
+        new_var_name = self._variable_name(var_name, type_info)
             
         if type_info[1] == "class": 
             
@@ -73,12 +103,12 @@ class LLVMActions(MyLangVisitor):
             total_size = self.classes[class_name]['size']
             llvm_class_type = f"%class.{class_name}"
 
-            LLVMGenerator.declare_class(new_var_name, class_name)
-            class_copy_reg = LLVMGenerator.allocate_class(class_name, total_size)
-            LLVMGenerator.store_class(new_var_name, class_name, class_copy_reg)
+            self.gen.declare_class(new_var_name, class_name)
+            class_copy_reg = self.gen.allocate_class(class_name, total_size)
+            self.gen.store_class(new_var_name, class_name, class_copy_reg)
 
-            dest_reg = LLVMGenerator.bitcast(f"%{class_copy_reg}", llvm_class_type)
-            LLVMGenerator.memcpy(f"%{dest_reg}", src_name, total_size, 8, llvm_class_type)
+            dest_reg = self.gen.bitcast(f"%{class_copy_reg}", llvm_class_type)
+            self.gen.memcpy(f"%{dest_reg}", src_name, total_size, 8, llvm_class_type)
 
 
         elif type_info[1] == "struct":
@@ -86,22 +116,25 @@ class LLVMActions(MyLangVisitor):
             total_size = self.struct_sizes[type_info[0]]
             llvm_struct_type = f"%struct.{type_info[0]}"
                         
-            LLVMGenerator.declare_struct(new_var_name, type_info[0])
-            reg = LLVMGenerator.initialize_struct(new_var_name, type_info[0], total_size)
+            self.gen.declare_struct(new_var_name, type_info[0])
+            reg = self.gen.initialize_struct(new_var_name, type_info[0], total_size)
             
-            # dest_ptr = LLVMGenerator.get_struct_ptr(new_var_name, type_info[0])
-            # src_ptr = LLVMGenerator.get_struct_ptr(f"%{var_name}", type_info[0])
+            # dest_ptr = self.gen.get_struct_ptr(new_var_name, type_info[0])
+            # src_ptr = self.gen.get_struct_ptr(f"%{var_name}", type_info[0])
 
-            dest_reg = LLVMGenerator.bitcast(f"%{reg}", llvm_struct_type)
+            dest_reg = self.gen.bitcast(f"%{reg}", llvm_struct_type)
             
-            LLVMGenerator.memcpy(f"%{dest_reg}", f"%{var_name}", total_size, 8, llvm_struct_type)
+            self.gen.memcpy(f"%{dest_reg}", f"%{var_name}", total_size, 8, llvm_struct_type)
 
         elif isinstance(type_info, tuple):                    
             sizes, etype = type_info
             llvm_el_type = self.getLLVMType(etype)
             llvm_array_type   = self.build_array_sig(type_info) 
             
-            LLVMGenerator.declare_array(new_var_name, llvm_el_type, sizes)
+            if self._is_local_slot(type_info):
+                self.gen.declare_local(new_var_name, llvm_array_type)
+            else:
+                self.gen.declare_array(new_var_name, llvm_el_type, sizes)
 
             total_elems  = 1
             for s in sizes: total_elems *= int(s)
@@ -121,36 +154,67 @@ class LLVMActions(MyLangVisitor):
                 
             total_bytes  = total_elems * element_size
 
-            LLVMGenerator.memcpy(new_var_name, src_name, total_bytes, element_size, llvm_array_type)
+            self.gen.memcpy(new_var_name, src_name, total_bytes, element_size, llvm_array_type)
         else:                                     
-            if type_info == "int": LLVMGenerator.declare_int(new_var_name)
-            elif type_info == "float": LLVMGenerator.declare_float(new_var_name)
-            elif type_info == "double": LLVMGenerator.declare_double(new_var_name)
-            elif type_info == "bool": LLVMGenerator.declare_bool(new_var_name)
-            elif type_info == "string": LLVMGenerator.declare_string(new_var_name)
+            if self._is_local_slot(type_info): self.gen.declare_local(new_var_name, self.getLLVMType(type_info))
+            elif type_info == "int": self.gen.declare_int(new_var_name)
+            elif type_info == "float": self.gen.declare_float(new_var_name)
+            elif type_info == "double": self.gen.declare_double(new_var_name)
+            elif type_info == "bool": self.gen.declare_bool(new_var_name)
+            elif type_info == "string": self.gen.declare_string(new_var_name)
 
             if src_is_reg:
                 val = src_name             
             else:
-                if type_info == "int":    val = f"%{LLVMGenerator.load_int(src_name)}"
-                elif type_info == "float":  val = f"%{LLVMGenerator.load_float(src_name)}"
-                elif type_info == "double": val = f"%{LLVMGenerator.load_double(src_name)}"
-                elif type_info == "bool":   val = f"%{LLVMGenerator.load_bool(src_name)}"
-                elif type_info == "string": val = f"%{LLVMGenerator.load_string(src_name)}"
-
-            if type_info == "int": LLVMGenerator.assign_int(new_var_name, val)
-            elif type_info == "float": LLVMGenerator.assign_float(new_var_name, val)
-            elif type_info == "double": LLVMGenerator.assign_double(new_var_name, val)
-            elif type_info == "bool": LLVMGenerator.assign_bool(new_var_name, val)
-            elif type_info == "string": LLVMGenerator.assign_string(new_var_name, val)
+                if type_info == "int":    val = f"%{self.gen.load_int(src_name)}"
+                elif type_info == "float":  val = f"%{self.gen.load_float(src_name)}"
+                elif type_info == "double": val = f"%{self.gen.load_double(src_name)}"
+                elif type_info == "bool":   val = f"%{self.gen.load_bool(src_name)}"
+                elif type_info == "string": val = f"%{self.gen.load_string(src_name)}"
+
+            if type_info == "int": self.gen.assign_int(new_var_name, val)
+            elif type_info == "float": self.gen.assign_float(new_var_name, val)
+            elif type_info == "double": self.gen.assign_double(new_var_name, val)
+            elif type_info == "bool": self.gen.assign_bool(new_var_name, val)
+            elif type_info == "string": self.gen.assign_string(new_var_name, val)
 
         self.variables[-1][var_name] = VariableInfo(new_var_name, type_info)
         return new_var_name, type_info
 
+    def _is_local_slot(self, type_info, static=False):
+        """
+        Skalary i tablice skalarów zwykłej funkcji żyją w alloca, więc mem2reg/SROA
+        robią z nich rejestry, a rekurencja nie nadpisuje cudzych wartości.
+        Main (zmienne widoczne w funkcjach), generatory (stan między yield),
+        funkcje z zagnieżdżonymi deklaracjami i zmienne `static` zostają przy globalach.
+        """
+        if static or not self._local_slots or not self._local_slots[-1]:
+            return False
+        if isinstance(type_info, tuple):
+            return not isinstance(type_info[0], str) and type_info[1] in _LOCAL_TYPES
+        return type_info in _LOCAL_TYPES
+
+    def _variable_name(self, var_name, type_info, static=False):
+        idx = self.check_if_name_exists(var_name)
+        name = var_name if idx == 0 else f"{var_name}_{idx}"
+        # '%x.addr' nie zderzy się z parametrem '%x' ani z numerowanymi rejestrami
+        return f"%{name}.addr" if self._is_local_slot(type_info, static) else f"@{name}"
+
+    def _current_module(self):
+        return self.module_stack[-1] if self.module_stack else _MAIN_MODULE
+
+    def _check_static_access(self, name, static_module, ctx):
+        """Symbol `static` ma linkage internal – z innego modułu jest niedostępny (w obu trybach budowania)."""
+        if static_module is not None and static_module != self._current_module():
+            where = "the main file" if static_module == _MAIN_MODULE else os.path.basename(static_module)
+            self.error(ctx.start.line, f"'{name}' is static in {where} and cannot be used from another module")
+
     def get_data_from_scope(self, var_name, ctx):
         var_name_in_other_scope = next((scope for scope in reversed(self.variables) if var_name in scope), None) 
         if var_name_in_other_scope:
-            return var_name_in_other_scope[var_name].name, var_name_in_other_scope[var_name].type_info
+            info = var_name_in_other_scope[var_name]
+            self._check_static_access(var_name, info.static_module, ctx)
+            return info.name, info.type_info
         else:
             self.error(ctx.start.line, f"Invalid variable name: {var_name}")
 
@@ -196,14 +260,81 @@ class LLVMActions(MyLangVisitor):
         return mapping.get(type_name, type_name)
 
     def visitProgram(self, ctx: MyLangParser.ProgramContext):
-        self.visitChildren(ctx)
+        if self.modules is not None and self.modules.entry:
+            self.imported.add(self.modules.entry)
+        self._visit_top_level(ctx)
         
         print(self.scope_history)
         print(self.variables)
-        return LLVMGenerator.generate()
+        with self.timer.phase("emit"):
+            if self.separate:
+                if len(self.gen.function_stack) != 1:
+                    print(f"Error in function clousures")
+                    sys.exit(1)
+                self.module_outputs.append(ModuleIR(self.modules.entry if self.modules else "main",
+                                                    self.gen.module, entry=True))
+                return self.module_outputs
+            if self.stream is not None:
+                self.gen.write(self.stream)
+                return self.stream
+            return self.gen.generate()
+
+    def _visit_top_level(self, program):
+        for child in program.getChildren():
+            decl = self._cacheable_decl(child) if self.ir_cache is not None else None
+            if decl is not None:
+                self.ir_cache.visit(self, decl)
+            else:
+                self.visit(child)
+
+    def visitImportStmt(self, ctx: MyLangParser.ImportStmtContext):
+        # drzewa modułów wczytuje wcześniej ModuleLoader (main.py / server.py)
+        path = self.modules.targets.get(ctx) if self.modules is not None else None
+        if path is None:
+            self.error(ctx.start.line, f"Unresolved import {ctx.STRING().getText()}")
+        if path in self.imported:
+            return None
+        self.imported.add(path)
+        # kod modułu trafia w miejsce importu, jak wklejony (wspólne globalne nazwy)
+        self.module_stack.append(path)
+        if self.separate:
+            self._visit_separate_module(path)
+        else:
+            self._visit_top_level(self.modules.trees[path])
+        self.module_stack.pop()
+        return None
+
+    def new_generator(self):
+        """Nowy LLVMGenerator; VisitorProfiler podmienia tę metodę na instancji, by objąć też moduły."""
+        return LLVMGenerator()
+
+    def _visit_separate_module(self, path):
+        """
+        Moduł dostaje własny LLVMGenerator (moduł IR, kod najwyższego poziomu, liczniki od zera) –
+        jego IR nie zależy od tego, co skompilowano przed nim, więc niezmieniony
+        moduł daje identyczny .ll (i builder nie kompiluje go ponownie).
+        Tablice symboli (zmienne, funkcje, klasy) pozostają wspólne.
+        """
+        saved = (self.gen, self.label_counter, self.temp_var_counter)
+        self.gen = self.new_generator()
+        self.label_counter, self.temp_var_counter = 0, 0
+        try:
+            self._visit_top_level(self.modules.trees[path])
+            self.module_outputs.append(ModuleIR(path, self.gen.module))
+        finally:
+            self.gen, self.label_counter, self.temp_var_counter = saved
+
+    def _cacheable_decl(self, node):
+        """Deklaracje najwyższego poziomu, których IR może pochodzić z IRCache."""
+        if not isinstance(node, MyLangParser.StatementContext):
+            return None
+        return node.funcDecl() or node.structDecl() or node.classDecl()
 
     def visitVarDecl(self, ctx: MyLangParser.VarDeclContext):
         is_static = ctx.static is not None 
+        # static: global widoczny tylko w tym module (internal)
+        linkage = "internal" if is_static else ""
+        static_module = self._current_module() if is_static else None
 
         initializer = None
         if ctx.initializer():
@@ -223,53 +354,59 @@ class LLVMActions(MyLangVisitor):
         if self.check_current_scope(var_name_og):
             self.error(ctx.start.line, f"Variable name already exists") 
         
-        idx = self.check_if_name_exists(var_name_og)
-        var_name = f"@{var_name_og}" if idx == 0 else f"@{var_name_og}_{idx}"
+        var_name = self._variable_name(var_name_og, type_info, is_static)
 
-        if isinstance(type_info, tuple) and type_info[0] in self.structs:
-            LLVMGenerator.declare_struct(var_name, type_info[0])
+        if self._is_local_slot(type_info, is_static):
+            if isinstance(type_info, tuple):
+                self.gen.declare_local(var_name, self.build_array_sig(type_info), "zeroinitializer")
+            else:
+                # skalar z inicjalizatorem zaraz dostanie wartość, bez niego – zero jak u globali
+                zero = None if initializer is not None else self.getLLVMDefault(type_info)
+                self.gen.declare_local(var_name, self.getLLVMType(type_info), zero)
+        elif isinstance(type_info, tuple) and type_info[0] in self.structs:
+            self.gen.declare_struct(var_name, type_info[0], linkage)
             if not ctx.initializer():
                 self.error(ctx.start.line, f"Struct must be inicialized on declaration")
         elif isinstance(type_info, tuple) and type_info[0] in self.classes:
-            LLVMGenerator.declare_class(var_name, type_info[0])
+            self.gen.declare_class(var_name, type_info[0], linkage)
             if isinstance(type_info, tuple) and type_info[1] == 'class' and initializer:
                 init_val, init_type = initializer
                 total   = self.classes[type_info[0]]['size']
-                obj_reg = LLVMGenerator.allocate_class(type_info[0], total)
-                LLVMGenerator.store_class(var_name, type_info[0], obj_reg)
+                obj_reg = self.gen.allocate_class(type_info[0], total)
+                self.gen.store_class(var_name, type_info[0], obj_reg)
 
-                src_reg = LLVMGenerator.get_class_ptr(init_val, type_info[0])
+                src_reg = self.gen.get_class_ptr(init_val, type_info[0])
                 llvm_cls = f"%class.{type_info[0]}"
-                dst_reg  = LLVMGenerator.bitcast(f"%{obj_reg}", llvm_cls)
-                LLVMGenerator.memcpy(f"%{dst_reg}", f"%{src_reg}", total, 8, llvm_cls)
+                dst_reg  = self.gen.bitcast(f"%{obj_reg}", llvm_cls)
+                self.gen.memcpy(f"%{dst_reg}", f"%{src_reg}", total, 8, llvm_cls)
 
-                self.variables[-1][var_name_og] = VariableInfo(var_name, type_info)
+                self.variables[-1][var_name_og] = VariableInfo(var_name, type_info, static_module)
                 return None
 
             if not ctx.initializer():
                 self.error(ctx.start.line, f"Class must be inicialized on declaration")
         elif isinstance(type_info, tuple) and type_info[1] == 'generator':
-            LLVMGenerator.header_text.append(
-                f"{var_name} = global i8* null")   # tymczasowy placeholder
+            # tymczasowo i8*, właściwy typ znany dopiero z inicjalizatora
+            gen_global = self.gen.declare_global(var_name, "i8*", "null", linkage)
         elif isinstance(type_info, tuple):
             sizes = type_info[0]
             element_type = type_info[1]
             llvm_element_type = self.getLLVMType(element_type)
-            LLVMGenerator.declare_array(var_name, llvm_element_type, sizes)
+            self.gen.declare_array(var_name, llvm_element_type, sizes, linkage)
         elif type_info == "int":
-            LLVMGenerator.declare_int(var_name)
+            self.gen.declare_int(var_name, linkage)
         elif type_info == "float":
-            LLVMGenerator.declare_float(var_name)
+            self.gen.declare_float(var_name, linkage)
         elif type_info == "double":
-            LLVMGenerator.declare_double(var_name)
+            self.gen.declare_double(var_name, linkage)
         elif type_info == "string":
-            LLVMGenerator.declare_string(var_name)
+            self.gen.declare_string(var_name, linkage=linkage)
         elif type_info == "bool":
-            LLVMGenerator.declare_bool(var_name)
+            self.gen.declare_bool(var_name, linkage)
         else:
             self.error(ctx.start.line, f"Invalid variable type")
         
-        self.variables[-1][var_name_og] = VariableInfo(var_name, type_info)
+        self.variables[-1][var_name_og] = VariableInfo(var_name, type_info, static_module)
 
         if initializer is not None:
             
@@ -285,10 +422,9 @@ class LLVMActions(MyLangVisitor):
                 llvm_t   = self.getLLVMType(init_type)         # %oddNumbers.gen*
 
                 # popraw global-deklarację (zamiana i8* na %X.gen*)
-                LLVMGenerator.header_text[-1] = f"{var_name} = global {llvm_t} null"
+                gen_global.type = llvm_t
                 # store wartości
-                LLVMGenerator.buffor_stack[-1].append(
-                    f"store {llvm_t} {init_val}, {llvm_t}* {var_name}")
+                self.gen.store(llvm_t, init_val, var_name)
 
                 # zapisz ostateczny typ w tablicy zmiennych
                 self.variables[-1][var_name_og].type_info = init_type
@@ -306,7 +442,7 @@ class LLVMActions(MyLangVisitor):
                 
                 for (reference_list, value_to_assign) in zip(reference_list_of_lists, incoming_data_list):
                     llvm_element_type = self.getLLVMType(type_info[1] if isinstance(type_info, tuple) else type_info)
-                    LLVMGenerator.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, type_info[0] if isinstance(type_info, tuple) else ())
+                    self.gen.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, type_info[0] if isinstance(type_info, tuple) else ())
         
 
         
@@ -399,7 +535,7 @@ class LLVMActions(MyLangVisitor):
                     if var_type[0] != to_assign_value:
                         self.error(ctx.start.line,f"Struct type missmatch")
                     
-                    LLVMGenerator.initialize_struct(var_name, var_type[0], total_size)
+                    self.gen.initialize_struct(var_name, var_type[0], total_size)
                     return None
 
                 elif to_assign_type[1] == "struct":
@@ -409,10 +545,10 @@ class LLVMActions(MyLangVisitor):
                     total_size = self.struct_sizes[var_type[0]]
                     llvm_struct_type = f"%struct.{var_type[0]}"
                     
-                    lhs = LLVMGenerator.get_struct_ptr(var_name, var_type[0])
-                    dst_reg = LLVMGenerator.bitcast(f"%{lhs}", llvm_struct_type)
+                    lhs = self.gen.get_struct_ptr(var_name, var_type[0])
+                    dst_reg = self.gen.bitcast(f"%{lhs}", llvm_struct_type)
                     
-                    LLVMGenerator.memcpy(f"%{dst_reg}", to_assign_value, total_size, 8, llvm_struct_type)
+                    self.gen.memcpy(f"%{dst_reg}", to_assign_value, total_size, 8, llvm_struct_type)
                     
                     return None
                 
@@ -426,10 +562,10 @@ class LLVMActions(MyLangVisitor):
             #     total_size = self.classes[var_type[0]]['size']
             #     llvm_class_type = f"%class.{var_type[0]}"
                 
-            #     lhs = LLVMGenerator.get_class_ptr(var_name, var_type[0])
-            #     dst_reg = LLVMGenerator.bitcast(f"%{lhs}", llvm_class_type)
+            #     lhs = self.gen.get_class_ptr(var_name, var_type[0])
+            #     dst_reg = self.gen.bitcast(f"%{lhs}", llvm_class_type)
                 
-            #     LLVMGenerator.memcpy(f"%{dst_reg}", to_assign_value, total_size, 8, llvm_class_type)
+            #     self.gen.memcpy(f"%{dst_reg}", to_assign_value, total_size, 8, llvm_class_type)
 
             #     return None
                     
@@ -441,15 +577,15 @@ class LLVMActions(MyLangVisitor):
                     self.error(ctx.start.line, "Class type mismatch")
 
                 total   = self.classes[var_type[0]]['size']
-                obj_reg = LLVMGenerator.allocate_class(var_type[0], total)
-                LLVMGenerator.store_class(var_name, var_type[0], obj_reg)
+                obj_reg = self.gen.allocate_class(var_type[0], total)
+                self.gen.store_class(var_name, var_type[0], obj_reg)
 
                 # 3. deep-copy: ładujemy *prawdziwy* adres RHS
-                src_reg = LLVMGenerator.get_class_ptr(to_assign_value, var_type[0])
+                src_reg = self.gen.get_class_ptr(to_assign_value, var_type[0])
 
                 llvm_cls = f"%class.{var_type[0]}"
-                dst_reg  = LLVMGenerator.bitcast(f"%{obj_reg}", llvm_cls)
-                LLVMGenerator.memcpy(f"%{dst_reg}", f"%{src_reg}", total, 8, llvm_cls)
+                dst_reg  = self.gen.bitcast(f"%{obj_reg}", llvm_cls)
+                self.gen.memcpy(f"%{dst_reg}", f"%{src_reg}", total, 8, llvm_cls)
                 return None
                                 
             if not isinstance(to_assign_type, tuple):
@@ -477,12 +613,12 @@ class LLVMActions(MyLangVisitor):
             
             total_size = total_elements * element_size
             llvm_element_type = self.getLLVMType(to_assign_type[1])
-            LLVMGenerator.memcpy(var_name, to_assign_value, total_size, element_size, llvm_element_type)
+            self.gen.memcpy(var_name, to_assign_value, total_size, element_size, llvm_element_type)
             return
                 
         elif var_type == "int":
             if to_assign_type == "int":
-                LLVMGenerator.assign_int(var_name, to_assign_value)
+                self.gen.assign_int(var_name, to_assign_value)
             else:
                 self.error(
                     ctx.start.line,
@@ -491,10 +627,10 @@ class LLVMActions(MyLangVisitor):
         
         elif var_type == "float":
             if to_assign_type == "float":
-                LLVMGenerator.assign_float(var_name, to_assign_value)
+                self.gen.assign_float(var_name, to_assign_value)
             elif to_assign_type == "int":
                 float_version = float(to_assign_value)
-                LLVMGenerator.assign_float(var_name, float_version)
+                self.gen.assign_float(var_name, float_version)
             else:
                 self.error(
                     ctx.start.line,
@@ -503,10 +639,10 @@ class LLVMActions(MyLangVisitor):
         
         elif var_type == "double":
             if to_assign_type in ("double", "float"):
-                LLVMGenerator.assign_double(var_name, to_assign_value)
+                self.gen.assign_double(var_name, to_assign_value)
             elif to_assign_type == "int":
                 float_version = float(to_assign_value)
-                LLVMGenerator.assign_double(var_name, float_version)
+                self.gen.assign_double(var_name, float_version)
             else:
                 self.error(
                     ctx.start.line,
@@ -515,7 +651,7 @@ class LLVMActions(MyLangVisitor):
         
         elif var_type == "string":
             if to_assign_type == "string":
-                LLVMGenerator.assign_string(var_name, to_assign_value)
+                self.gen.assign_string(var_name, to_assign_value)
             else:
                 self.error(
                     ctx.start.line,
@@ -524,7 +660,7 @@ class LLVMActions(MyLangVisitor):
         
         elif var_type == "bool":
             if to_assign_type == "bool":
-                LLVMGenerator.assign_bool(var_name, to_assign_value)
+                self.gen.assign_bool(var_name, to_assign_value)
             else:
                 self.error(ctx.start.line, f"Invalid type '{to_assign_type}' assigned to variable '{var_name}' of type '{var_type}'")         
         
@@ -620,8 +756,8 @@ class LLVMActions(MyLangVisitor):
             field_type = self.structs[type_info[0]][field_idx][1]
             if field_idx is None:
                 self.error(ctx.start.line, f"Invalid field name '{references}' for struct '{type_info[0]}'")
-            struct_ptr = LLVMGenerator.get_struct_ptr(var_name, type_info[0])
-            field_ptr = LLVMGenerator.get_struct_field_ptr(struct_ptr, type_info[0], field_idx)
+            struct_ptr = self.gen.get_struct_ptr(var_name, type_info[0])
+            field_ptr = self.gen.get_struct_field_ptr(struct_ptr, type_info[0], field_idx)
             if not isinstance(field_type, tuple):
                 self.handle_assignment(ctx, field_ptr, field_type, initializer[0], initializer[1])
                 return None
@@ -637,8 +773,8 @@ class LLVMActions(MyLangVisitor):
             
             idx, field_type = self.classes[type_info[0]]['fields_map'][field_name]
 
-            obj_ptr = LLVMGenerator.get_class_ptr(var_name, type_info[0])
-            field_ptr = LLVMGenerator.get_class_field_ptr(f"%{obj_ptr}", type_info[0], idx)
+            obj_ptr = self.gen.get_class_ptr(var_name, type_info[0])
+            field_ptr = self.gen.get_class_field_ptr(f"%{obj_ptr}", type_info[0], idx)
             
             if not isinstance(field_type, tuple):
                 self.handle_assignment(ctx, f"%{field_ptr}", field_type, initializer[0], initializer[1])
@@ -698,9 +834,9 @@ class LLVMActions(MyLangVisitor):
                 initializer_shape = initializer_shape[0] if len(initializer_shape) == 1 else tuple(initializer_shape)
                 
                 for dst_idx, src_idx in zip(index_combinations, src_indices):
-                    src_ptr = LLVMGenerator.get_array_element_ptr(value_reg, src_idx, llvm_element_type, initializer_shape)
-                    val = LLVMGenerator.load_array_element(llvm_element_type, src_ptr)
-                    LLVMGenerator.store_array_element(var_name, dst_idx, f"%{val}", llvm_element_type, sizes)
+                    src_ptr = self.gen.get_array_element_ptr(value_reg, src_idx, llvm_element_type, initializer_shape)
+                    val = self.gen.load_array_element(llvm_element_type, src_ptr)
+                    self.gen.store_array_element(var_name, dst_idx, f"%{val}", llvm_element_type, sizes)
                 return None
             else:
                 sizes = type_info[0]
@@ -721,10 +857,10 @@ class LLVMActions(MyLangVisitor):
                 llvm_element_type = self.getLLVMType(element_type)
                 
                 if check_size == [1]:
-                    LLVMGenerator.store_array_element(var_name, list(references), value_reg, llvm_element_type, sizes)
+                    self.gen.store_array_element(var_name, list(references), value_reg, llvm_element_type, sizes)
                     return None
 
-                ptr = LLVMGenerator.get_array_element_ptr(var_name, list(references), llvm_element_type, sizes)
+                ptr = self.gen.get_array_element_ptr(var_name, list(references), llvm_element_type, sizes)
 
                 total_elems  = 1
                 for s in initializer_shape: total_elems *= int(s)
@@ -745,7 +881,7 @@ class LLVMActions(MyLangVisitor):
                 total_bytes  = total_elems * element_size
                     
                 llvm_element_type = self.getLLVMType(element_type)
-                LLVMGenerator.memcpy(f"%{ptr}", value_reg, total_bytes, element_size, llvm_element_type)
+                self.gen.memcpy(f"%{ptr}", value_reg, total_bytes, element_size, llvm_element_type)
                 return None
         else:
             if any(isinstance(idx, tuple) for idx in references):
@@ -794,7 +930,7 @@ class LLVMActions(MyLangVisitor):
                 llvm_element_type = self.getLLVMType(element_type)
 
                 for (reference_list, value_to_assign) in zip(index_combinations, values_to_be_assigned):
-                    LLVMGenerator.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, sizes)
+                    self.gen.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, sizes)
                 return None
             else:
                 sizes = type_info[0]
@@ -819,7 +955,7 @@ class LLVMActions(MyLangVisitor):
                     self.error(ctx.start.line, f"Invalid number of values assigned to array")
                 
                 for (reference_list, value_to_assign) in zip(reference_list_of_lists,values_to_be_assigned):
-                    LLVMGenerator.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, sizes)
+                    self.gen.store_array_element(var_name, list(reference_list), value_to_assign, llvm_element_type, sizes)
                 return None
             
     def visitPrintStmt(self, ctx: MyLangParser.PrintStmtContext):
@@ -827,15 +963,15 @@ class LLVMActions(MyLangVisitor):
         if isinstance(value_type, tuple):
             self.error(ctx.start.line, f"Print of variable of array type not supported") 
         if value_type == "int":
-            LLVMGenerator.print_int(reg)
+            self.gen.print_int(reg)
         elif value_type == "float":
-            LLVMGenerator.print_float(reg)
+            self.gen.print_float(reg)
         elif value_type == "double":
-            LLVMGenerator.print_double(reg)
+            self.gen.print_double(reg)
         elif value_type == "string":
-            LLVMGenerator.print_string(reg)
+            self.gen.print_string(reg)
         elif value_type == "bool":
-            LLVMGenerator.print_bool(reg)
+            self.gen.print_bool(reg)
         return None
 
     def visitReadStmt(self, ctx: MyLangParser.ReadStmtContext):
@@ -847,13 +983,13 @@ class LLVMActions(MyLangVisitor):
         var_name, type_info = self.get_data_from_scope(var_name, ctx)
         
         if type_info == "int":
-            LLVMGenerator.read_int(var_name)
+            self.gen.read_int(var_name)
         elif type_info == "float":
-            LLVMGenerator.read_float(var_name)
+            self.gen.read_float(var_name)
         elif type_info == "double":
-            LLVMGenerator.read_double(var_name)
+            self.gen.read_double(var_name)
         elif type_info == "string":
-            LLVMGenerator.read_string(var_name)
+            self.gen.read_string(var_name)
         return None
 
     def visitLiteral(self, ctx: MyLangParser.LiteralContext):
@@ -866,15 +1002,15 @@ class LLVMActions(MyLangVisitor):
             double_value = np.double(text)
 
             if str(float_value) == str(double_value):
-                return (float_value, "float")
+                return (self._constant(float_value, "float"), "float")
             else:
                 if str(double_value) != text:
                     self.error(ctx.start.line, f"Assigne value too large for double") 
                 else:
-                    return (double_value, "double")
+                    return (self._constant(double_value, "double"), "double")
         elif ctx.STRING():
             text = ctx.STRING().getText()[1:-1]
-            pointer_reg = LLVMGenerator.constant_string(text)
+            pointer_reg = self.gen.constant_string(text)
             return (pointer_reg, "string")
         
         elif ctx.BOOL():
@@ -904,8 +1040,15 @@ class LLVMActions(MyLangVisitor):
             if rhs_type != "bool":
                 self.error(ctx.start.line, "RHS of 'or' must be boolean")
             return rhs_reg
-        
-        reg = LLVMGenerator.or_expr(left_reg, build_rhs)
+
+        if self._is_constant(left_reg) and not left_reg:
+            # false OR x == x – bez rozgałęzień i phi
+            return (build_rhs(), "bool")
+
+        reg = self.gen.or_expr(left_reg, build_rhs)
+        if self._is_constant(left_reg):
+            # true OR x: prawa strona i tak przechodzi zwykłą kontrolę (martwa gałąź zostaje dla opt)
+            return (1, "bool")
 
         return (f"%{reg}", "bool")
     
@@ -916,14 +1059,21 @@ class LLVMActions(MyLangVisitor):
         left_reg, left_type = self.visit(ctx.andExpr())
         if left_type != "bool":
             self.error(ctx.start.line, "LHS of 'and' must be boolean")
-        
+
         def build_rhs():
             rhs_reg, rhs_type = self.visit(ctx.xorExpr())
             if rhs_type != "bool":
                 self.error(ctx.start.line, "RHS of 'and' must be boolean")
             return rhs_reg
 
-        reg = LLVMGenerator.and_expr(left_reg, build_rhs)
+        if self._is_constant(left_reg) and left_reg:
+            # true AND x == x
+            return (build_rhs(), "bool")
+
+        reg = self.gen.and_expr(left_reg, build_rhs)
+        if self._is_constant(left_reg):
+            # false AND x: jak wyżej – prawa strona sprawdzona, wynik zwinięty
+            return (0, "bool")
 
         return (f"%{reg}", "bool")
     
@@ -934,7 +1084,9 @@ class LLVMActions(MyLangVisitor):
         left_reg, left_type = self.visit(ctx.xorExpr())
         right_reg, right_type = self.visit(ctx.eqExpr())
 
-        reg = LLVMGenerator.xor_expr(left_reg, right_reg)
+        if self._is_constant(left_reg) and self._is_constant(right_reg):
+            return (self._constant(left_reg, "bool") ^ self._constant(right_reg, "bool"), "bool")
+        reg = self.gen.xor_expr(left_reg, right_reg)
 
         return (f"%{reg}", "bool")
 
@@ -947,13 +1099,13 @@ class LLVMActions(MyLangVisitor):
             
         if left_type == "string" and right_type == "string":
             # Generate strcmp call
-            strcmp_reg = LLVMGenerator.strcmp_call(left_reg, right_reg)
+            strcmp_reg = self.gen.strcmp_call(left_reg, right_reg)
             
             # Compare strcmp result to 0 (equality)
             op = ctx.equals or ctx.notEquals
             op_type = op.text
             icmp_cond = "eq" if op_type == "==" else "ne"
-            cmp_reg = LLVMGenerator.eq_expr_int(icmp_cond, f"%{strcmp_reg}", "0", "i32")
+            cmp_reg = self.gen.eq_expr_int(icmp_cond, f"%{strcmp_reg}", "0", "i32")
             return (f"%{cmp_reg}", "bool")
         
         casted_left, casted_right, result_type = self.cast_types(left_reg, left_type, right_reg, right_type)
@@ -962,12 +1114,15 @@ class LLVMActions(MyLangVisitor):
         op = ctx.equals or ctx.notEquals
         op_type = op.text
         
+        folded = self._fold_comparison(op_type, casted_left, casted_right, result_type)
+        if folded is not None:
+            return (folded, "bool")
         if result_type in ('int', 'bool'):
             icmp_cond = 'eq' if op_type == '==' else 'ne'
-            cmp_reg = LLVMGenerator.eq_expr_int(icmp_cond, casted_left, casted_right, llvm_type)
+            cmp_reg = self.gen.eq_expr_int(icmp_cond, casted_left, casted_right, llvm_type)
         elif result_type in ('float', 'double'):
             fcmp_cond = 'oeq' if op_type == '==' else 'une'
-            cmp_reg = LLVMGenerator.eq_expr_f_db(fcmp_cond, casted_left, casted_right, llvm_type)
+            cmp_reg = self.gen.eq_expr_f_db(fcmp_cond, casted_left, casted_right, llvm_type)
         else:
             self.error(ctx.start.line, f"Unsupported comparison for type {result_type}")
         
@@ -991,14 +1146,17 @@ class LLVMActions(MyLangVisitor):
         op = ctx.less or ctx.more or ctx.lessEqual or ctx.moreEqual
         op_type = op.text
         
+        folded = self._fold_comparison(op_type, casted_left, casted_right, result_type)
+        if folded is not None:
+            return (folded, "bool")
         if result_type in ('int', 'bool'):
             cond_map = {'<': 'slt', '>': 'sgt', '<=': 'sle', '>=': 'sge'}
             icmp_cond = cond_map[op_type]
-            cmp_reg = LLVMGenerator.eq_expr_int(icmp_cond, casted_left, casted_right, llvm_type)
+            cmp_reg = self.gen.eq_expr_int(icmp_cond, casted_left, casted_right, llvm_type)
         elif result_type in ('float', 'double'):
             cond_map = {'<': 'olt', '>': 'ogt', '<=': 'ole', '>=': 'oge'}
             fcmp_cond = cond_map[op_type]
-            cmp_reg = LLVMGenerator.eq_expr_f_db(fcmp_cond, casted_left, casted_right, llvm_type)
+            cmp_reg = self.gen.eq_expr_f_db(fcmp_cond, casted_left, casted_right, llvm_type)
         else:
             self.error(ctx.start.line, f"Unsupported comparison for type {result_type}")
         
@@ -1023,64 +1181,91 @@ class LLVMActions(MyLangVisitor):
         llvm_to = self.getLLVMType(to_type)
         if from_type == to_type:
             return reg
+        # fptosi z NaN/inf nie ma wartości – zostaje w kodzie
+        if self._is_constant(reg) and (to_type != 'int' or math.isfinite(reg)):
+            return self._constant(reg, to_type)
+
+        if from_type == 'bool' and to_type != 'int':
+            # i1 → i32 → typ zmiennoprzecinkowy
+            reg, from_type = f"%{self.gen.bool_to_int(reg)}", 'int'
         
         if from_type == 'int' and to_type == 'float':
-            cast_reg = LLVMGenerator.int_to_float(reg)
+            cast_reg = self.gen.int_to_float(reg)
         elif from_type == 'int' and to_type == 'double':
-            cast_reg = LLVMGenerator.int_to_double(reg)
+            cast_reg = self.gen.int_to_double(reg)
         elif from_type == 'float' and to_type == 'double':
-            cast_reg = LLVMGenerator.float_to_double(reg)
+            cast_reg = self.gen.float_to_double(reg)
+        elif from_type == 'double' and to_type == 'float':
+            cast_reg = self.gen.double_to_float(reg)
+        elif from_type == 'float' and to_type == 'int':
+            cast_reg = self.gen.float_to_int(reg)
+        elif from_type == 'double' and to_type == 'int':
+            cast_reg = self.gen.double_to_int(reg)
+        elif from_type == 'bool' and to_type == 'int':
+            cast_reg = self.gen.bool_to_int(reg)
+        elif from_type == 'int' and to_type == 'bool':
+            cast_reg = self.gen.int_to_bool(reg)
+        elif to_type == 'bool':
+            cast_reg = self.gen.real_to_bool(reg, llvm_from)
         
         return f"%{cast_reg}"
 
     def perform_operation(self, left_type, left_reg, right_type, right_reg, operation):
+        if (self._is_constant(left_reg) and self._is_constant(right_reg)
+                and left_type in _NUMERIC_RANK and right_type in _NUMERIC_RANK):
+            result_type = max(left_type, right_type, key=_NUMERIC_RANK.get)
+            folded = self._fold_arithmetic(operation,
+                                           self._constant(left_reg, result_type),
+                                           self._constant(right_reg, result_type), result_type)
+            if folded is not None:
+                return (folded, result_type)
         if left_type == "int":
                 if right_type == "int":
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_int")
+                    method = getattr(self.gen, f"{self.operations[operation]}_int")
                     result_reg = method(left_reg, right_reg)
                     return (f"%{result_reg}", "int")
                 elif right_type == "float":
-                    float_reg = LLVMGenerator.int_to_float(left_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_float")
-                    result_reg = method(f"%{float_reg}", right_reg)
+                    float_reg = self.cast_value(left_reg, "int", "float")
+                    method = getattr(self.gen, f"{self.operations[operation]}_float")
+                    result_reg = method(float_reg, right_reg)
                     return (f"%{result_reg}", "float")
                 elif right_type == "double":
-                    double_reg = LLVMGenerator.int_to_double(left_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_double")
-                    result_reg = method(f"%{double_reg}", right_reg)
+                    double_reg = self.cast_value(left_reg, "int", "double")
+                    method = getattr(self.gen, f"{self.operations[operation]}_double")
+                    result_reg = method(double_reg, right_reg)
                     return (f"%{result_reg}", "double")
                 elif right_type == "string":
                     raise Exception(f"Not implemented yet: {left_type} and {right_type}")
         elif left_type == "float":
                 if right_type == "int":
-                    float_reg = LLVMGenerator.int_to_float(right_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_float")
-                    result_reg = method(left_reg, f"%{float_reg}")
+                    float_reg = self.cast_value(right_reg, "int", "float")
+                    method = getattr(self.gen, f"{self.operations[operation]}_float")
+                    result_reg = method(left_reg, float_reg)
                     return (f"%{result_reg}", "float")
                 elif right_type == "float":
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_float")
+                    method = getattr(self.gen, f"{self.operations[operation]}_float")
                     result_reg = method(left_reg, right_reg)
                     return (f"%{result_reg}", "float")
                 elif right_type == "double":
-                    double_reg = LLVMGenerator.float_to_double(left_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_double")
-                    result_reg = method(f"%{double_reg}", right_reg)
+                    double_reg = self.cast_value(left_reg, "float", "double")
+                    method = getattr(self.gen, f"{self.operations[operation]}_double")
+                    result_reg = method(double_reg, right_reg)
                     return (f"%{result_reg}", "double")
                 elif right_type == "string":
                         raise Exception(f"Not implemented yet: {left_type} and {right_type}")
         elif left_type == "double":
                 if right_type == "int":
-                    double_reg = LLVMGenerator.int_to_double(right_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_double")
-                    result_reg = method(left_reg, f"%{double_reg}")
+                    double_reg = self.cast_value(right_reg, "int", "double")
+                    method = getattr(self.gen, f"{self.operations[operation]}_double")
+                    result_reg = method(left_reg, double_reg)
                     return (f"%{result_reg}", "double")
                 elif right_type == "float":
-                    double_reg = LLVMGenerator.float_to_double(right_reg)
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_double")
-                    result_reg = method(left_reg, f"%{double_reg}")
+                    double_reg = self.cast_value(right_reg, "float", "double")
+                    method = getattr(self.gen, f"{self.operations[operation]}_double")
+                    result_reg = method(left_reg, double_reg)
                     return (f"%{result_reg}", "double")
                 elif right_type == "double":
-                    method = getattr(LLVMGenerator, f"{self.operations[operation]}_double")
+                    method = getattr(self.gen, f"{self.operations[operation]}_double")
                     result_reg = method(left_reg, right_reg)
                     return (f"%{result_reg}", "double")
                 elif right_type == "string":
@@ -1088,6 +1273,51 @@ class LLVMActions(MyLangVisitor):
         elif left_type == "string":
             raise Exception(f"Not implemented yet: {left_type} and {right_type}")
 
+    # region Constant folding
+
+    @staticmethod
+    def _is_constant(value):
+        """Literał (lub wynik zwijania) zamiast nazwy rejestru / globala."""
+        return isinstance(value, (int, float, np.number))
+
+    @staticmethod
+    def _constant(value, value_type):
+        """Stała w postaci, jaką miałby wynik instrukcji danego typu (i32 z zawijaniem, float/double IEEE)."""
+        if value_type == "int":
+            return (int(value) + 2**31) % 2**32 - 2**31
+        if value_type == "bool":
+            return int(bool(value))
+        if value_type == "float":
+            return FloatConstant(np.float32(value))
+        return FloatConstant(np.float64(value))
+
+    def _fold_arithmetic(self, operation, left, right, result_type):
+        """Wynik operacji na stałych albo None, gdy musi zostać w kodzie (sdiv przez 0, INT_MIN / -1)."""
+        if result_type == "int":
+            if operation == "/":
+                if right == 0 or (left == -2**31 and right == -1):
+                    return None
+                quotient = abs(left) // abs(right)          # sdiv obcina w stronę zera
+                return self._constant(quotient if (left < 0) == (right < 0) else -quotient, "int")
+            return self._constant(_ARITHMETIC[operation](left, right), "int")
+
+        # arytmetyka w precyzji typu wyniku (float: pojedyncza), dzielenie przez 0 → inf/nan
+        precision = np.float32 if result_type == "float" else np.float64
+        with np.errstate(all="ignore"):
+            value = _ARITHMETIC[operation](precision(left), precision(right))
+        return self._constant(value, result_type)
+
+    def _fold_comparison(self, operation, left, right, result_type):
+        """icmp s*/fcmp o* (une dla !=) na stałych; porównania z NaN jak w LLVM."""
+        if not (self._is_constant(left) and self._is_constant(right)):
+            return None
+        if result_type in ("int", "bool"):
+            left, right = self._constant(left, "int"), self._constant(right, "int")
+        return int(_COMPARISONS[operation](float(left), float(right)) if result_type in ("float", "double")
+                   else _COMPARISONS[operation](left, right))
+
+    # endregion
+
     operations = {
         "+" : "add",
         "-" : "sub",
@@ -1130,15 +1360,27 @@ class LLVMActions(MyLangVisitor):
         return self.perform_operation(left_type, left_reg, right_type, right_reg, op_type)
     
     def visitUnaryExpr(self, ctx: MyLangParser.UnaryExprContext):
+        if ctx.castExpr():
+            return self.visit(ctx.castExpr())
         if ctx.getChildCount() == 1:
             return self.visit(ctx.primaryExpr())
         
         expr_reg, expr_type = self.visit(ctx.unaryExpr())
 
-        reg = LLVMGenerator.neg_expr(expr_reg)
+        if self._is_constant(expr_reg):
+            return (1 - self._constant(expr_reg, "bool"), "bool")
+        reg = self.gen.neg_expr(expr_reg)
 
         return (f"%{reg}", "bool")
 
+    def visitCastExpr(self, ctx: MyLangParser.CastExprContext):
+        target_type = self.visit(ctx.primitiveType())
+        expr_reg, expr_type = self.visit(ctx.unaryExpr())
+        if target_type not in _CAST_TYPES or expr_type not in _CAST_TYPES:
+            self.error(ctx.start.line, f"Cannot cast {expr_type} to {target_type}")
+        # stałe zwija cast_value (int z zawijaniem, float w pojedynczej precyzji)
+        return (self.cast_value(expr_reg, expr_type, target_type), target_type)
+
     def compute_output_shape(self, index_combinations):
         if not index_combinations:
             return ()
@@ -1184,7 +1426,7 @@ class LLVMActions(MyLangVisitor):
 
             # ► potrzebujemy wskaźnik na strukturę generatora
             if var_name.startswith('@'):
-                load_reg = LLVMGenerator.get_gen_ptr(var_name, gen_name)
+                load_reg = self.gen.get_gen_ptr(var_name, gen_name)
                 obj_ptr  = f"%{load_reg}"
             else:
                 obj_ptr  = var_name          # już %oddNumbers.gen*
@@ -1194,7 +1436,7 @@ class LLVMActions(MyLangVisitor):
                 elem_t   = self.gen_elem_type.get(gen_name, 'int')   # domyślnie int
                 elem_llvm= self.getLLVMType(elem_t)
 
-                load_reg = LLVMGenerator.get_gen_current(obj_ptr, gen_name, elem_llvm)
+                load_reg = self.gen.get_gen_current(obj_ptr, gen_name, elem_llvm)
                 return (f"%{load_reg}", elem_t)
 
             elif token == 'next':
@@ -1215,10 +1457,10 @@ class LLVMActions(MyLangVisitor):
             if token in self.classes[type_info[0]]['fields_map']:
                 idx, f_type = self.classes[type_info[0]]['fields_map'][token]
                 
-                obj_ptr = LLVMGenerator.get_class_ptr(var_name, type_info[0])
-                ptr_reg = LLVMGenerator.get_class_field_ptr(f"%{obj_ptr}", type_info[0], idx)
+                obj_ptr = self.gen.get_class_ptr(var_name, type_info[0])
+                ptr_reg = self.gen.get_class_field_ptr(f"%{obj_ptr}", type_info[0], idx)
                 
-                # ptr_reg = LLVMGenerator.get_class_field_ptr(var_name, type_info[0], idx)
+                # ptr_reg = self.gen.get_class_field_ptr(var_name, type_info[0], idx)
                 
                 ptr_reg = f"%{ptr_reg}"
                 # return (ptr_reg, f_type)
@@ -1226,6 +1468,8 @@ class LLVMActions(MyLangVisitor):
             
             # method
             elif token in self.classes[type_info[0]]['methods_map']:
+                self._check_static_access(f"{type_info[0]}.{token}",
+                                          self.classes[type_info[0]]['static_methods'].get(token), ctx)
                 ret_t, _ = self.classes[type_info[0]]['methods_map'][token]
                 return (f"@{type_info[0]}_{token}", ret_t, var_name)
             else:
@@ -1244,14 +1488,14 @@ class LLVMActions(MyLangVisitor):
                 if field_idx is None:
                     self.error(ctx.start.line, f"Invalid field name '{references}' for struct '{type_info[0]}'")
         
-                struct_ptr = LLVMGenerator.get_struct_ptr(var_name, type_info[0])
-                field_ptr = LLVMGenerator.get_struct_field_ptr(struct_ptr, type_info[0], field_idx)
+                struct_ptr = self.gen.get_struct_ptr(var_name, type_info[0])
+                field_ptr = self.gen.get_struct_field_ptr(struct_ptr, type_info[0], field_idx)
                 
                 is_struct = True
                 
                 var_name, type_info = field_ptr, field_type
             else:
-                reg = LLVMGenerator.get_struct_ptr(var_name, type_info[0])
+                reg = self.gen.get_struct_ptr(var_name, type_info[0])
                 return (f"%{reg}", type_info)
         
         if isinstance(type_info, tuple):
@@ -1296,43 +1540,43 @@ class LLVMActions(MyLangVisitor):
                 
                 temp_reg = f"@_{self.temp_var_counter}_temp"
                 self.temp_var_counter += 1
-                LLVMGenerator.declare_array(temp_reg, llvm_element_type, tuple(shape))
+                self.gen.declare_array(temp_reg, llvm_element_type, tuple(shape))
                 for index_combination in index_combinations:
-                    ptr = LLVMGenerator.get_array_element_ptr(var_name, index_combination, llvm_element_type, sizes)
-                    reg = LLVMGenerator.load_array_element(llvm_element_type, ptr)
+                    ptr = self.gen.get_array_element_ptr(var_name, index_combination, llvm_element_type, sizes)
+                    reg = self.gen.load_array_element(llvm_element_type, ptr)
                     dest_indices = self.compute_destination_indices(index_combination, index_combinations)
-                    LLVMGenerator.store_array_element(temp_reg, dest_indices, f"%{reg}", llvm_element_type, tuple(shape))
+                    self.gen.store_array_element(temp_reg, dest_indices, f"%{reg}", llvm_element_type, tuple(shape))
                 type_info = (tuple(map(str, shape)), element_type)
                 reg = temp_reg
             else:
                 target_size = sizes[0+len(indices):]
                 if target_size:
                     type_info = (target_size, element_type)  #przekazywanie rozmiaru tablicy do ktorej jest ten pointer
-                    reg = LLVMGenerator.get_array_element_ptr(var_name, list(indices), llvm_element_type, sizes)
+                    reg = self.gen.get_array_element_ptr(var_name, list(indices), llvm_element_type, sizes)
                     
                 else:
                     type_info = element_type 
-                    reg = LLVMGenerator.get_array_element_ptr(var_name, list(indices), llvm_element_type, sizes)
-                    reg = LLVMGenerator.load_array_element(llvm_element_type,reg)
+                    reg = self.gen.get_array_element_ptr(var_name, list(indices), llvm_element_type, sizes)
+                    reg = self.gen.load_array_element(llvm_element_type,reg)
                 reg = f"%{reg}"
         
         elif type_info == "func":
             reg = var_name
             type_info = self.functions.get(var_name[1:], {}).get('ret', 'void')
         elif type_info == "int":
-            reg = LLVMGenerator.load_int(var_name)
+            reg = self.gen.load_int(var_name)
             reg = f"%{reg}"
         elif type_info == "float":
-            reg = LLVMGenerator.load_float(var_name)
+            reg = self.gen.load_float(var_name)
             reg = f"%{reg}"
         elif type_info == "double":
-            reg = LLVMGenerator.load_double(var_name)
+            reg = self.gen.load_double(var_name)
             reg = f"%{reg}"
         elif type_info == "string":
-            reg = LLVMGenerator.load_string(var_name)
+            reg = self.gen.load_string(var_name)
             reg = f"%{reg}"
         elif type_info == "bool":
-            reg = LLVMGenerator.load_bool(var_name)
+            reg = self.gen.load_bool(var_name)
             reg = f"%{reg}"
         
         return (reg, type_info)
@@ -1359,7 +1603,7 @@ class LLVMActions(MyLangVisitor):
         if ref_name not in self.classes and ref_name not in self.structs:
             self.error(ctx.start.line, f"'{ref_name}' not found")
         elif ref_name in self.classes:
-            obj_ptr_reg = LLVMGenerator.allocate_class(ref_name, self.classes[ref_name]['size'])
+            obj_ptr_reg = self.gen.allocate_class(ref_name, self.classes[ref_name]['size'])
             
             if ctx.argumentList():
                 args = self.visit(ctx.argumentList())
@@ -1373,7 +1617,7 @@ class LLVMActions(MyLangVisitor):
                     )
                     arg_sig_parts.append(f"{llvm_t} {aval}")
 
-                LLVMGenerator.call_void_function("void",
+                self.gen.call_void_function("void",
                     f"@{ref_name}_ctor",
                     ", ".join(arg_sig_parts))
               
@@ -1432,6 +1676,8 @@ class LLVMActions(MyLangVisitor):
         return ctx.getText()
 
     def error(self, line,  msg):
+       if self.module_stack:
+           line = f"{line} ({os.path.basename(self.module_stack[-1])})"
        print(f"Error, line {line}, {msg}")
        sys.exit(1)
 
@@ -1446,23 +1692,23 @@ class LLVMActions(MyLangVisitor):
         merge_label = self.new_label()
 
         if false_label:
-            LLVMGenerator.if_statement(cond_reg, true_label, false_label)
+            self.gen.if_statement(cond_reg, true_label, false_label)
         else:
-            LLVMGenerator.if_statement(cond_reg, true_label, merge_label)
+            self.gen.if_statement(cond_reg, true_label, merge_label)
 
         # True branch
-        LLVMGenerator.define_label(true_label)
+        self.gen.define_label(true_label)
         self.visit(ctx.block(0))
-        LLVMGenerator.jump_label(merge_label)
+        self.gen.jump_label(merge_label)
 
         # Else branch, if present
         if false_label:
-            LLVMGenerator.define_label(false_label)
+            self.gen.define_label(false_label)
             self.visit(ctx.block(1))
-            LLVMGenerator.jump_label(merge_label)
+            self.gen.jump_label(merge_label)
 
         # Merge label: continue with the code
-        LLVMGenerator.define_label(merge_label)
+        self.gen.define_label(merge_label)
         return None
 
     def visitSimpleFor(self, ctx: MyLangParser.SimpleForContext):
@@ -1479,21 +1725,21 @@ class LLVMActions(MyLangVisitor):
         exit_label = f"for_exit_{loop_id}"
         self.label_counter += 3
 
-        LLVMGenerator.jump_label(cond_label)
+        self.gen.jump_label(cond_label)
 
         # Condition block
-        LLVMGenerator.define_label(cond_label)
+        self.gen.define_label(cond_label)
         if ctx.conditionLabel:
             cond_reg, cond_type = self.visit(ctx.conditionLabel)
             if cond_type != "bool":
                 self.error(ctx.start.line, "Condition must be boolean")
-            LLVMGenerator.if_statement(cond_reg, body_label, exit_label)
+            self.gen.if_statement(cond_reg, body_label, exit_label)
         else:
             # Infinite loop if no condition
-            LLVMGenerator.jump_label(body_label)
+            self.gen.jump_label(body_label)
 
         # Loop body
-        LLVMGenerator.define_label(body_label)
+        self.gen.define_label(body_label)
         self.visit(ctx.blockLabel)
 
         # Handle increment (only assignment allowed)
@@ -1501,10 +1747,10 @@ class LLVMActions(MyLangVisitor):
             self.visit(ctx.operation_assLabel)
 
         # Jump back to condition
-        LLVMGenerator.jump_label(cond_label)
+        self.gen.jump_label(cond_label)
 
         # Exit label
-        LLVMGenerator.define_label(exit_label)
+        self.gen.define_label(exit_label)
         return None
     
     def visitWhileStmt(self, ctx: MyLangParser.WhileStmtContext):
@@ -1516,24 +1762,24 @@ class LLVMActions(MyLangVisitor):
         self.label_counter += 3
 
         # Unconditionally jump to the condition block.
-        LLVMGenerator.jump_label(cond_label)
+        self.gen.jump_label(cond_label)
 
         # Condition block: evaluate the loop condition.
-        LLVMGenerator.define_label(cond_label)
+        self.gen.define_label(cond_label)
         cond_reg, cond_type = self.visit(ctx.expr())
         if cond_type != "bool":
             self.error(ctx.start.line, "While loop condition must be boolean")
         # Branch to body if true, otherwise exit.
-        LLVMGenerator.if_statement(cond_reg, body_label, exit_label)
+        self.gen.if_statement(cond_reg, body_label, exit_label)
 
         # While loop body.
-        LLVMGenerator.define_label(body_label)
+        self.gen.define_label(body_label)
         self.visit(ctx.block())
         # After executing the body, jump back to re-check the condition.
-        LLVMGenerator.jump_label(cond_label)
+        self.gen.jump_label(cond_label)
 
         # Exit point for the loop.
-        LLVMGenerator.define_label(exit_label)
+        self.gen.define_label(exit_label)
         return None
     
     def new_label(self):
@@ -1565,6 +1811,7 @@ class LLVMActions(MyLangVisitor):
     def visitFuncDecl(self, ctx: MyLangParser.FuncDeclContext):
         is_method  = self.class_name is not None
         fname      = f"{self.class_name}_{ctx.ID().getText()}" if is_method else ctx.ID().getText()
+        linkage    = "internal" if ctx.static else ""
 
         self.current_function = fname      
 
@@ -1596,11 +1843,14 @@ class LLVMActions(MyLangVisitor):
         if is_generator:
             self.current_ret_type = (fname, 'generator')
             self._gen_current_type = None
-            LLVMGenerator.enter_generator(f"{fname}.gen")
+            self.gen.enter_generator(f"{fname}.gen")
             self._current_gen_state = 0
         else:
             self.current_ret_type = 'void'
-            LLVMGenerator.enter_function()
+            self.gen.enter_function()
+        self._local_slots.append(not is_generator and not self._block_contains_declarations(ctx.block()))
+        # etykiety numerowane od zera w każdej funkcji (jak rejestry w LLVMGenerator)
+        saved_labels, self.label_counter = self.label_counter, 0
         
         self.variables.append({})
         
@@ -1610,16 +1860,16 @@ class LLVMActions(MyLangVisitor):
                 glob = f"@{fname}_{pn}"
 
                 # deklaracja globalna zgodnie z typem
-                if   pt == "int":          LLVMGenerator.declare_int(glob)
-                elif pt == "float":        LLVMGenerator.declare_float(glob)
-                elif pt == "double":       LLVMGenerator.declare_double(glob)
-                elif pt == "bool":         LLVMGenerator.declare_bool(glob)
-                elif pt == "string":       LLVMGenerator.declare_string(glob)
+                if   pt == "int":          self.gen.declare_int(glob, linkage)
+                elif pt == "float":        self.gen.declare_float(glob, linkage)
+                elif pt == "double":       self.gen.declare_double(glob, linkage)
+                elif pt == "bool":         self.gen.declare_bool(glob, linkage)
+                elif pt == "string":       self.gen.declare_string(glob, linkage=linkage)
                 elif isinstance(pt, tuple): 
                     sizes, elem = pt
-                    elem_llvm  = LLVMGenerator.llvm_type(elem)
-                    arr_llvm   = LLVMGenerator.build_array(elem_llvm, sizes)
-                    LLVMGenerator.declare_raw(f"@{fname}_{pn}", f"{arr_llvm} zeroinitializer")
+                    elem_llvm  = self.gen.llvm_type(elem)
+                    arr_llvm   = self.gen.build_array(elem_llvm, sizes)
+                    self.gen.declare_global(f"@{fname}_{pn}", arr_llvm, "zeroinitializer", linkage)
                     self.variables[-1][pn] = VariableInfo(f"@{fname}_{pn}", pt)
 
                 else:
@@ -1658,21 +1908,26 @@ class LLVMActions(MyLangVisitor):
                         f"Nieznany typ zwracany przez generator: {llvm_t}")
 
             self.gen_elem_type[fname] = elem_t
-            LLVMGenerator.finish_generator(fname,
+            self.gen.finish_generator(fname,
                                         self._current_gen_state,
-                                        llvm_t)
-            LLVMGenerator.gen_wrapper(fname, params)
+                                        llvm_t, linkage)
+            self.gen.gen_wrapper(fname, params, linkage)
         else:
-            LLVMGenerator.exit_function(fname, params_sig,
-                                        self.getLLVMType(self.current_ret_type))
+            self.gen.exit_function(fname, params_sig,
+                                        self.getLLVMType(self.current_ret_type), linkage)
+        self._local_slots.pop()
+        self.label_counter = saved_labels
         
         self.scope_history.append(self.variables.pop())
         
         self.functions[fname] = dict(ret=self.current_ret_type, params=[t for _, t in params])
+        static_module = self._current_module() if ctx.static else None
         if is_method:
             self.classes[self.class_name]['methods_map'][ctx.ID().getText()] = (
                 self.current_ret_type, [t for _, t in params[1:]])
-        self.variables[-1][fname] = VariableInfo(f"@{fname}", "func")
+            if ctx.static:
+                self.classes[self.class_name]['static_methods'][ctx.ID().getText()] = static_module
+        self.variables[-1][fname] = VariableInfo(f"@{fname}", "func", static_module)
         return None
 
     def visitReturnStmt(self, ctx: MyLangParser.ReturnStmtContext):
@@ -1680,11 +1935,10 @@ class LLVMActions(MyLangVisitor):
             val_reg, val_type = self.visit(ctx.expr())
             self.current_ret_type = val_type
             llvm_t = self.getLLVMType(val_type)
-            LLVMGenerator.buffor_stack[-1].append(
-                f"ret {llvm_t} {val_reg}")
+            self.gen.return_value(llvm_t, val_reg)
         else:
             self.current_ret_type = 'void'
-            LLVMGenerator.buffor_stack[-1].append("ret void")
+            self.gen.return_void()
 
     def visitArgumentList(self, ctx):
         values = []
@@ -1714,7 +1968,7 @@ class LLVMActions(MyLangVisitor):
                 gen_name = info.type_info[0]              # np. 'oddNumbers'
 
                 if obj_ptr.startswith('@'):
-                    load_reg = LLVMGenerator.get_gen_ptr(obj_ptr, gen_name)
+                    load_reg = self.gen.get_gen_ptr(obj_ptr, gen_name)
                     obj_ptr  = f"%{load_reg}"             # %oddNumbers.gen*
 
                 hidden = [(obj_ptr, (gen_name, 'generator'))]
@@ -1724,7 +1978,7 @@ class LLVMActions(MyLangVisitor):
                 cls_name = self.get_class_name(obj_ptr)
 
                 if obj_ptr.startswith('@'):
-                    load_reg = LLVMGenerator.get_class_ptr(obj_ptr, cls_name)
+                    load_reg = self.gen.get_class_ptr(obj_ptr, cls_name)
                     obj_ptr  = f"%{load_reg}"             # %class.C*
 
                 hidden = [(obj_ptr, (cls_name, 'class'))]
@@ -1744,7 +1998,7 @@ class LLVMActions(MyLangVisitor):
                 if tag == 'struct':
                     llvm_t = f"%struct.{at[0]}*"
                 elif tag == 'class':
-                    load_reg  = LLVMGenerator.get_class_ptr(aval, at[0])
+                    load_reg  = self.gen.get_class_ptr(aval, at[0])
                     aval = f"%{load_reg}"
                     llvm_t = f"%class.{at[0]}*"
                 elif tag == 'generator':                       #  << NOWE >>
@@ -1758,10 +2012,10 @@ class LLVMActions(MyLangVisitor):
         arg_sig = ", ".join(arg_sig_parts)
 
         if ret_t == 'void':
-            LLVMGenerator.call_void_function(llvm_ret, fname, arg_sig)
+            self.gen.call_void_function(llvm_ret, fname, arg_sig)
             return (0, "bool")
         else:
-            call_reg = LLVMGenerator.call_return_function(llvm_ret, fname, arg_sig)
+            call_reg = self.gen.call_return_function(llvm_ret, fname, arg_sig)
             return (f"%{call_reg}", ret_t)
 
     def visitStructMember(self, ctx):
@@ -1804,7 +2058,7 @@ class LLVMActions(MyLangVisitor):
 
         struct_name = f"%struct.{sname}"
 
-        LLVMGenerator.define_struct(struct_name, llvm_fields)
+        self.gen.define_struct(struct_name, llvm_fields)
         
         return None
     
@@ -1824,7 +2078,7 @@ class LLVMActions(MyLangVisitor):
             idx = len(llvm_tys)
             self.classes[class_name]['fields_map'][fld.ID().getText()] = (idx, fty)
             llvm_tys.append(self.getLLVMType(fty))
-        LLVMGenerator.define_class(class_name, llvm_tys)
+        self.gen.define_class(class_name, llvm_tys)
         self.classes[class_name]['size'] = 8 * len(llvm_tys)
 
         for fld in ctx.fieldDecl():
@@ -1843,7 +2097,7 @@ class LLVMActions(MyLangVisitor):
         # for field_name, (idx, field_type) in self.classes[class_name]["fields_map"].items():
         #     # compute the GEP for field_ptr = getelementptr %class.C, %class.C* %this, 0, idx
         #     # and bitcast it to the element pointer if you like; we'll just call your helper:
-        #     ptr_reg = LLVMGenerator.get_class_field_ptr("this", class_name, idx)
+        #     ptr_reg = self.gen.get_class_field_ptr("this", class_name, idx)
 
         #     # record a VariableInfo so that get_data_from_Scope("x") → uses %<ptr_reg>
         #     self.variables[-1][field_name] = VariableInfo(
@@ -1880,12 +2134,16 @@ class LLVMActions(MyLangVisitor):
         params_sig = ", ".join(param_sig_parts)
 
         self.variables.append({})
-        LLVMGenerator.enter_function()
+        self.gen.enter_function()
+        self._local_slots.append(not self._block_contains_declarations(ctx.block()))
+        saved_labels, self.label_counter = self.label_counter, 0
         for pn, pt in params:
             self.create_shadow_copy(pn, (f"%{pn}", pt), ctx)
         
         self.visit(ctx.block())
-        LLVMGenerator.exit_function(fname, params_sig, "void")
+        self.gen.exit_function(fname, params_sig, "void")
+        self._local_slots.pop()
+        self.label_counter = saved_labels
         self.scope_history.append(self.variables.pop())
         return None
     
@@ -1926,6 +2184,15 @@ class LLVMActions(MyLangVisitor):
                 return True
         return False
 
+    def _block_contains_declarations(self, node):
+        # zagnieżdżona funkcja/klasa widzi zmienne otaczającej funkcji – te muszą zostać globalami
+        if isinstance(node, (MyLangParser.FuncDeclContext, MyLangParser.ClassDeclContext)):
+            return True
+        if not hasattr(node, "getChildCount"):
+            return False
+        return any(self._block_contains_declarations(node.getChild(i))
+                   for i in range(node.getChildCount()))
+
     def visitYieldStmt(self, ctx: MyLangParser.YieldStmtContext):
         val_reg, val_type = self.visit(ctx.expr())
         llvm_t = self.getLLVMType(val_type)
@@ -1933,10 +2200,10 @@ class LLVMActions(MyLangVisitor):
         # ► jeżeli jeszcze nie zdefiniowaliśmy struct-a z tym typem
         if self._gen_current_type is None:
             self._gen_current_type = llvm_t
-            LLVMGenerator.define_generator_struct(self.current_function, llvm_t)
+            self.gen.define_generator_struct(self.current_function, llvm_t)
 
         state_id = self._current_gen_state
         self._current_gen_state += 1
 
-        LLVMGenerator.emit_yield(llvm_t, val_reg, state_id)
+        self.gen.emit_yield(llvm_t, val_reg, state_id)
         return (0, "void")
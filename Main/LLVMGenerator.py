@@ -1,227 +1,237 @@
 from antlr4 import *
+import hashlib
+import io
 import sys
+from IRModel import Branch, Function, Global, Instruction, Module, Phi, Switch, TypeDef, write_items, write_lines
+from IRPasses import live_items, simplify_function
 
 class LLVMGenerator:
-    header_text = []
-    reg = 1
-    str_counter = 1
-    buffor_stack = [[]]
-
-    @staticmethod
-    def reset():
-        LLVMGenerator.header_text = []
-        LLVMGenerator.reg = 1
-        LLVMGenerator.str_counter = 1
-        LLVMGenerator.buffor_stack = [[]]
+    """
+    Stan jednej kompilacji (moduł IR, stos emitowanych funkcji, liczniki).
+    Każdy LLVMActions ma własną instancję, więc kilka kompilacji może działać
+    równocześnie w jednym procesie (wątki serwera) bez wspólnej blokady.
+
+    Emitery budują model z IRModel (funkcje → bloki → instrukcje);
+    tekst .ll powstaje dopiero w write().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.module = Module()
+        self.reg = 1
+        self.str_counter = 1
+        # licznik rejestrów main na czas emisji funkcji (każda numeruje od 1)
+        self._saved_regs = []
+        # [main, ...funkcje w trakcie emisji]; instrukcje trafiają do ostatniej
+        self.function_stack = [self.module.main]
+        # generator (yield), którego ciało jest właśnie emitowane
+        self._active_gen = None
+        self._state_cases = []
+        self._dispatch = None
+
+    def _emit(self, opcode, args="", result=None):
+        self.function_stack[-1].append(Instruction(opcode, args, result))
+
+    def _declare(self, name, value_type, init, kind="global", linkage=""):
+        item = Global(name, value_type, init, kind, linkage)
+        self.module.items.append(item)
+        return item
 
     # region Primitive Types
 
     # region Declarations
 
-    @staticmethod
-    def declare_int(var_name):
-        LLVMGenerator.header_text.append(f"{var_name} = global i32 0")
+    def declare_int(self, var_name, linkage=""):
+        self._declare(var_name, "i32", "0", linkage=linkage)
 
-    @staticmethod
-    def declare_float(var_name):
-        LLVMGenerator.header_text.append(f"{var_name} = global float 0.0")
+    def declare_float(self, var_name, linkage=""):
+        self._declare(var_name, "float", "0.0", linkage=linkage)
 
-    @staticmethod
-    def declare_double(var_name):
-        LLVMGenerator.header_text.append(f"{var_name} = global double 0.0")
+    def declare_double(self, var_name, linkage=""):
+        self._declare(var_name, "double", "0.0", linkage=linkage)
 
-    @staticmethod
-    def declare_string(var_name, size=256):
-        LLVMGenerator.header_text.append(f"{var_name} = global i8* null")
+    def declare_string(self, var_name, size=256, linkage=""):
+        self._declare(var_name, "i8*", "null", linkage=linkage)
 
-    @staticmethod
-    def declare_bool(var_name):
-        LLVMGenerator.header_text.append(f"{var_name} = global i1 false")
+    def declare_bool(self, var_name, linkage=""):
+        self._declare(var_name, "i1", "false", linkage=linkage)
+
+    def declare_local(self, var_name, llvm_type, zero=None):
+        """
+        Zmienna lokalna funkcji: alloca w bloku wejściowym (mem2reg/SROA zrobią z niej
+        rejestr SSA), a w miejscu deklaracji opcjonalnie zerowanie – tak jak globale.
+        """
+        self.function_stack[-1].add_alloca(Instruction("alloca", llvm_type, var_name))
+        if zero is not None:
+            self._emit("store", f"{llvm_type} {zero}, {llvm_type}* {var_name}")
 
     # endregion
     
     # region Assignments
-    @staticmethod
-    def assign_int(var_name, value):
-        LLVMGenerator.buffor_stack[-1].append(f"store i32 {value}, i32* {var_name}")
+    def assign_int(self, var_name, value):
+        self._emit("store", f"i32 {value}, i32* {var_name}")
 
-    @staticmethod
-    def assign_float(var_name, value):
-        LLVMGenerator.buffor_stack[-1].append(f"store float {value}, float* {var_name}")
+    def assign_float(self, var_name, value):
+        self._emit("store", f"float {value}, float* {var_name}")
 
-    @staticmethod
-    def assign_double(var_name, value):
-        LLVMGenerator.buffor_stack[-1].append(f"store double {value}, double* {var_name}")
+    def assign_double(self, var_name, value):
+        self._emit("store", f"double {value}, double* {var_name}")
 
-    @staticmethod
-    def assign_string(var_name, value):
-        LLVMGenerator.buffor_stack[-1].append(f"store i8* {value}, i8** {var_name}")
+    def assign_string(self, var_name, value):
+        self._emit("store", f"i8* {value}, i8** {var_name}")
 
-    @staticmethod
-    def assign_bool(var_name, value):
-        LLVMGenerator.buffor_stack[-1].append(f"store i1 {value}, i1* {var_name}")
+    def assign_bool(self, var_name, value):
+        self._emit("store", f"i1 {value}, i1* {var_name}")
 
     # endregion
     
     # region Loads
-    @staticmethod
-    def load_int(var_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = load i32, i32* {var_name}")
-        LLVMGenerator.reg += 1
+    def load_int(self, var_name):
+        reg = self.reg
+        self._emit("load", f"i32, i32* {var_name}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def load_bool(var_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = load i1, i1* {var_name}")
-        LLVMGenerator.reg += 1
+    def load_bool(self, var_name):
+        reg = self.reg
+        self._emit("load", f"i1, i1* {var_name}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def load_float(var_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = load float, float* {var_name}")
-        LLVMGenerator.reg += 1
+    def load_float(self, var_name):
+        reg = self.reg
+        self._emit("load", f"float, float* {var_name}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def load_double(var_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = load double, double* {var_name}")
-        LLVMGenerator.reg += 1
+    def load_double(self, var_name):
+        reg = self.reg
+        self._emit("load", f"double, double* {var_name}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def load_string(var_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = load i8*, i8** {var_name}")
-        LLVMGenerator.reg += 1
+    def load_string(self, var_name):
+        reg = self.reg
+        self._emit("load", f"i8*, i8** {var_name}", reg)
+        self.reg += 1
         return reg
 
     # endregion
 
     # region Projections
-    @staticmethod
-    def int_to_float(reg_val):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = sitofp i32 {reg_val} to float")
-        LLVMGenerator.reg += 1
+    def int_to_float(self, reg_val):
+        reg = self.reg
+        self._emit("sitofp", f"i32 {reg_val} to float", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def float_to_double(reg_val):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fpext float {reg_val} to double")
-        LLVMGenerator.reg += 1
+    def float_to_double(self, reg_val):
+        reg = self.reg
+        self._emit("fpext", f"float {reg_val} to double", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def float_to_int(reg_val):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fptosi float {reg_val} to i32")
-        LLVMGenerator.reg += 1
+    def float_to_int(self, reg_val):
+        reg = self.reg
+        self._emit("fptosi", f"float {reg_val} to i32", reg)
+        self.reg += 1
         return reg
     
-    @staticmethod
-    def int_to_double(reg_val):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = sitofp i32 {reg_val} to double")
-        LLVMGenerator.reg += 1
+    def int_to_double(self, reg_val):
+        reg = self.reg
+        self._emit("sitofp", f"i32 {reg_val} to double", reg)
+        self.reg += 1
+        return reg
+
+    def double_to_int(self, reg_val):
+        reg = self.reg
+        self._emit("fptosi", f"double {reg_val} to i32", reg)
+        self.reg += 1
+        return reg
+
+    def double_to_float(self, reg_val):
+        reg = self.reg
+        self._emit("fptrunc", f"double {reg_val} to float", reg)
+        self.reg += 1
+        return reg
+
+    def bool_to_int(self, reg_val):
+        reg = self.reg
+        self._emit("zext", f"i1 {reg_val} to i32", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def double_to_int(reg_val):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fptosi double {reg_val} to i32")
-        LLVMGenerator.reg += 1
+    def int_to_bool(self, reg_val):
+        reg = self.reg
+        self._emit("icmp", f"ne i32 {reg_val}, 0", reg)
+        self.reg += 1
+        return reg
+
+    def real_to_bool(self, reg_val, type_str):
+        reg = self.reg
+        self._emit("fcmp", f"une {type_str} {reg_val}, 0.0", reg)
+        self.reg += 1
         return reg
     # endregion
 
     # region Reads
-    @staticmethod
-    def read_int(var_name):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([3 x i8], [3 x i8]* @stri, i32 0, i32 0), i32* {var_name})"
-        )
-        LLVMGenerator.reg += 1
+    def read_int(self, var_name):
+        self._emit("call", f"i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([3 x i8], [3 x i8]* @stri, i32 0, i32 0), i32* {var_name})", self.reg)
+        self.reg += 1
 
-    @staticmethod
-    def read_float(var_name):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strf, i32 0, i32 0), float* {var_name})"
-        )
-        LLVMGenerator.reg += 1
+    def read_float(self, var_name):
+        self._emit("call", f"i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strf, i32 0, i32 0), float* {var_name})", self.reg)
+        self.reg += 1
 
-    @staticmethod
-    def read_double(var_name):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strlf, i32 0, i32 0), double* {var_name})"
-        )
-        LLVMGenerator.reg += 1
+    def read_double(self, var_name):
+        self._emit("call", f"i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strlf, i32 0, i32 0), double* {var_name})", self.reg)
+        self.reg += 1
 
 
-    @staticmethod
-    def read_string(var_name, size=256):
+    def read_string(self, var_name, size=256):
         # Alokacja bloku pamięci dla danych typu string (256 bajtów)
-        LLVMGenerator.header_text.append(f"@str{LLVMGenerator.str_counter} = global [{size} x i8] zeroinitializer")
+        self._declare(f"@str{self.str_counter}", f"[{size} x i8]", "zeroinitializer")
         # Pobranie wskaźnika do początku bloku
-        LLVMGenerator.buffor_stack[-1].append(f"%ptr_str{LLVMGenerator.str_counter} = getelementptr inbounds [{size} x i8], [{size} x i8]* @str{LLVMGenerator.str_counter}, i32 0, i32 0")
+        self._emit("getelementptr", f"inbounds [{size} x i8], [{size} x i8]* @str{self.str_counter}, i32 0, i32 0",
+                   f"%ptr_str{self.str_counter}")
         # Przypisanie wskaźnika do zmiennej
-        LLVMGenerator.buffor_stack[-1].append(f"store i8* %ptr_str{LLVMGenerator.str_counter}, i8** {var_name}")
+        self._emit("store", f"i8* %ptr_str{self.str_counter}, i8** {var_name}")
         # Wywołanie scanf – używamy formatu "%255s" (256 bajtów łącznie)
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strs, i32 0, i32 0), i8* %ptr_str{LLVMGenerator.str_counter})"
-        )
-        LLVMGenerator.reg += 1
-        LLVMGenerator.str_counter += 1
+        self._emit("call", f"i32 (i8*, ...) @scanf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strs, i32 0, i32 0), i8* %ptr_str{self.str_counter})", self.reg)
+        self.reg += 1
+        self.str_counter += 1
     # endregion
     
     # region Prints
-    @staticmethod
-    def print_int(reg_val):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_int, i32 0, i32 0), i32 {reg_val})"
-        )
-        LLVMGenerator.reg += 1
+    def print_int(self, reg_val):
+        self._emit("call", f"i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_int, i32 0, i32 0), i32 {reg_val})", self.reg)
+        self.reg += 1
 
-    @staticmethod
-    def print_float(reg_val):
-        reg_ext = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg_ext} = fpext float {reg_val} to double"
-        )
-        LLVMGenerator.reg += 1
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strp_double, i32 0, i32 0), i32 9, double %{reg_ext})"
-        )
-        LLVMGenerator.reg += 1
+    def print_float(self, reg_val):
+        reg_ext = self.reg
+        self._emit("fpext", f"float {reg_val} to double", reg_ext)
+        self.reg += 1
+        self._emit("call", f"i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strp_double, i32 0, i32 0), i32 9, double %{reg_ext})", self.reg)
+        self.reg += 1
 
 
-    @staticmethod
-    def print_double(reg_val):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strp_double, i32 0, i32 0), i32 17, double {reg_val})"
-        )
-        LLVMGenerator.reg += 1
+    def print_double(self, reg_val):
+        self._emit("call", f"i32 (i8*, ...) @printf(i8* getelementptr inbounds ([6 x i8], [6 x i8]* @strp_double, i32 0, i32 0), i32 17, double {reg_val})", self.reg)
+        self.reg += 1
 
-    @staticmethod
-    def print_string(reg_val):
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_str, i32 0, i32 0), i8* {reg_val})"
-        )
-        LLVMGenerator.reg += 1
+    def print_string(self, reg_val):
+        self._emit("call", f"i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_str, i32 0, i32 0), i8* {reg_val})", self.reg)
+        self.reg += 1
 
-    @staticmethod
-    def print_bool(reg_val):
+    def print_bool(self, reg_val):
         # Since printf may not support i1 directly, extend it to i32:
-        reg_int = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg_int} = zext i1 {reg_val} to i32")
-        LLVMGenerator.reg += 1
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{LLVMGenerator.reg} = call i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_int, i32 0, i32 0), i32 %{reg_int})"
-        )
-        LLVMGenerator.reg += 1
+        reg_int = self.reg
+        self._emit("zext", f"i1 {reg_val} to i32", reg_int)
+        self.reg += 1
+        self._emit("call", f"i32 (i8*, ...) @printf(i8* getelementptr inbounds ([4 x i8], [4 x i8]* @strp_int, i32 0, i32 0), i32 %{reg_int})", self.reg)
+        self.reg += 1
 
 
     # endregion
@@ -230,553 +240,474 @@ class LLVMGenerator:
 
     # region Arrays
 
-    @staticmethod
-    def build_array(element_type, sizes):
+    def build_array(self, element_type, sizes):
         if not isinstance(sizes, tuple):
             sizes = (sizes, )
         if len(sizes) == 0:
             return element_type
         else:
-            return f"[{sizes[0]} x {LLVMGenerator.build_array(element_type, sizes[1:])}]"   
+            return f"[{sizes[0]} x {self.build_array(element_type, sizes[1:])}]"   
 
-    @staticmethod
-    def declare_array(var_name, element_type, sizes):
-        array = LLVMGenerator.build_array(element_type, sizes)
-        LLVMGenerator.header_text.append(f"{var_name} = global {array} zeroinitializer")
+    def declare_array(self, var_name, element_type, sizes, linkage=""):
+        array = self.build_array(element_type, sizes)
+        self._declare(var_name, array, "zeroinitializer", linkage=linkage)
 
-    @staticmethod
-    def get_array_element_ptr(var_name, indices, element_type, sizes):
-        array = LLVMGenerator.build_array(element_type, sizes)
-        reg = LLVMGenerator.reg
+    def get_array_element_ptr(self, var_name, indices, element_type, sizes):
+        array = self.build_array(element_type, sizes)
+        reg = self.reg
         if not isinstance(indices, list):
             indices = [indices]
         all_indices = [0] + indices
         indices_str = ", ".join([f"i32 {idx}" for idx in all_indices])
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = getelementptr inbounds {array}, {array}* {var_name}, {indices_str}"
-        )
-        LLVMGenerator.reg += 1
+        self._emit("getelementptr", f"inbounds {array}, {array}* {var_name}, {indices_str}", reg)
+        self.reg += 1
         return reg
     
-    @staticmethod
-    def store_array_element(var_name, indices, value, element_type, sizes):
-        ptr_reg = LLVMGenerator.get_array_element_ptr(var_name, indices, element_type, sizes)
-        LLVMGenerator.buffor_stack[-1].append(
-            f"store {element_type} {value}, {element_type}* %{ptr_reg}"
-        )
+    def store_array_element(self, var_name, indices, value, element_type, sizes):
+        ptr_reg = self.get_array_element_ptr(var_name, indices, element_type, sizes)
+        self._emit("store", f"{element_type} {value}, {element_type}* %{ptr_reg}")
         return ptr_reg
 
-    @staticmethod
-    def load_array_element(element_type, ptr_reg):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = load {element_type}, {element_type}* %{ptr_reg}"
-        )
-        LLVMGenerator.reg += 1
+    def load_array_element(self, element_type, ptr_reg):
+        reg = self.reg
+        self._emit("load", f"{element_type}, {element_type}* %{ptr_reg}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def memcpy(dest, src, total_size, align, src_type):
-        reg_src_cast = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg_src_cast} = bitcast {src_type}* {src} to i8*"
-        )
-        LLVMGenerator.reg += 1
+    def memcpy(self, dest, src, total_size, align, src_type):
+        reg_src_cast = self.reg
+        self._emit("bitcast", f"{src_type}* {src} to i8*", reg_src_cast)
+        self.reg += 1
 
-        LLVMGenerator.buffor_stack[-1].append(
-            f"call void @llvm.memcpy.p0i8.p0i8.i64(i8* align {align} {dest}, i8* align {align} %{reg_src_cast}, i64 {total_size}, i1 false)"
-        )
+        self._emit("call", f"void @llvm.memcpy.p0i8.p0i8.i64(i8* align {align} {dest}, i8* align {align} %{reg_src_cast}, i64 {total_size}, i1 false)")
 
     #endregion
 
     # region Strings
-    @staticmethod
-    def constant_string(value):
+    def constant_string(self, value):
+        """
+        Zwraca i8* na literał z puli: każdy różny literał to jedna stała
+        `private unnamed_addr` (nazwa ze skrótu treści, więc niezależna od kolejności),
+        używana bezpośrednio – bez kopii i memcpy przy każdym wykonaniu.
+        Język nie zapisuje do napisów (read() dostaje własny bufor), więc kopia
+        modyfikowalna nie jest potrzebna.
+        """
         # Długość łańcucha + 1 (na znak null)
         l = len(value) + 1
-        str_id = LLVMGenerator.str_counter
-
-        # Globalna stała zawierająca łańcuch znaków
-        LLVMGenerator.header_text.append(
-            f'@const_str{str_id} = constant [{l} x i8] c"{value}\\00"'
-        )
-
-        # Globalna zmienna (kopii) — zeroinicjalizowana
-        LLVMGenerator.header_text.append(
-            f"@str{str_id} = global [{l} x i8] zeroinitializer"
-        )
-
-        # W funkcji main kopiujemy zawartość stałej do zmiennej globalnej
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%tmp{str_id} = bitcast [{l} x i8]* @str{str_id} to i8*"
-        )
-        LLVMGenerator.buffor_stack[-1].append(
-            f"call void @llvm.memcpy.p0i8.p0i8.i64("
-            f"i8* align 1 %tmp{str_id}, "
-            f"i8* align 1 getelementptr inbounds ([{l} x i8], [{l} x i8]* @const_str{str_id}, i32 0, i32 0), "
-            f"i64 {l}, i1 false)"
-        )
-
-        LLVMGenerator.str_counter += 1
-        return f"@str{str_id}"
+        name = f"@.str.{hashlib.sha1(value.encode('utf-8')).hexdigest()[:12]}"
+        if name not in self.module.strings:
+            self.module.strings[name] = Global(name, f"[{l} x i8]", f'c"{value}\\00"',
+                                               "constant", "private unnamed_addr")
+        return f"getelementptr inbounds ([{l} x i8], [{l} x i8]* {name}, i32 0, i32 0)"
+
+    def add_strings(self, globals_):
+        """Dokleja stałe napisów z innego przebiegu (IRCache), pomijając te już obecne w puli."""
+        for item in globals_:
+            self.module.strings.setdefault(item.name, item)
     
     #endregion
 
     # region math operations
-    @staticmethod
-    def sub_int(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = sub i32 {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def sub_int(self, reg1, reg2):
+        reg = self.reg
+        self._emit("sub", f"i32 {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def sub_float(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fsub float {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def sub_float(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fsub", f"float {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def sub_double(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fsub double {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def sub_double(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fsub", f"double {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
   
-    @staticmethod
-    def mul_int(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = mul i32 {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def mul_int(self, reg1, reg2):
+        reg = self.reg
+        self._emit("mul", f"i32 {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def mul_float(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fmul float {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def mul_float(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fmul", f"float {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def mul_double(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fmul double {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def mul_double(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fmul", f"double {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def div_int(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = sdiv i32 {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def div_int(self, reg1, reg2):
+        reg = self.reg
+        self._emit("sdiv", f"i32 {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def div_float(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fdiv float {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def div_float(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fdiv", f"float {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def div_double(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fdiv double {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def div_double(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fdiv", f"double {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
 
-    @staticmethod
-    def add_int(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = add i32 {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def add_int(self, reg1, reg2):
+        reg = self.reg
+        self._emit("add", f"i32 {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def add_float(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fadd float {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def add_float(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fadd", f"float {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def add_double(reg1, reg2):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fadd double {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def add_double(self, reg1, reg2):
+        reg = self.reg
+        self._emit("fadd", f"double {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
 
     # endregion
 
     # region Logical operations
 
-    @staticmethod
-    def or_expr(reg1, rhs_builder):
-        reg = LLVMGenerator.reg
+    def or_expr(self, reg1, rhs_builder):
+        reg = self.reg
         end_label = f"or_end_{reg}"
         true_label = f"or_true_{reg}"
         rhs_label = f"or_rhs_{reg}"
 
-        LLVMGenerator.buffor_stack[-1].append(f"br i1 {reg1}, label %{true_label}, label %{rhs_label}")
+        self.if_statement(reg1, true_label, rhs_label)
         
-        LLVMGenerator.buffor_stack[-1].append(f"{true_label}:")
-        LLVMGenerator.buffor_stack[-1].append(f"br label %{end_label}")
-        LLVMGenerator.buffor_stack[-1].append(f"{rhs_label}:")
+        self.define_label(true_label)
+        self.jump_label(end_label)
+        self.define_label(rhs_label)
         rhs_reg = rhs_builder()
-        LLVMGenerator.buffor_stack[-1].append(f"br label %{end_label}")
-        LLVMGenerator.buffor_stack[-1].append(f"{end_label}:")
+        # prawa strona mogła otworzyć własne bloki (zagnieżdżone OR/AND)
+        rhs_end = self.function_stack[-1].blocks[-1].label
+        self.jump_label(end_label)
+        self.define_label(end_label)
 
-        phi_reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{phi_reg} = phi i1 [ 1, %{true_label} ], [ {rhs_reg}, %{rhs_label} ]")  
+        phi_reg = self.reg
+        self.function_stack[-1].append(Phi(phi_reg, "i1", [(1, true_label), (rhs_reg, rhs_end)]))
 
-        LLVMGenerator.reg += 1
+        self.reg += 1
 
         return phi_reg
     
-    @staticmethod
-    def and_expr(reg1, rhs_builder):
-        reg = LLVMGenerator.reg
+    def and_expr(self, reg1, rhs_builder):
+        reg = self.reg
         end_label = f"and_end_{reg}"
         rhs_label = f"and_rhs_{reg}"
         false_label = f"and_false_{reg}"
 
-        LLVMGenerator.buffor_stack[-1].append(f"br i1 {reg1}, label %{rhs_label}, label %{false_label}")
+        self.if_statement(reg1, rhs_label, false_label)
 
-        LLVMGenerator.buffor_stack[-1].append(f"{false_label}:")
-        LLVMGenerator.buffor_stack[-1].append(f"br label %{end_label}")
-        LLVMGenerator.buffor_stack[-1].append(f"{rhs_label}:")
+        self.define_label(false_label)
+        self.jump_label(end_label)
+        self.define_label(rhs_label)
         rhs_reg = rhs_builder()
-        LLVMGenerator.buffor_stack[-1].append(f"br label %{end_label}")
-        LLVMGenerator.buffor_stack[-1].append(f"{end_label}:")
+        rhs_end = self.function_stack[-1].blocks[-1].label
+        self.jump_label(end_label)
+        self.define_label(end_label)
 
-        phi_reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{phi_reg} = phi i1 [ 0, %{false_label} ], [ {rhs_reg}, %{rhs_label} ]")  
+        phi_reg = self.reg
+        self.function_stack[-1].append(Phi(phi_reg, "i1", [(0, false_label), (rhs_reg, rhs_end)]))
 
-        LLVMGenerator.reg += 1
+        self.reg += 1
 
         return phi_reg
     
-    @staticmethod
-    def xor_expr(reg1, reg2):
-        reg = LLVMGenerator.reg
+    def xor_expr(self, reg1, reg2):
+        reg = self.reg
 
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = xor i1 {reg1}, {reg2}")
+        self._emit("xor", f"i1 {reg1}, {reg2}", reg)
 
-        LLVMGenerator.reg += 1
+        self.reg += 1
 
         return reg
 
-    @staticmethod
-    def neg_expr(reg1):
-        reg = LLVMGenerator.reg
+    def neg_expr(self, reg1):
+        reg = self.reg
 
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = xor i1 {reg1}, 1")
+        self._emit("xor", f"i1 {reg1}, 1", reg)
 
-        LLVMGenerator.reg += 1
+        self.reg += 1
 
         return reg
 
-    @staticmethod
-    def eq_expr_int(condition, reg1, reg2, type_str):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = icmp {condition} {type_str} {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def eq_expr_int(self, condition, reg1, reg2, type_str):
+        reg = self.reg
+        self._emit("icmp", f"{condition} {type_str} {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
     
-    @staticmethod
-    def eq_expr_f_db(condition, reg1, reg2, type_str):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = fcmp {condition} {type_str} {reg1}, {reg2}")
-        LLVMGenerator.reg += 1
+    def eq_expr_f_db(self, condition, reg1, reg2, type_str):
+        reg = self.reg
+        self._emit("fcmp", f"{condition} {type_str} {reg1}, {reg2}", reg)
+        self.reg += 1
         return reg
     
     # endregion
     
     # region Ifs and loops
     
-    @staticmethod
-    def if_statement(cond_reg, true_label, false_label):
-        LLVMGenerator.buffor_stack[-1].append(f"br i1 {cond_reg}, label %{true_label}, label %{false_label}")
+    def if_statement(self, cond_reg, true_label, false_label):
+        self.function_stack[-1].append(Branch(true_label, false_label, cond=cond_reg))
         
-    @staticmethod
-    def define_label(label):
-        LLVMGenerator.buffor_stack[-1].append(f"{label}:")
-
-    @staticmethod
-    def jump_label(label):
-        LLVMGenerator.buffor_stack[-1].append(f"br label %{label}")
-
-    @staticmethod
-    def strcmp_call(left_reg, right_reg):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = call i32 @strcmp(i8* {left_reg}, i8* {right_reg})"
-        )
-        LLVMGenerator.reg += 1
+    def define_label(self, label):
+        self.function_stack[-1].start_block(label)
+
+    def jump_label(self, label):
+        self.function_stack[-1].append(Branch(label))
+
+    def strcmp_call(self, left_reg, right_reg):
+        reg = self.reg
+        self._emit("call", f"i32 @strcmp(i8* {left_reg}, i8* {right_reg})", reg)
+        self.reg += 1
         
         return reg
             
     # endregion
 
     # region funcion
-    @staticmethod
-    def enter_function():
-        LLVMGenerator.buffor_stack.append([])
-
-    @staticmethod
-    def exit_function(name, params_sig, ret_type):
-        body = LLVMGenerator.buffor_stack.pop()
-        
-        terminators = ("ret", "br", "switch", "resume", "unreachable")
-        if not body or not body[-1].lstrip().startswith(terminators):
+    def enter_function(self):
+        # rejestry numerowane od 1 w każdej funkcji – jej IR nie zależy od kodu przed nią
+        self._saved_regs.append(self.reg)
+        self.reg = 1
+        self.function_stack.append(Function())
+
+    def exit_function(self, name, params_sig, ret_type, linkage=""):
+        function = self.function_stack.pop()
+        function.name, function.params, function.ret_type = name, params_sig, ret_type
+        function.linkage = linkage
+        self.reg = self._saved_regs.pop()
+
+        last = function.last_instruction
+        if last is None or not last.is_terminator:
             if ret_type == "void":
-                body.append("ret void")
+                function.append(Instruction("ret", "void"))
             else:
-                body.append(f"ret {ret_type} undef")
-        
-        LLVMGenerator.header_text.append(f"define {ret_type} @{name}({params_sig}) {{")
-        for instr in body:
-            LLVMGenerator.header_text.append("  " + instr)
-        LLVMGenerator.header_text.append("}")
-        
+                function.append(Instruction("ret", f"{ret_type} undef"))
+
+        simplify_function(function)
+        self.module.items.append(function)
+
+    def return_value(self, llvm_type, value):
+        self._emit("ret", f"{llvm_type} {value}")
+
+    def return_void(self):
+        self._emit("ret", "void")
+
+    def store(self, llvm_type, value, ptr):
+        self._emit("store", f"{llvm_type} {value}, {llvm_type}* {ptr}")
+
     
-    @staticmethod
-    def call_void_function(llvm_ret, fname, arg_sig):
-        LLVMGenerator.buffor_stack[-1].append(f"call {llvm_ret} {fname}({arg_sig})")
+    def call_void_function(self, llvm_ret, fname, arg_sig):
+        self._emit("call", f"{llvm_ret} {fname}({arg_sig})")
         
-    @staticmethod
-    def call_return_function(llvm_ret, fname, arg_sig):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg} = call {llvm_ret} {fname}({arg_sig})")
-        LLVMGenerator.reg += 1
+    def call_return_function(self, llvm_ret, fname, arg_sig):
+        reg = self.reg
+        self._emit("call", f"{llvm_ret} {fname}({arg_sig})", reg)
+        self.reg += 1
         return reg
     
     # endregion
             
     # region Structures
     
-    @staticmethod
-    def define_struct(struct_name, struct_elems):
-        LLVMGenerator.header_text.append(f"{struct_name} = type {{ {', '.join(struct_elems)} }}")
+    def define_struct(self, struct_name, struct_elems):
+        self.module.items.append(TypeDef(struct_name, f"{{ {', '.join(struct_elems)} }}"))
 
-    @staticmethod
-    def declare_struct(var_name, type_info):
-        LLVMGenerator.header_text.append(f"{var_name} = global %struct.{type_info}* null")
+    def declare_struct(self, var_name, type_info, linkage=""):
+        self._declare(var_name, f"%struct.{type_info}*", "null", linkage=linkage)
     
-    @staticmethod
-    def initialize_struct(var_name, type_info, total_size):
-        reg1 = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg1} = call i8* @malloc(i64 {total_size})")
-        LLVMGenerator.reg +=1
-        reg2 = LLVMGenerator.reg
-
-        LLVMGenerator.buffor_stack[-1].append(f"%{reg2} = bitcast i8* %{reg1} to %struct.{type_info}*")
-        LLVMGenerator.buffor_stack[-1].append(f"store %struct.{type_info}* %{reg2}, %struct.{type_info}** {var_name}")
-        LLVMGenerator.reg +=1
+    def initialize_struct(self, var_name, type_info, total_size):
+        reg1 = self.reg
+        self._emit("call", f"i8* @malloc(i64 {total_size})", reg1)
+        self.reg +=1
+        reg2 = self.reg
+
+        self._emit("bitcast", f"i8* %{reg1} to %struct.{type_info}*", reg2)
+        self._emit("store", f"%struct.{type_info}* %{reg2}, %struct.{type_info}** {var_name}")
+        self.reg +=1
         
         return reg2
 
-    @staticmethod
-    def get_struct_ptr(var_name, struct_name):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = load %struct.{struct_name}*, %struct.{struct_name}** {var_name}"
-        )
-        LLVMGenerator.reg +=1
+    def get_struct_ptr(self, var_name, struct_name):
+        reg = self.reg
+        self._emit("load", f"%struct.{struct_name}*, %struct.{struct_name}** {var_name}", reg)
+        self.reg +=1
         return reg
     
-    @staticmethod                 
-    def get_struct_field_ptr(base_ptr, struct_name, index):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = getelementptr inbounds %struct.{struct_name}, %struct.{struct_name}* %{base_ptr}, i32 0, i32 {index}")
-        LLVMGenerator.reg += 1
+    def get_struct_field_ptr(self, base_ptr, struct_name, index):
+        reg = self.reg
+        self._emit("getelementptr", f"inbounds %struct.{struct_name}, %struct.{struct_name}* %{base_ptr}, i32 0, i32 {index}", reg)
+        self.reg += 1
         return f"%{reg}"
     
-    @staticmethod
-    def bitcast(src, src_type):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = bitcast {src_type}* {src} to i8*"
-        )
-        LLVMGenerator.reg += 1
+    def bitcast(self, src, src_type):
+        reg = self.reg
+        self._emit("bitcast", f"{src_type}* {src} to i8*", reg)
+        self.reg += 1
         return reg
         
     # endregion
 
     # region Classes
-    @staticmethod
-    def define_class(class_name, llvm_fields):
-        LLVMGenerator.header_text.append(f"%class.{class_name} = type {{ {', '.join(llvm_fields)} }}")
-
-    @staticmethod
-    def allocate_class(class_name, total_size):
-        r_malloc = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{r_malloc} = call i8* @malloc(i64 {total_size})")
-        LLVMGenerator.reg += 1
-
-        r_obj = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(f"%{r_obj} = bitcast i8* %{r_malloc} to %class.{class_name}*")
-        LLVMGenerator.reg += 1
+    def define_class(self, class_name, llvm_fields):
+        self.module.items.append(TypeDef(f"%class.{class_name}", f"{{ {', '.join(llvm_fields)} }}"))
+
+    def allocate_class(self, class_name, total_size):
+        r_malloc = self.reg
+        self._emit("call", f"i8* @malloc(i64 {total_size})", r_malloc)
+        self.reg += 1
+
+        r_obj = self.reg
+        self._emit("bitcast", f"i8* %{r_malloc} to %class.{class_name}*", r_obj)
+        self.reg += 1
         return r_obj
     
-    @staticmethod
-    def declare_class(var_name, type_info):
-        LLVMGenerator.header_text.append(f"{var_name} = global %class.{type_info}* null")
+    def declare_class(self, var_name, type_info, linkage=""):
+        self._declare(var_name, f"%class.{type_info}*", "null", linkage=linkage)
     
-    @staticmethod
-    def get_class_field_ptr(base_ptr, class_name, field_index):
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = getelementptr inbounds %class.{class_name}, "
-            f"%class.{class_name}* {base_ptr}, i32 0, i32 {field_index}"
-        )
-        LLVMGenerator.reg += 1
+    def get_class_field_ptr(self, base_ptr, class_name, field_index):
+        reg = self.reg
+        self._emit("getelementptr",
+                   f"inbounds %class.{class_name}, "
+                   f"%class.{class_name}* {base_ptr}, i32 0, i32 {field_index}", reg)
+        self.reg += 1
         return reg
     
-    @staticmethod
-    def get_class_ptr(var_name, class_name):
+    def get_class_ptr(self, var_name, class_name):
         if var_name.startswith('%'):
             return var_name.lstrip('%')     
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = load %class.{class_name}*, %class.{class_name}** {var_name}"
-        )
-        LLVMGenerator.reg += 1
+        reg = self.reg
+        self._emit("load", f"%class.{class_name}*, %class.{class_name}** {var_name}", reg)
+        self.reg += 1
         return reg
         
-    @staticmethod
-    def store_class(var_name, type_info, ptr):
-        LLVMGenerator.buffor_stack[-1].append(f"store %class.{type_info}* %{ptr}, %class.{type_info}** {var_name}")
+    def store_class(self, var_name, type_info, ptr):
+        self._emit("store", f"%class.{type_info}* %{ptr}, %class.{type_info}** {var_name}")
     
     # endregion    
 
     # region Generator Function
     
-    @staticmethod
-    def define_generator_struct(gen_name, ret_llvm_type):
+    def define_generator_struct(self, gen_name, ret_llvm_type):
         """
         %gen_name.gen = type { i32 state, retType current }
         """
-        LLVMGenerator.header_text.append(
-            f"%{gen_name}.gen = type {{ i32, {ret_llvm_type} }}"
-        )
+        self.module.items.append(TypeDef(f"%{gen_name}.gen", f"{{ i32, {ret_llvm_type} }}"))
 
-    @staticmethod
-    def emit_yield(ret_llvm_type, val_reg, state_id):
+    def emit_yield(self, ret_llvm_type, val_reg, state_id):
         """
         • zapisuje wartość do pola current
         • ustawia następny state
         • ret 1   + etykieta gen_resume_<id>
         """
         # --- current -------------------------------------------------------
-        cur_ptr = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{cur_ptr} = getelementptr %{LLVMGenerator._active_gen}, "
-            f"%{LLVMGenerator._active_gen}* %self, i32 0, i32 1")
-        LLVMGenerator.reg += 1
-        LLVMGenerator.buffor_stack[-1].append(
-            f"store {ret_llvm_type} {val_reg}, {ret_llvm_type}* %{cur_ptr}")
+        cur_ptr = self.reg
+        self._emit("getelementptr",
+                   f"%{self._active_gen}, "
+                   f"%{self._active_gen}* %self, i32 0, i32 1", cur_ptr)
+        self.reg += 1
+        self._emit("store", f"{ret_llvm_type} {val_reg}, {ret_llvm_type}* %{cur_ptr}")
 
         # --- state ---------------------------------------------------------
-        st_ptr = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{st_ptr} = getelementptr %{LLVMGenerator._active_gen}, "
-            f"%{LLVMGenerator._active_gen}* %self, i32 0, i32 0")
-        LLVMGenerator.reg += 1
-        LLVMGenerator.buffor_stack[-1].append(
-            f"store i32 {state_id+1}, i32* %{st_ptr}")
+        st_ptr = self.reg
+        self._emit("getelementptr",
+                   f"%{self._active_gen}, "
+                   f"%{self._active_gen}* %self, i32 0, i32 0", st_ptr)
+        self.reg += 1
+        self._emit("store", f"i32 {state_id+1}, i32* %{st_ptr}")
 
         # --- zakończenie ---------------------------------------------------
-        LLVMGenerator.buffor_stack[-1].append("ret i1 1")
-        LLVMGenerator.define_label(f"gen_resume_{state_id}")
+        self._emit("ret", "i1 1")
+        self.define_label(f"gen_resume_{state_id}")
 
         # do dispatcher-switch
-        LLVMGenerator._state_cases.append(state_id + 1)
+        self._state_cases.append(state_id + 1)
 
-    @staticmethod
-    def enter_generator(gen_struct):
-        LLVMGenerator._active_gen = gen_struct
-        LLVMGenerator.enter_function()
+    def enter_generator(self, gen_struct):
+        self._active_gen = gen_struct
+        self.enter_function()
 
         # ── dispatcher ─────────────────────────────────────────────
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%state_ptr = getelementptr %{gen_struct}, "
-            f"%{gen_struct}* %self, i32 0, i32 0")
-        LLVMGenerator.buffor_stack[-1].append(
-            "%state = load i32, i32* %state_ptr")
+        self._emit("getelementptr",
+                   f"%{gen_struct}, "
+                   f"%{gen_struct}* %self, i32 0, i32 0", "%state_ptr")
+        self._emit("load", "i32, i32* %state_ptr", "%state")
         # na razie pusta lista przypadków, uzupełnimy ją w finish_generator
-        LLVMGenerator.buffor_stack[-1].append(
-            "switch i32 %state, label %gen_entry [  ]")
-        
-        LLVMGenerator._switch_idx  = len(LLVMGenerator.buffor_stack[-1]) - 1  # zapamiętaj pozycję 'switch'
-        LLVMGenerator._state_cases = []        
+        self._dispatch = Switch("i32", "%state", "gen_entry")
+        self.function_stack[-1].append(self._dispatch)
+        self._state_cases = []
 
-        LLVMGenerator.define_label("gen_entry")          # tu zacznie się „stan-0”
+        self.define_label("gen_entry")          # tu zacznie się „stan-0”
 
 
-    @staticmethod
-    def finish_generator(fname, last_state_id, ret_llvm_type):
+    def finish_generator(self, fname, last_state_id, ret_llvm_type, linkage=""):
         """
         Kończy funkcję .next oraz dokleja .create wrapper
         """
-        cases = " ".join(         
-            f"i32 {sid}, label %gen_resume_{sid-1}"
-            for sid in LLVMGenerator._state_cases
+        self._dispatch.cases.extend(
+            (sid, f"gen_resume_{sid-1}")
+            for sid in self._state_cases
         )
-        switch_idx = LLVMGenerator._switch_idx
-        old = LLVMGenerator.buffor_stack[-1][switch_idx]
-        LLVMGenerator.buffor_stack[-1][switch_idx] = old[:-2] + cases + " ]"
+        self._dispatch = None
         # blok końcowy – gdy state > last_state_id
-        LLVMGenerator.buffor_stack[-1].append("br label %gen_stop")
-        LLVMGenerator.define_label("gen_stop")
-        LLVMGenerator.buffor_stack[-1].append("ret i1 0")
+        self.jump_label("gen_stop")
+        self.define_label("gen_stop")
+        self._emit("ret", "i1 0")
 
-        LLVMGenerator.exit_function(f"{fname}_next",
+        self.exit_function(f"{fname}_next",
                                     f"%{fname}.gen* %self",
-                                    "i1")
+                                    "i1", linkage)
 
         # konstruktor
-        LLVMGenerator.enter_function()
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%mem = call i8* @malloc(i64 16)")   # 2× i64 = 16 B
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%self = bitcast i8* %mem to %{fname}.gen*")
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%st = getelementptr %{fname}.gen, %{fname}.gen* %self, i32 0, i32 0")
-        LLVMGenerator.buffor_stack[-1].append(
-            "store i32 0, i32* %st")
-        LLVMGenerator.buffor_stack[-1].append(f"ret %{fname}.gen* %self")
-        LLVMGenerator.exit_function(f"{fname}_create", "", f"%{fname}.gen*")
-
-
-    @staticmethod
-    def get_gen_current(ptr, gen_name, llvm_t):
+        self.enter_function()
+        self._emit("call", f"i8* @malloc(i64 16)", "%mem")   # 2× i64 = 16 B
+        self._emit("bitcast", f"i8* %mem to %{fname}.gen*", "%self")
+        self._emit("getelementptr", f"%{fname}.gen, %{fname}.gen* %self, i32 0, i32 0", "%st")
+        self._emit("store", "i32 0, i32* %st")
+        self._emit("ret", f"%{fname}.gen* %self")
+        self.exit_function(f"{fname}_create", "", f"%{fname}.gen*", linkage)
+
+
+    def get_gen_current(self, ptr, gen_name, llvm_t):
         # ptr → '@g' lub '%tmp'
         if ptr.startswith('@'):
-            r0 = LLVMGenerator.reg
-            LLVMGenerator.buffor_stack[-1].append(
-                f"%{r0} = load %{gen_name}.gen*, %{gen_name}.gen** {ptr}")
-            LLVMGenerator.reg += 1
+            r0 = self.reg
+            self._emit("load", f"%{gen_name}.gen*, %{gen_name}.gen** {ptr}", r0)
+            self.reg += 1
             ptr_val = f"%{r0}"
         else:
             ptr_val = ptr
 
-        r1 = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{r1} = getelementptr %{gen_name}.gen, %{gen_name}.gen* {ptr_val}, i32 0, i32 1")
-        LLVMGenerator.reg += 1
-        r2 = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{r2} = load {llvm_t}, {llvm_t}* %{r1}")
-        LLVMGenerator.reg += 1
+        r1 = self.reg
+        self._emit("getelementptr", f"%{gen_name}.gen, %{gen_name}.gen* {ptr_val}, i32 0, i32 1", r1)
+        self.reg += 1
+        r2 = self.reg
+        self._emit("load", f"{llvm_t}, {llvm_t}* %{r1}", r2)
+        self.reg += 1
         return r2
 
-    @staticmethod
-    def llvm_type(pt):
+    def llvm_type(self, pt):
         """
         Zamienia opis typu z LLVMActions (pt) na llvm-typ wraz z gwiazdką,
         którego możesz używać w sygnaturach funkcji.
@@ -799,11 +730,10 @@ class LLVMGenerator:
 
         # prawdziwa tablica  (sizes, elem_type)
         sizes, elem = pt
-        elem_llvm = LLVMGenerator.llvm_type(elem)        # rekursja działa, bo elem to prymityw
-        return LLVMGenerator.build_array(elem_llvm, sizes) + "*"
+        elem_llvm = self.llvm_type(elem)        # rekursja działa, bo elem to prymityw
+        return self.build_array(elem_llvm, sizes) + "*"
 
-    @staticmethod
-    def get_gen_ptr(var_name, gen_name):
+    def get_gen_ptr(self, var_name, gen_name):
         """
         Ładuje wskaźnik do struktury generatora z globalnej zmiennej.
         var_name  – @g albo %tmp
@@ -813,24 +743,20 @@ class LLVMGenerator:
         if var_name.startswith('%'):          # już mamy %oddNumbers.gen*
             return var_name.lstrip('%')
 
-        reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{reg} = load %{gen_name}.gen*, %{gen_name}.gen** {var_name}"
-        )
-        LLVMGenerator.reg += 1
+        reg = self.reg
+        self._emit("load", f"%{gen_name}.gen*, %{gen_name}.gen** {var_name}", reg)
+        self.reg += 1
         return reg
 
-    @staticmethod
-    def declare_raw(global_name: str, llvm_definition: str):
+    def declare_global(self, global_name: str, llvm_type: str, init: str, linkage: str = ""):
         """
-        Rejestruje dowolną (już zbudowaną) deklarację globalną.
+        Rejestruje dowolną globalną zmienną i zwraca jej obiekt Global.
         Używane m.in. przez LLVMActions przy generowaniu tablic-parametrów
-        dla generatorów.
+        dla generatorów oraz zmiennych generatorów (typ ustalany po inicjalizatorze).
         """
-        LLVMGenerator.header_text.append(f"{global_name} = global {llvm_definition}")
+        return self._declare(global_name, llvm_type, init, linkage=linkage)
 
-    @staticmethod
-    def sizeof_primitive(llvm_elem_ty: str) -> int:
+    def sizeof_primitive(self, llvm_elem_ty: str) -> int:
         return {
             "i1": 1,
             "i32": 4,
@@ -839,85 +765,93 @@ class LLVMGenerator:
             "i8*": 8         # wskaźnik na string
         }.get(llvm_elem_ty, 8)  # domyślnie pointer-size
 
-    @staticmethod
-    def gen_wrapper(fname, params):
+    def gen_wrapper(self, fname, params, linkage=""):
         # ─── 1. sygnatura funkcji ─────────────────────────────────────────────
         sig_parts = [
-            f"{LLVMGenerator.llvm_type(pt)} %{pn}"
+            f"{self.llvm_type(pt)} %{pn}"
             for pn, pt in params
         ]
         params_sig = ", ".join(sig_parts)
 
         # ─── 2. ciało wrappera ────────────────────────────────────────────────
-        LLVMGenerator.enter_function()
+        self.enter_function()
 
         # kopia argumentów do globali @<fname>_<param>
         for pn, pt in params:
-            llvm_t = LLVMGenerator.llvm_type(pt)
+            llvm_t = self.llvm_type(pt)
 
             # ── parametr to statyczna tablica ───────────────────
             if llvm_t.endswith('*') and llvm_t[0] == '[':
                 dim   = int(llvm_t[1:].split('x')[0].strip())
                 elem  = llvm_t.split('x')[1].split(']')[0].strip()
-                bytes = dim * LLVMGenerator.sizeof_primitive(elem)
+                bytes = dim * self.sizeof_primitive(elem)
 
                 # %tmpDst = bitcast [N x T]* @foo_arr  to i8*
-                dst_reg = LLVMGenerator.reg
-                LLVMGenerator.buffor_stack[-1].append(
-                    f"%{dst_reg} = bitcast {llvm_t} @{fname}_{pn} to i8*")
-                LLVMGenerator.reg += 1
+                dst_reg = self.reg
+                self._emit("bitcast", f"{llvm_t} @{fname}_{pn} to i8*", dst_reg)
+                self.reg += 1
 
                 # %tmpSrc = bitcast [N x T]* %{pn}     to i8*
-                src_reg = LLVMGenerator.reg
-                LLVMGenerator.buffor_stack[-1].append(
-                    f"%{src_reg} = bitcast {llvm_t} %{pn} to i8*")
-                LLVMGenerator.reg += 1
-
-                LLVMGenerator.buffor_stack[-1].append(
-                    f"call void @llvm.memcpy.p0i8.p0i8.i64("
-                    f"i8* %{dst_reg}, i8* %{src_reg}, i64 {bytes}, i1 false)")
+                src_reg = self.reg
+                self._emit("bitcast", f"{llvm_t} %{pn} to i8*", src_reg)
+                self.reg += 1
+
+                self._emit("call",
+                           f"void @llvm.memcpy.p0i8.p0i8.i64("
+                           f"i8* %{dst_reg}, i8* %{src_reg}, i64 {bytes}, i1 false)")
             # ── każdy inny typ ──────────────────────────────────
             else:
-                LLVMGenerator.buffor_stack[-1].append(
-                    f"store {llvm_t} %{pn}, {llvm_t}* @{fname}_{pn}")
+                self._emit("store", f"{llvm_t} %{pn}, {llvm_t}* @{fname}_{pn}")
 
         # wywołanie  *_create()  i zwrot wskaźnika
-        g_reg = LLVMGenerator.reg
-        LLVMGenerator.buffor_stack[-1].append(
-            f"%{g_reg} = call %{fname}.gen* @{fname}_create()"
-        )
-        LLVMGenerator.reg += 1
-        LLVMGenerator.buffor_stack[-1].append(
-            f"ret %{fname}.gen* %{g_reg}"
-        )
+        g_reg = self.reg
+        self._emit("call", f"%{fname}.gen* @{fname}_create()", g_reg)
+        self.reg += 1
+        self._emit("ret", f"%{fname}.gen* %{g_reg}")
 
         # ─── 3. zamknięcie funkcji ────────────────────────────────────────────
-        LLVMGenerator.exit_function(fname, params_sig, f"%{fname}.gen*")
+        self.exit_function(fname, params_sig, f"%{fname}.gen*", linkage)
 
 
 
     # endregion
 
-    @staticmethod
-    def generate():
-        declarations = [
-            'target triple = "x86_64-pc-windows-msvc"',
-            'declare i32 @printf(i8*, ...)',
-            'declare i32 @scanf(i8*, ...)',
-            'declare i32 @strcmp(i8*, i8*)',
-            '@strp_int = constant [4 x i8] c"%d\\0A\\00"',
-            '@strp_double = constant [6 x i8] c"%.*g\\0A\\00"',
-            '@strp_str = constant [4 x i8] c"%s\\0A\\00"',
-            '@stri = constant [3 x i8] c"%d\00"',
-            '@strs = constant [6 x i8] c"%255s\\00"',
-            '@strf = constant [3 x i8] c"%f\\00"',
-            '@strlf = constant [4 x i8] c"%lf\\00"',
-            'declare i8* @malloc(i64)'
-        ]
-        
-        if len(LLVMGenerator.buffor_stack) != 1:
+    DECLARATIONS = (
+        'target triple = "x86_64-pc-windows-msvc"',
+        'declare i32 @printf(i8*, ...)',
+        'declare i32 @scanf(i8*, ...)',
+        'declare i32 @strcmp(i8*, i8*)',
+        '@strp_int = internal constant [4 x i8] c"%d\\0A\\00"',
+        '@strp_double = internal constant [6 x i8] c"%.*g\\0A\\00"',
+        '@strp_str = internal constant [4 x i8] c"%s\\0A\\00"',
+        '@stri = internal constant [3 x i8] c"%d\\00"',
+        '@strs = internal constant [6 x i8] c"%255s\\00"',
+        '@strf = internal constant [3 x i8] c"%f\\00"',
+        '@strlf = internal constant [4 x i8] c"%lf\\00"',
+        'declare i8* @malloc(i64)'
+    )
+
+    def write(self, out, chunk_size=512):
+        """
+        Zapisuje cały moduł do `out` (plik, gniazdo, StringIO) porcjami po chunk_size
+        linii, bez składania tekstu .ll w jeden napis. Sam model IR (IRModel) jest
+        trzymany w pamięci do końca kompilacji – live_items i IRCache potrzebują
+        całego modułu – więc szczytowe zużycie pamięci rośnie z rozmiarem programu.
+        """
+        if len(self.function_stack) != 1:
             print(f"Error in function clousures")
             sys.exit(1)
-        
-        return "\n".join(declarations) + "\n" + "\n".join(LLVMGenerator.header_text) + "\n" + \
-               "define i32 @main() {\n" + "\n".join(LLVMGenerator.buffor_stack[-1]) + "\nret i32 0\n}\n"
+
+        write_lines(out, self.DECLARATIONS)
+        # cały program jest w tym module – zostaje tylko to, do czego dochodzi main
+        items = self.module.pooled_strings() + self.module.items
+        write_items(out, live_items(items, [self.module.main]), chunk_size)
+
+        out.write("define i32 @main() {\n")
+        write_lines(out, list(self.module.main.lines()), chunk_size=chunk_size)
+        out.write("ret i32 0\n}\n")
+
+    def generate(self):
+        buffer = io.StringIO()
+        self.write(buffer)
+        return buffer.getvalue()
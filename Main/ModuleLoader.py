@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from antlr4 import InputStream
+from TreeSerializer import dump_tree, load_tree
+
+def search_path():
+    """Dodatkowe katalogi modułów ze zmiennej MYLANG_PATH (jak PYTHONPATH)."""
+    return [p for p in os.environ.get("MYLANG_PATH", "").split(os.pathsep) if p]
+
+def resolve_import(name, base_dir):
+    """Ścieżka względem importującego pliku, potem katalogi z MYLANG_PATH; None, jeśli brak."""
+    for directory in [base_dir, *search_path()]:
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    return None
+
+def read_source(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def _parse_worker(path):
+    """Parsowanie w procesie roboczym; drzewo wraca spłaszczone (TreeSerializer)."""
+    from main import parse
+    text = read_source(path)
+    tree, _parser, errors = parse(InputStream(text))
+    data = dump_tree(tree) if tree is not None and not errors else None
+    return text, data, errors
+
+
+class ModuleLoader:
+    """
+    Graf importów jednej kompilacji.
+
+    Każdy moduł jest parsowany raz, nawet jeśli importuje go wiele plików (albo
+    importy tworzą cykl). Moduły z tego samego poziomu grafu, których nie ma
+    w ParseCache, są parsowane równolegle w procesach roboczych.
+    LLVMActions.visitImportStmt pobiera stąd drzewo modułu (targets → trees).
+    """
+
+    def __init__(self, jobs=None, parse_cache=None):
+        self.jobs = jobs
+        self.parse_cache = parse_cache
+        self.entry = None
+        self.trees = {}         # ścieżka → drzewo (None, jeśli moduł ma błędy)
+        self.targets = {}       # ImportStmtContext → ścieżka modułu
+        self.errors = []        # (ścieżka, linia, kolumna, komunikat)
+        self._pool = None
+
+    def load(self, entry_path, entry_tree):
+        """Wczytuje wszystkie moduły osiągalne z entry_tree; zwraca True, jeśli bez błędów."""
+        self.entry = os.path.abspath(entry_path) if entry_path else None
+        if self.entry:
+            self.trees[self.entry] = entry_tree
+        base_dir = os.path.dirname(self.entry) if self.entry else os.getcwd()
+        pending = self._collect(entry_tree, self.entry or "<text>", base_dir)
+        try:
+            while pending:
+                self._parse_all(pending)
+                next_level = []
+                for path in pending:
+                    tree = self.trees[path]
+                    if tree is not None:
+                        for found in self._collect(tree, path, os.path.dirname(path)):
+                            if found not in next_level:
+                                next_level.append(found)
+                pending = next_level
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        return not self.errors
+
+    def _collect(self, tree, importer, base_dir):
+        """Rozwiązuje importy drzewa; zwraca nowe (jeszcze niewczytane) moduły."""
+        found = []
+        for ctx in tree.importStmt():
+            name = ctx.STRING().getText()[1:-1]
+            path = resolve_import(name, base_dir)
+            if path is None:
+                self.errors.append((importer, ctx.start.line, ctx.start.column,
+                                    f"Nie znaleziono modułu \"{name}\""))
+                continue
+            self.targets[ctx] = path
+            if path not in self.trees and path not in found:
+                found.append(path)
+        return found
+
+    def _parse_all(self, paths):
+        to_parse = []
+        for path in paths:
+            tree = None
+            if self.parse_cache is not None:
+                tree = self.parse_cache.load(read_source(path))
+            if tree is not None:
+                self.trees[path] = tree
+            else:
+                to_parse.append(path)
+
+        if len(to_parse) > 1 and self.jobs != 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+            for path, (text, data, errors) in zip(to_parse, self._pool.map(_parse_worker, to_parse)):
+                tree = load_tree(data, text) if data is not None else None
+                self._add(path, text, tree, errors, data)
+        else:
+            # jeden moduł – taniej sparsować na miejscu niż uruchamiać procesy
+            from main import parse
+            for path in to_parse:
+                text = read_source(path)
+                tree, _parser, errors = parse(InputStream(text))
+                self._add(path, text, tree, errors)
+
+    def _add(self, path, text, tree, errors, data=None):
+        self.errors.extend((path, ln, col, msg) for ln, col, msg in errors)
+        if errors or tree is None:
+            self.trees[path] = None
+            return
+        self.trees[path] = tree
+        if self.parse_cache is not None:
+            self.parse_cache.store(text, tree, data)
@@ -0,0 +1,141 @@
+import hashlib
+import io
+import json
+import os
+import re
+from IRModel import Function, Global, TypeDef, write_items, write_lines
+from IRPasses import live_items
+from LLVMGenerator import LLVMGenerator
+
+_BUILTIN_DEF = re.compile(r"^(?:declare [^@]*)?(@[\w.$]+)[ (]")
+_SYMBOL = re.compile(r"[@%][\w.$]+")
+# globale z nazwami z liczników (bufory read(), tablice tymczasowe) – w każdym
+# module numerowane od nowa, więc na zewnątrz niewidoczne
+_COUNTER_GLOBAL = re.compile(r"^@(?:str\d+|_\d+_temp)$")
+
+MANIFEST = "modules.json"
+
+def module_name(path):
+    """Stabilna nazwa modułu: nazwa pliku + skrót ścieżki (lib/a.jd i a.jd się nie zderzą)."""
+    stem = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    return f"{stem}_{hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]}"
+
+
+class ModuleIR:
+    """IR jednego modułu: jego elementy (Global / TypeDef / Function) i kod najwyższego poziomu (funkcja init)."""
+
+    def __init__(self, path, module, entry=False):
+        self.path = path
+        self.items = module.pooled_strings() + module.items
+        self.body = module.main
+        self.entry = entry
+        self.name = module_name(path)
+        self.init_function = None if entry else f"@__init_{self.name}"
+
+        self.definitions = {}           # symbol → linia deklaracji dla innych modułów
+        self.types = {}                 # %typ → linia definicji typu
+        self.globals = set()
+        for item in self.items:
+            if isinstance(item, TypeDef):
+                self.types[item.name] = item.text()
+            elif isinstance(item, Function):
+                if not item.linkage:        # static → internal, niewidoczna dla innych modułów
+                    self.definitions[f"@{item.name}"] = item.declaration()
+            elif isinstance(item, Global):
+                self.globals.add(item.name)
+                if item.linkage:
+                    continue                # private/internal (np. pula napisów) – tylko w tym module
+                if _COUNTER_GLOBAL.match(item.name):
+                    item.linkage = "internal"
+                else:
+                    self.definitions[item.name] = f"{item.name} = external {item.kind} {item.type}"
+
+        # inne moduły mogą wołać wszystko, co eksportowane; lokalne elementy bez odwołań znikają
+        exported = [item for item in self.items if isinstance(item, (Function, Global)) and not item.linkage]
+        self.items = live_items(self.items, [self.body] + exported)
+
+    def referenced(self):
+        symbols = set()
+        for item in self.items:
+            symbols.update(item.symbols())
+        symbols.update(self.body.symbols())
+        return symbols
+
+
+def _builtin_symbols():
+    names = set()
+    for line in LLVMGenerator.DECLARATIONS:
+        m = _BUILTIN_DEF.match(line)
+        if m:
+            names.add(m.group(1))
+    return names
+
+def _externals(module, modules):
+    """Deklaracje symboli i kopie typów z innych modułów, do których odwołuje się `module`."""
+    own = set(module.definitions) | set(module.types) | module.globals | _builtin_symbols()
+
+    declarations, types = [], {}
+    pending = sorted(module.referenced() - own)
+    while pending:
+        symbol = pending.pop()
+        if symbol in types:
+            continue
+        for other in modules:
+            if other is module:
+                continue
+            if symbol in other.types:
+                types[symbol] = other.types[symbol]
+                # typ może odwoływać się do kolejnych typów (pola klas, struktur)
+                pending.extend(s for s in _SYMBOL.findall(other.types[symbol])
+                               if s not in own and s not in types)
+                break
+            if symbol in other.definitions:
+                line = other.definitions[symbol]
+                declarations.append(line)
+                pending.extend(s for s in _SYMBOL.findall(line)
+                               if s.startswith("%") and s not in own and s not in types)
+                break
+    return list(types.values()) + sorted(declarations)
+
+def write_module(out, module, modules):
+    write_lines(out, LLVMGenerator.DECLARATIONS)
+    write_lines(out, _externals(module, modules))
+    write_items(out, module.items)
+    if module.entry:
+        write_lines(out, [f"declare void {m.init_function}()" for m in modules if not m.entry])
+        out.write("define i32 @main() {\n")
+        # kod modułów w kolejności pierwszych importów – jak przy kompilacji w całości
+        write_lines(out, [f"call void {m.init_function}()" for m in modules if not m.entry])
+        write_lines(out, list(module.body.lines()))
+        out.write("ret i32 0\n}\n")
+    else:
+        out.write(f"define void {module.init_function}() {{\n")
+        write_lines(out, list(module.body.lines()))
+        out.write("ret void\n}\n")
+
+def write_modules(modules, out_dir):
+    """
+    Zapisuje <moduł>.ll dla każdego modułu i manifest modules.json (kolejność linkowania).
+    Plik, którego treść się nie zmieniła, nie jest nadpisywany – builder porównuje
+    skróty .ll z tymi zapisanymi przy obiektach i kompiluje tylko zmienione moduły.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = []
+    for module in modules:
+        buffer = io.StringIO()
+        write_module(buffer, module, modules)
+        text = buffer.getvalue()
+        ll_path = os.path.join(out_dir, f"{module.name}.ll")
+        try:
+            with open(ll_path, encoding="utf-8") as f:
+                unchanged = f.read() == text
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            with open(ll_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        files.append({"module": module.name, "source": module.path, "ll": ll_path,
+                      "entry": module.entry, "changed": not unchanged})
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(files, f, indent=2)
+    return files
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from ArtifactCache import grammar_digest
+from TreeSerializer import FORMAT_VERSION, dump_tree, load_tree
+
+
+class ParseCache:
+    """
+    Cache drzew parsowania adresowany treścią pliku (Cache/parse/<klucz>.pkl).
+
+    Klucz = tekst źródła + skrót gramatyki + wersja formatu TreeSerializer, więc
+    zmiana gramatyki albo serializera unieważnia wpisy bez osobnego sprzątania.
+    Wpis to tokeny + spłaszczone drzewo (dump_tree), bez tekstu źródła. Rozmiar
+    jest ograniczony: po zapisie usuwane są najdawniej używane wpisy (mtime
+    odświeżany przy trafieniu), a clear() czyści cały cache.
+    """
+
+    def __init__(self, cache_dir=os.path.join("Cache", "parse"), max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text):
+        h = hashlib.sha256()
+        h.update(f"{FORMAT_VERSION}:{grammar_digest()}:".encode())
+        h.update(text.encode("utf-8"))
+        return h.hexdigest()
+
+    def _path(self, text):
+        return os.path.join(self.cache_dir, f"{self.key(text)}.pkl")
+
+    def load(self, text):
+        """Drzewo dla danego tekstu albo None."""
+        path = self._path(text)
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            os.utime(path)                  # LRU: oznacz jako ostatnio użyty
+        except Exception:                   # brak, uszkodzony albo niepełny wpis = chybienie
+            self.misses += 1
+            return None
+        self.hits += 1
+        return load_tree(data, text)
+
+    def store(self, text, tree=None, data=None):
+        """Zapisuje drzewo (albo gotowy wynik dump_tree) dla tekstu."""
+        if data is None:
+            data = dump_tree(tree)
+        path = self._path(text)
+        # unikalny plik tymczasowy – serwer kompiluje w kilku wątkach jednego procesu
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue                    # usunięty przez inny proces
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def evict(self):
+        """Usuwa najdawniej używane wpisy, dopóki cache przekracza max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Usuwa wszystkie wpisy; zwraca (liczba wpisów, bajty)."""
+        entries = self._entries()
+        for _, _, name in entries:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+        return len(entries), sum(size for _, size, _ in entries)
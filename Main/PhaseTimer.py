@@ -0,0 +1,101 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+def peak_rss(children=False):
+    """Szczytowe zużycie pamięci (bajty) procesu albo jego procesów potomnych; None, jeśli nieznane."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+        rss = resource.getrusage(who).ru_maxrss
+        # Linux podaje KiB, macOS bajty
+        return rss if sys.platform == "darwin" else rss * 1024
+    if children:
+        return None
+    try:
+        import psutil  # Windows: brak modułu resource
+        return psutil.Process().memory_info().peak_wset
+    except (ImportError, AttributeError):
+        return None
+
+
+class PhaseTimer:
+    """
+    Pomiar czasu faz kompilacji zegarem monotonicznym (time.perf_counter).
+
+    Fazy mogą być zagnieżdżone – raportowany jest czas własny fazy (bez faz
+    wewnętrznych), więc suma wierszy odpowiada czasowi całkowitemu.
+    Wyłączony timer (enabled=False) nic nie mierzy i kosztuje jedno wywołanie.
+    """
+
+    def __init__(self, enabled=True, children=False, start=None):
+        self.enabled = enabled
+        self.children = children        # RSS procesów potomnych (builder → main.py, clang)
+        self.phases = []                # [{"phase", "seconds", "peak_rss"}]
+        self._nested = []               # czas faz wewnętrznych dla każdej otwartej fazy
+        self._start = start if start is not None else time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            self.add(name, elapsed - nested, peak_rss(self.children))
+
+    def add(self, name, seconds, rss=None):
+        """Dopisuje gotowy pomiar (np. fazę zmierzoną w procesie potomnym)."""
+        if not self.enabled:
+            return
+        self.phases.append({"phase": name, "seconds": seconds, "peak_rss": rss})
+        # czas własny liczy się jako "wewnętrzny" dla wszystkich otwartych faz
+        for i in range(len(self._nested)):
+            self._nested[i] += seconds
+
+    def merge(self, path, prefix):
+        """Dołącza fazy z raportu JSON zapisanego przez inny proces (--time-report-file)."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for p in data["phases"]:
+            self.add(prefix + p["phase"], p["seconds"], p["peak_rss"])
+
+    def as_dict(self):
+        return {
+            "phases": self.phases,
+            "total_seconds": time.perf_counter() - self._start,
+            "peak_rss": peak_rss(self.children),
+        }
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def report(self, fmt="table", out=None):
+        out = out or sys.stdout
+        data = self.as_dict()
+        if fmt == "json":
+            out.write(json.dumps(data, indent=2) + "\n")
+            return
+
+        def mb(rss):
+            return f"{rss / (1024 * 1024):10.1f}" if rss is not None else f"{'-':>10}"
+
+        out.write(f"{'faza':<24}{'czas [ms]':>12}{'%':>8}{'peak RSS [MB]':>15}\n")
+        total = data["total_seconds"] or 1e-12
+        for p in self.phases:
+            out.write(f"{p['phase']:<24}{p['seconds'] * 1000:12.1f}"
+                      f"{p['seconds'] / total:8.1%}{mb(p['peak_rss']):>15}\n")
+        out.write(f"{'razem':<24}{data['total_seconds'] * 1000:12.1f}{'':>8}{mb(data['peak_rss']):>15}\n")
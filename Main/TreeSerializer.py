@@ -0,0 +1,136 @@
+import gc
+from antlr4 import InputStream
+from antlr4.Token import CommonToken
+from antlr4.tree.Tree import TerminalNodeImpl
+from LexerParser.MyLangParser import MyLangParser
+
+# zmiana formatu unieważnia wszystkie zapisane drzewa (ParseCache)
+FORMAT_VERSION = 1
+
+_CONTEXT_CLASSES = [getattr(MyLangParser, name[0].upper() + name[1:] + "Context")
+                    for name in MyLangParser.ruleNames]
+
+def dump_tree(tree):
+    """
+    Spłaszcza drzewo parsowania do krotek (bez obiektów ANTLR, gotowe do pickle).
+
+    Wynik: (tokeny, węzły). Token to (typ, kanał, start, stop, linia, kolumna, indeks);
+    tekst tokenu nie jest zapisywany – odtwarza się go z tekstu źródła. Węzły są
+    w kolejności preorder: liść to indeks tokenu (int), reguła to krotka
+    (indeks reguły, token start, token stop, liczba dzieci, etykiety), gdzie
+    etykiety to pary (atrybut, pozycja dziecka) – np. VarDeclContext.static.
+    Przejście jest iteracyjne, więc głębokość drzewa nie ma znaczenia.
+    """
+    tokens, token_ids = [], {}
+
+    def token_index(token):
+        if token is None:
+            return -1
+        idx = token_ids.get(id(token))
+        if idx is None:
+            idx = token_ids[id(token)] = len(tokens)
+            tokens.append((token.type, token.channel, token.start, token.stop,
+                           token.line, token.column, token.tokenIndex))
+        return idx
+
+    nodes = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, TerminalNodeImpl):
+            nodes.append(token_index(node.symbol))
+            continue
+        children = node.children or []
+        labels = []
+        for attr, value in vars(node).items():
+            if value is None:
+                continue
+            for pos, child in enumerate(children):
+                if child is value or getattr(child, "symbol", None) is value:
+                    labels.append((attr, pos))
+                    break
+        nodes.append((node.getRuleIndex(), token_index(node.start), token_index(node.stop),
+                      len(children), tuple(labels)))
+        stack.extend(reversed(children))
+    return tokens, nodes
+
+# etykiety z __init__ każdej klasy kontekstu (np. static/var = None) – load_tree
+# tworzy konteksty przez __new__, więc ustawia je sam
+_LABEL_DEFAULTS = [tuple(vars(cls(None)).items()) for cls in _CONTEXT_CLASSES]
+
+def load_tree(data, text):
+    """
+    Odtwarza drzewo z dump_tree; tokeny czytają tekst z InputStream(text), jak po parsowaniu.
+    Obiekty są tworzone przez __new__ z bezpośrednim ustawieniem pól – konstruktory
+    ANTLR są kilka razy wolniejsze, a przy dużych plikach to główny koszt. Z tego
+    samego powodu na czas budowy wyłączany jest cykliczny GC (drzewo to setki
+    tysięcy obiektów, a żaden z nich nie jest jeszcze śmieciem).
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build_tree(data, text)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def _build_tree(data, text):
+    tokens_data, nodes = data
+    source = (None, InputStream(text))
+    new_token = CommonToken.__new__
+    tokens = []
+    for ttype, channel, start, stop, line, column, index in tokens_data:
+        token = new_token(CommonToken)
+        token.source = source
+        token.type = ttype
+        token.channel = channel
+        token.start = start
+        token.stop = stop
+        token.tokenIndex = index
+        token.line = line
+        token.column = column
+        token._text = None
+        tokens.append(token)
+
+    new_terminal = TerminalNodeImpl.__new__
+    root = None
+    stack = []                      # [kontekst, ile dzieci jeszcze brakuje, etykiety]
+    for entry in nodes:
+        parent = stack[-1][0] if stack else None
+        if entry.__class__ is int:
+            node = new_terminal(TerminalNodeImpl)
+            node.symbol = tokens[entry]
+            node.parentCtx = parent
+            child_count = 0
+        else:
+            rule_index, start, stop, child_count, labels = entry
+            cls = _CONTEXT_CLASSES[rule_index]
+            node = cls.__new__(cls)
+            node.parentCtx = parent
+            node.invokingState = -1
+            node.parser = None
+            node.exception = None
+            node.children = [] if child_count else None
+            node.start = tokens[start] if start >= 0 else None
+            node.stop = tokens[stop] if stop >= 0 else None
+            for attr, value in _LABEL_DEFAULTS[rule_index]:
+                setattr(node, attr, value)
+            if child_count:
+                stack.append([node, child_count, labels])
+            else:
+                _apply_labels(node, labels)
+        if parent is None:
+            root = node
+        else:
+            parent.children.append(node)
+            stack[-1 if child_count == 0 else -2][1] -= 1
+        # zamknij wszystkie reguły, które dostały już komplet dzieci
+        while stack and stack[-1][1] == 0:
+            done, _, done_labels = stack.pop()
+            _apply_labels(done, done_labels)
+    return root
+
+def _apply_labels(node, labels):
+    for attr, pos in labels:
+        child = node.children[pos]
+        setattr(node, attr, child.symbol if isinstance(child, TerminalNodeImpl) else child)
@@ -0,0 +1,100 @@
+import time
+from LLVMGenerator import LLVMGenerator
+
+# dispozytor i domyślne przejście po dzieciach – nie są regułami gramatyki
+_SKIPPED_VISITS = ("visit", "visitChildren")
+_SKIPPED_EMITTERS = ("reset", "generate", "write", "_emit", "_declare")
+
+
+class VisitorProfiler:
+    """
+    Opcjonalny profiler LLVMActions: liczba wywołań, czas własny i skumulowany
+    każdej metody visitX oraz każdego emitera LLVMGenerator.
+
+    install() podmienia metody visitX na instancji LLVMActions (accept() woła
+    visitor.visitX, więc trafia w opakowanie) oraz metody jej LLVMGenerator –
+    również generatorów tworzonych później przez new_generator() (moduły w trybie
+    --separate). Klasa LLVMGenerator zostaje nietknięta, więc równoległe kompilacje
+    serwera nie widzą opakowań. Bez install() nie ma żadnego narzutu.
+    """
+
+    def __init__(self):
+        self.stats = {}                 # nazwa -> [wywołania, czas własny, czas skumulowany]
+        self.folded = {}                # (nazwa, ..., nazwa) -> czas własny
+        self._stack = []                # [nazwa, start, czas dzieci]
+        self._depth = {}                # głębokość rekurencji (czas skumulowany liczony raz)
+
+    # region Instrumentation
+
+    def _wrap(self, name, fn):
+        stack, stats, folded, depth = self._stack, self.stats, self.folded, self._depth
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            frame = [name, clock(), 0.0]
+            stack.append(frame)
+            depth[name] = depth.get(name, 0) + 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = clock() - frame[1]
+                stack.pop()
+                depth[name] -= 1
+                if stack:
+                    stack[-1][2] += elapsed
+                self_time = elapsed - frame[2]
+                entry = stats.get(name)
+                if entry is None:
+                    entry = stats[name] = [0, 0.0, 0.0]
+                entry[0] += 1
+                entry[1] += self_time
+                if depth[name] == 0:
+                    entry[2] += elapsed
+                path = tuple(f[0] for f in stack) + (name,)
+                folded[path] = folded.get(path, 0.0) + self_time
+
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def install(self, actions):
+        for attr in dir(actions):
+            if attr.startswith("visit") and attr not in _SKIPPED_VISITS:
+                method = getattr(actions, attr)
+                if callable(method):
+                    setattr(actions, attr, self._wrap(attr, method))
+        self._install_generator(actions.gen)
+        new_generator = actions.new_generator
+        actions.new_generator = lambda: self._install_generator(new_generator())
+
+    def _install_generator(self, gen):
+        # atrybuty instancji przesłaniają metody klasy – także przy wywołaniach self.x() w generatorze
+        for attr, value in vars(LLVMGenerator).items():
+            if callable(value) and not attr.startswith("__") and attr not in _SKIPPED_EMITTERS:
+                setattr(gen, attr, self._wrap(f"LLVMGenerator.{attr}", getattr(gen, attr)))
+        return gen
+
+    # endregion
+
+    # region Reports
+
+    def report(self, out, sort="self", limit=40):
+        """Tabela posortowana malejąco po czasie własnym, skumulowanym albo liczbie wywołań."""
+        column = {"calls": 0, "self": 1, "cum": 2}[sort]
+        rows = sorted(self.stats.items(), key=lambda item: item[1][column], reverse=True)
+        total_self = sum(entry[1] for entry in self.stats.values()) or 1e-12
+        out.write(f"{'metoda':<44}{'wywołania':>11}{'własny [ms]':>13}{'%':>8}"
+                  f"{'skumul. [ms]':>14}{'µs/wyw.':>10}\n")
+        for name, (calls, self_time, cum_time) in rows[:limit]:
+            out.write(f"{name:<44}{calls:>11}{self_time * 1000:13.2f}{self_time / total_self:8.1%}"
+                      f"{cum_time * 1000:14.2f}{self_time / calls * 1e6:10.1f}\n")
+        if len(rows) > limit:
+            out.write(f"... ({len(rows) - limit} więcej)\n")
+
+    def write_folded(self, out):
+        """Format 'a;b;c <µs>' – wejście dla flamegraph.pl / speedscope / inferno."""
+        for path, self_time in sorted(self.folded.items()):
+            micros = int(round(self_time * 1e6))
+            if micros:
+                out.write(f"{';'.join(path)} {micros}\n")
+
+    # endregion
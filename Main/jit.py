@@ -0,0 +1,45 @@
+# jit.py
+"""
+Uruchamianie wygenerowanego LLVM IR w procesie (llvmlite / MCJIT),
+bez zapisywania program.ll i bez wywoływania clanga.
+
+llvmlite jest zależnością opcjonalną: pip install llvmlite
+"""
+import ctypes
+import sys
+
+def _flush_c_stdio():
+    # printf z programu pisze do bufora CRT, nie do sys.stdout
+    libc = ctypes.cdll.msvcrt if sys.platform == "win32" else ctypes.CDLL(None)
+    libc.fflush(None)
+
+def run_jit(llvm_ir):
+    """Kompiluje IR w pamięci, wywołuje @main i zwraca jego kod wyjścia."""
+    try:
+        import llvmlite.binding as llvm
+    except ImportError:
+        print("[jit-] Tryb --jit wymaga pakietu llvmlite (pip install llvmlite)")
+        sys.exit(1)
+
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+
+    try:
+        module = llvm.parse_assembly(llvm_ir)
+        module.verify()
+    except RuntimeError as e:
+        print(f"[jit-] Niepoprawny LLVM IR:\n{e}")
+        sys.exit(1)
+    # IR ma na sztywno triple dla Windows/MSVC – JIT zawsze celuje w bieżący proces
+    module.triple = llvm.get_process_triple()
+
+    target_machine = llvm.Target.from_default_triple().create_target_machine()
+    engine = llvm.create_mcjit_compiler(module, target_machine)
+    engine.finalize_object()
+    engine.run_static_constructors()
+
+    main_fn = ctypes.CFUNCTYPE(ctypes.c_int)(engine.get_function_address("main"))
+    sys.stdout.flush()
+    exit_code = main_fn()
+    _flush_c_stdio()
+    return exit_code
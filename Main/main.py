@@ -1,16 +1,29 @@
 # main.py
+import time
+_STARTUP = time.perf_counter()     # przed importami antlr4 / parsera – raport --time-report
+import argparse
 import sys
 import os
-from graphviz import Source
+import tempfile
 from antlr4.tree.Trees import Trees
 from antlr4 import FileStream, CommonTokenStream
 from antlr4.error.ErrorListener import ErrorListener
 from antlr4.error.Errors         import ParseCancellationException
+from antlr4.error.ErrorStrategy  import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.atn.PredictionMode   import PredictionMode
 # Zakładamy, że parser i lexer są wygenerowane do folderu lexpars
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from LexerParser.MyLangLexer import MyLangLexer
 from LexerParser.MyLangParser import MyLangParser
 from LLVMActions import LLVMActions
+from jit import run_jit
+from IRCache import IRCache
+from ArtifactCache import ArtifactCache
+from PhaseTimer import PhaseTimer
+from VisitorProfiler import VisitorProfiler
+from ModuleLoader import ModuleLoader
+from ParseCache import ParseCache
+from ModuleWriter import write_modules
 
 class CollectingListener(ErrorListener):
     """Zbiera komunikaty z lexera i parsera."""
@@ -21,27 +34,37 @@ class CollectingListener(ErrorListener):
     def syntaxError(self, recognizer, offendingSymbol, line, col, msg, e):
         self.messages.append((line, col, msg))
 
-def generate_dot(tree, rule_names):
-    dot_lines = ["digraph AST {"]
+def generate_dot(tree, rule_names, out):
+    """Zapisuje drzewo w formacie DOT linia po linii (iteracyjnie – bez limitu rekursji)."""
+    out.write("digraph AST {\n")
     counter = 0
-
-    def traverse(node, parent_id=None):
-        nonlocal counter
+    stack = [(tree, None)]
+    while stack:
+        node, parent_id = stack.pop()
         node_id = counter
         counter += 1
         # Pobierz tekst węzła i escapuj cudzysłowy
         label = Trees.getNodeText(node, rule_names)
         label = label.replace('"', '\\"')  # Escapowanie cudzysłowów
-        dot_lines.append(f'  node{node_id} [label="{label}"];')
+        out.write(f'  node{node_id} [label="{label}"];\n')
         if parent_id is not None:
-            dot_lines.append(f'  node{parent_id} -> node{node_id};')
-        if hasattr(node, "children") and node.children:
-            for child in node.children:
-                traverse(child, node_id)
+            out.write(f'  node{parent_id} -> node{node_id};\n')
+        if getattr(node, "children", None):
+            # odwrotna kolejność, żeby numeracja była taka jak w przejściu preorder
+            for child in reversed(node.children):
+                stack.append((child, node_id))
+    out.write("}\n")
 
-    traverse(tree)
-    dot_lines.append("}")
-    return "\n".join(dot_lines)
+def dump_tree(tree, rule_names, dot_path):
+    """Zapisuje DOT do pliku i (jeśli jest graphviz) renderuje PDF."""
+    with open(dot_path, "w", encoding="utf-8") as f:
+        generate_dot(tree, rule_names, f)
+    try:
+        import graphviz  # import tylko, gdy naprawdę rysujemy drzewo
+        pdf_path = graphviz.render("dot", "pdf", dot_path)
+        graphviz.view(pdf_path)  # otwiera okno z obrazkiem
+    except Exception as e:
+        print(f"[!] Nie udało się wyrenderować drzewa ({e}); plik DOT: {dot_path}")
 
 def abort(errors):
     print("[!] Compilation abborted:\n")
@@ -49,53 +72,267 @@ def abort(errors):
         print(f"   line {ln}:{col}  {msg}")
     sys.exit(1)
 
-def main():
-    source_file = sys.argv[1]
-    try:
-        input_stream = FileStream(source_file, encoding="utf-8")
-    except FileNotFoundError:
-        print(f"[1--.] Nie znaleziono pliku: {source_file}")
-        sys.exit(1)
+PARSE_MODES = ("two-stage", "ll")
+
+def parse(input_stream, timer=None, mode="two-stage"):
+    """
+    Lexuje i parsuje strumień; zwraca (drzewo, parser, lista błędów).
+
+    Domyślnie dwuetapowo: najpierw szybka predykcja SLL z BailErrorStrategy
+    (bez raportowania błędów), a dopiero gdy się nie powiedzie – pełne LL
+    od początku strumienia. Dla poprawnych programów SLL prawie zawsze
+    wystarcza, a błędy składni i tak są zgłaszane przez przebieg LL.
+    """
+    timer = timer or PhaseTimer(enabled=False)
     lexer = MyLangLexer(input_stream)
     lex_err = CollectingListener()
     lexer.removeErrorListeners()
     lexer.addErrorListener(lex_err)
 
     tokens = CommonTokenStream(lexer)
+    with timer.phase("lex"):
+        tokens.fill()               # całe lexowanie przed parsowaniem – osobny pomiar
     parser = MyLangParser(tokens)
     parse_err = CollectingListener()
     parser.removeErrorListeners()
-    parser.addErrorListener(parse_err)
 
+    tree = None
+    if mode == "two-stage":
+        with timer.phase("parse"):
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy()
+            try:
+                tree = parser.program()
+            except ParseCancellationException:
+                tree = None
+
+    if tree is None:
+        # drugi etap (albo --parse-mode ll): pełne LL z normalnym raportowaniem błędów
+        parser.reset()              # przewija też strumień tokenów
+        parser._interp.predictionMode = PredictionMode.LL
+        parser._errHandler = DefaultErrorStrategy()
+        parser.addErrorListener(parse_err)
+        with timer.phase("parse" if mode == "ll" else "parse (LL)"):
+            try:
+                tree = parser.program() # zakładamy, że główna reguła to 'program'
+            except ParseCancellationException:
+                tree = None
+
+    return tree, parser, lex_err.messages + parse_err.messages
+
+def generate_ir(tree, ir_cache=None, stream=None, timer=None, profiler=None, modules=None, separate=False):
+    """
+    Uruchamia LLVMActions na drzewie; każda kompilacja ma własny LLVMGenerator.
+    Bez `stream` zwraca IR jako napis, w przeciwnym razie zapisuje go porcjami do `stream`.
+    Z `separate` zwraca listę ModuleIR – osobny IR każdego modułu.
+    """
+    actions = LLVMActions(ir_cache, stream, timer, modules, separate)
+    if profiler is not None:
+        profiler.install(actions)       # opakowuje tylko tę instancję i jej generatory
+    return actions.visit(tree)
+
+def write_ir(tree, output_path, ir_cache=None, timer=None, profiler=None, modules=None):
+    """
+    Zapisuje IR prosto do pliku (przez plik tymczasowy – przerwana kompilacja
+    nie zostawia uciętego program.ll). Zwraca True, jeśli coś wygenerowano.
+    """
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    # unikalna nazwa – serwer kompiluje w kilku wątkach jednego procesu
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir or ".", prefix=f"{os.path.basename(output_path)}.", suffix=".tmp")
     try:
-        tree = parser.program() # zakładamy, że główna reguła to 'program'
-    except ParseCancellationException:
-        tree = None
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            written = generate_ir(tree, ir_cache, f, timer, profiler, modules) is not None
+        if written:
+            os.replace(tmp_path, output_path)
+        return written
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_separate(tree, out_dir, ir_cache=None, timer=None, profiler=None, modules=None):
+    """
+    Kompilacja rozdzielna: jeden plik .ll na moduł w `out_dir` oraz manifest modules.json
+    (kolejność linkowania). Zwraca listę wpisów manifestu albo None.
+    """
+    outputs = generate_ir(tree, ir_cache, timer=timer, profiler=profiler, modules=modules, separate=True)
+    if not outputs:
+        return None
+    return write_modules(outputs, out_dir)
+
+def parse_cached(input_stream, timer=None, mode="two-stage", parse_cache=None):
+    """
+    parse() z ParseCache: przy trafieniu drzewo jest odtwarzane z Cache/parse bez
+    uruchamiania lexera i parsera. Zwraca (drzewo, lista błędów); zapisywane są
+    tylko drzewa bez błędów.
+    """
+    timer = timer or PhaseTimer(enabled=False)
+    if parse_cache is None:
+        tree, _parser, errors = parse(input_stream, timer, mode)
+        return tree, errors
+    text = str(input_stream)
+    with timer.phase("parse cache"):
+        tree = parse_cache.load(text)
+    if tree is not None:
+        return tree, []
+    tree, _parser, errors = parse(input_stream, timer, mode)
+    if tree is not None and not errors:
+        with timer.phase("parse cache store"):
+            parse_cache.store(text, tree)
+    return tree, errors
+
+def load_modules(source_path, tree, jobs=None, use_cache=True):
+    """
+    Wczytuje (równolegle) importowane moduły; zwraca (ModuleLoader, błędy w formacie abort).
+    `use_cache` to True/False albo gotowy ParseCache (wspólny z plikiem głównym).
+    """
+    if use_cache is True:
+        use_cache = ParseCache()
+    loader = ModuleLoader(jobs, use_cache or None)
+    loader.load(source_path, tree)
+    errors = [(ln, col, f"{os.path.relpath(path) if os.path.isabs(path) else path}: {msg}")
+              for path, ln, col, msg in loader.errors]
+    return loader, errors
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MyLang → LLVM IR")
+    arg_parser.add_argument("source", nargs="?")
+    arg_parser.add_argument("output", nargs="?", default=os.path.join("Output", "program.ll"))
+    arg_parser.add_argument("--dump-tree", action="store_true",
+                            help="zapisz drzewo parsowania do Output/Source (DOT + PDF)")
+    arg_parser.add_argument("--print-ir", action="store_true",
+                            help="wypisz wygenerowany LLVM IR na stdout")
+    arg_parser.add_argument("--jit", action="store_true",
+                            help="uruchom program od razu w pamięci (llvmlite), bez zapisu .ll i clanga")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="używaj cache IR dla niezmienionych funkcji, struktur i klas (Cache/ir)")
+    arg_parser.add_argument("--cache", action="store_true",
+                            help="pobierz gotowy .ll z cache artefaktów (Cache/artifacts), jeśli źródło się nie zmieniło")
+    arg_parser.add_argument("--time-report", nargs="?", const="table", choices=("table", "json"),
+                            help="czas i szczytowa pamięć każdej fazy (tabela albo JSON)")
+    arg_parser.add_argument("--time-report-file", metavar="PATH",
+                            help="zapisz raport czasów jako JSON do pliku (używane przez builder.py)")
+    arg_parser.add_argument("--profile", nargs="?", const="self", choices=("self", "cum", "calls"),
+                            help="profiluj metody visitX i emitery LLVMGenerator; raport sortowany "
+                                 "po czasie własnym (domyślnie), skumulowanym albo liczbie wywołań")
+    arg_parser.add_argument("--profile-folded", metavar="PATH",
+                            help="zapisz profil jako folded stacks (flamegraph.pl, speedscope)")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="liczba procesów do równoległego parsowania importowanych modułów")
+    arg_parser.add_argument("--no-parse-cache", "--no-module-cache", dest="no_parse_cache", action="store_true",
+                            help="nie używaj cache sparsowanych plików (Cache/parse) – ani dla pliku "
+                                 "głównego, ani dla importów")
+    arg_parser.add_argument("--parse-cache-size", type=int, default=256, metavar="MB",
+                            help="limit rozmiaru cache parsowania (LRU), domyślnie 256 MB")
+    arg_parser.add_argument("--clear-parse-cache", action="store_true",
+                            help="usuń wszystkie wpisy cache parsowania i zakończ")
+    arg_parser.add_argument("--parse-mode", choices=PARSE_MODES, default="two-stage",
+                            help="predykcja parsera: SLL z powrotem do LL przy błędzie (domyślnie) "
+                                 "albo od razu pełne LL")
+    arg_parser.add_argument("--separate", metavar="DIR",
+                            help="kompilacja rozdzielna: osobny .ll dla każdego modułu w DIR "
+                                 "(+ modules.json); pliki niezmienionych modułów nie są nadpisywane")
+    args = arg_parser.parse_args()
+
+    if args.clear_parse_cache:
+        entries, size = ParseCache().clear()
+        print(f"[parse-cache] Usunięto {entries} wpisów ({size / (1024 * 1024):.1f} MB)")
+        return
+    if args.source is None:
+        arg_parser.error("brak pliku źródłowego")
+
+    timer = PhaseTimer(enabled=bool(args.time_report or args.time_report_file), start=_STARTUP)
+    timer.add("startup", time.perf_counter() - _STARTUP)
+    try:
+        compile_source(args, timer)
+    finally:
+        # także po sys.exit – raport z nieudanej kompilacji też jest przydatny
+        if args.time_report:
+            timer.report(args.time_report)
+        if args.time_report_file:
+            timer.save(args.time_report_file)
+
+def compile_source(args, timer):
+    source_file = args.source
+    try:
+        with timer.phase("read"):
+            input_stream = FileStream(source_file, encoding="utf-8")
+    except FileNotFoundError:
+        print(f"[1--.] Nie znaleziono pliku: {source_file}")
+        sys.exit(1)
+
+    out_dir = os.path.dirname(args.output) or "."
+
+    if args.separate and (args.jit or args.print_ir or args.cache):
+        print("[1--.] --separate nie łączy się z --jit, --print-ir ani --cache")
+        sys.exit(1)
+
+    cache = ArtifactCache() if args.cache and not (args.jit or args.dump_tree or args.print_ir) else None
+    if cache is not None:
+        cache_key = cache.key(source_file, ("ll", os.path.basename(args.output)))
+        if cache.lookup(cache_key, out_dir):
+            print(f"[ll-cache] trafienie {cache_key[:12]}: {args.output}")
+            return
+
+    parse_cache = None if args.no_parse_cache else ParseCache(max_bytes=args.parse_cache_size * 1024 * 1024)
+    tree, errors = parse_cached(input_stream, timer, args.parse_mode, parse_cache)
 
     # Sprawdzenie błędów leksykalnych i składniowych
-    if lex_err.messages or parse_err.messages or tree is None:
-        abort(lex_err.messages + parse_err.messages)
-
-    dot_text = generate_dot(tree, parser.ruleNames)
-
-    # Wyświetl jako graf
-    graph = Source(dot_text, filename="Output/Source", format="pdf")
-    graph.view()  # otwiera okno z obrazkiem lub pokazuje inline w Jupyter
-
-    actions = LLVMActions()
-    llvm_ir = actions.visit(tree)
-    
-    out_dir = "Output"
-    if not os.path.exists(out_dir):
-        os.makedirs(out_dir)
-    output_ll = os.path.join(out_dir, "program.ll")
-    print(llvm_ir)
-    if llvm_ir:
-        with open(output_ll, "w", encoding="utf-8") as f:
-            f.write(llvm_ir)
+    if errors or tree is None:
+        abort(errors)
+
+    with timer.phase("imports"):
+        modules, errors = load_modules(source_file, tree, args.jobs, parse_cache or False)
+    if errors:
+        abort(errors)
+
+    if args.dump_tree:
+        os.makedirs(out_dir, exist_ok=True)
+        dump_tree(tree, MyLangParser.ruleNames, os.path.join(out_dir, "Source"))
+
+    ir_cache = IRCache() if args.incremental else None
+    profiler = VisitorProfiler() if args.profile or args.profile_folded else None
+    if args.separate:
+        with timer.phase("codegen"):
+            llvm_ir = write_separate(tree, args.separate, ir_cache, timer, profiler, modules)
+        if llvm_ir:
+            changed = sum(1 for entry in llvm_ir if entry["changed"])
+            print(f"[2+++] Moduły zapisane w {args.separate}: {len(llvm_ir)} (zmienione: {changed})")
+    elif args.print_ir or args.jit:
+        with timer.phase("codegen"):
+            llvm_ir = generate_ir(tree, ir_cache, timer=timer, profiler=profiler, modules=modules)
     else:
+        # zwykła kompilacja: tekst IR trafia porcjami do pliku (model IR i tak jest w pamięci)
+        with timer.phase("codegen"):
+            llvm_ir = write_ir(tree, args.output, ir_cache, timer, profiler, modules)
+    if profiler is not None:
+        if args.profile:
+            print("[prof] Profil LLVMActions / LLVMGenerator:")
+            profiler.report(sys.stdout, args.profile)
+        if args.profile_folded:
+            with open(args.profile_folded, "w", encoding="utf-8") as f:
+                profiler.write_folded(f)
+            print(f"[prof] Folded stacks zapisane w: {args.profile_folded}")
+    if ir_cache is not None:
+        print(f"[ir-cache] trafienia: {ir_cache.hits}, chybienia: {ir_cache.misses}")
+
+    if not llvm_ir:
         print("[2--.] Nie wygenerowano kodu LLVM_IR")
         sys.exit(1)
+    if args.print_ir:
+        print(llvm_ir)
+    if args.jit:
+        with timer.phase("jit"):
+            exit_code = run_jit(llvm_ir)
+        sys.exit(exit_code)
+    if args.print_ir:
+        with timer.phase("write"):
+            os.makedirs(out_dir, exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(llvm_ir)
+    if cache is not None:
+        cache.store(cache_key, [args.output])
 
 
 if __name__ == "__main__":
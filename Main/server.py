@@ -0,0 +1,179 @@
+# server.py
+"""
+Długo działający serwer kompilacji MyLang.
+
+Proces importuje antlr4 / MyLangLexer / MyLangParser tylko raz, a cache
+ATN/DFA parsera (trzymane na poziomie klasy w wygenerowanym kodzie)
+pozostają rozgrzane pomiędzy kolejnymi kompilacjami. Połączenia z gniazdem
+obsługiwane są równolegle (wątek na połączenie) – każda kompilacja ma własny
+LLVMGenerator, a jej log trafia do własnego bufora (capture_stdout).
+
+Protokół: jedna linia JSON na żądanie, jedna linia JSON na odpowiedź.
+    żądanie:    {"source": "TestFiles/a.jd", "output": "Output/program.ll", "return_ir": false}
+                (zamiast "source" można podać "text" z kodem programu;
+                 "jobs" – procesy do parsowania importów)
+    odpowiedź:  {"ok": true, "output": "Output/program.ll", "log": "...", "ir": "..."}
+                {"ok": false, "errors": [[line, col, msg], ...], "log": "..."}
+
+Uruchomienie:
+    python Main/server.py --socket /tmp/mylang.sock     (gniazdo Unix)
+    python Main/server.py --stdio                       (stdin/stdout)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+import traceback
+from antlr4 import FileStream, InputStream
+from main import parse, generate_ir, write_ir, load_modules
+
+DEFAULT_OUTPUT = os.path.join("Output", "program.ll")
+
+class _ThreadStdout:
+    """
+    Zastępuje sys.stdout: wątek z aktywnym capture_stdout() pisze do własnego
+    bufora, pozostałe – do oryginalnego strumienia. contextlib.redirect_stdout
+    podmienia sys.stdout dla całego procesu, więc przy równoległych żądaniach
+    logi (i komunikaty błędów LLVMActions) mieszałyby się między nimi.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self._local = threading.local()
+
+    def _stream(self):
+        return getattr(self._local, "buffer", None) or self._target
+
+    def write(self, text):
+        return self._stream().write(text)
+
+    def flush(self):
+        self._stream().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+_stdout_lock = threading.Lock()
+
+@contextlib.contextmanager
+def capture_stdout(buffer):
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadStdout):
+            sys.stdout = _ThreadStdout(sys.stdout)
+        stdout = sys.stdout
+    previous = getattr(stdout._local, "buffer", None)
+    stdout._local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        stdout._local.buffer = previous
+
+def compile_request(request):
+    """Obsługuje pojedyncze żądanie; nigdy nie kończy procesu."""
+    log = io.StringIO()
+    try:
+        return _compile_request(request, log)
+    except Exception as e:
+        # błąd wewnętrzny (parser, importy, generator) psuje tylko to jedno żądanie
+        return {"ok": False, "errors": [[0, 0, f"Błąd wewnętrzny kompilatora: {e!r}"]],
+                "log": log.getvalue() + traceback.format_exc()}
+
+def _compile_request(request, log):
+    output_ll = request.get("output", DEFAULT_OUTPUT)
+    try:
+        if "text" in request:
+            input_stream = InputStream(request["text"])
+        else:
+            input_stream = FileStream(request["source"], encoding="utf-8")
+    except (KeyError, OSError) as e:
+        return {"ok": False, "errors": [[0, 0, f"Nie można wczytać źródła: {e}"]], "log": ""}
+
+    tree, _parser, errors = parse(input_stream)
+    if errors or tree is None:
+        return {"ok": False, "errors": [list(e) for e in errors], "log": ""}
+    # importy z "text" rozwiązywane są względem bieżącego katalogu
+    modules, errors = load_modules(request.get("source"), tree, request.get("jobs"))
+    if errors:
+        return {"ok": False, "errors": [list(e) for e in errors], "log": ""}
+
+    # LLVMActions.error() kończy się sys.exit – tutaj przechwytujemy to jako błąd żądania
+    try:
+        with capture_stdout(log):
+            if request.get("return_ir"):
+                llvm_ir = generate_ir(tree, modules=modules)
+            else:
+                llvm_ir = write_ir(tree, output_ll, modules=modules)
+    except SystemExit:
+        return {"ok": False, "errors": [], "log": log.getvalue()}
+
+    if not llvm_ir:
+        return {"ok": False, "errors": [[0, 0, "Nie wygenerowano kodu LLVM_IR"]], "log": log.getvalue()}
+
+    response = {"ok": True, "output": output_ll, "log": log.getvalue()}
+    if request.get("return_ir"):
+        out_dir = os.path.dirname(output_ll)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        with open(output_ll, "w", encoding="utf-8") as f:
+            f.write(llvm_ir)
+        response["ir"] = llvm_ir
+    return response
+
+def handle_line(line):
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"ok": False, "errors": [[0, 0, f"Niepoprawne żądanie: {e}"]], "log": ""}
+    if not isinstance(request, dict):
+        return {"ok": False, "errors": [[0, 0, "Niepoprawne żądanie: oczekiwano obiektu JSON"]], "log": ""}
+    return compile_request(request)
+
+class CompileHandler(socketserver.StreamRequestHandler):
+    # jedno połączenie może wysłać wiele żądań, każde w osobnej linii
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = handle_line(line.decode("utf-8"))
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+def serve_socket(socket_path):
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # każde połączenie w osobnym wątku – kompilacje mają własne LLVMGenerator
+    with socketserver.ThreadingUnixStreamServer(socket_path, CompileHandler) as server:
+        server.daemon_threads = True
+        print(f"[srv] Nasłuchuję na {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(socket_path)
+
+def serve_stdio():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = handle_line(line)
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="MyLang compile server")
+    mode = arg_parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--socket", metavar="PATH", help="nasłuchuj na gnieździe Unix")
+    mode.add_argument("--stdio", action="store_true", help="czytaj żądania ze stdin")
+    args = arg_parser.parse_args()
+
+    if args.stdio:
+        serve_stdio()
+    else:
+        serve_socket(args.socket)
+
+
+if __name__ == "__main__":
+    main()
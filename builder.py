@@ -1,28 +1,67 @@
+import argparse
+import hashlib
+import time
+import json
 import os
+import socket
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+ANTLR_JAR = "Grammar/antlr-4.13.2-complete.jar"
+ANTLR_OPTIONS = "-Dlanguage=Python3 -Xexact-output-dir -visitor"
+GRAMMAR_STAMP = ".grammar_stamp"
+GENERATED_FILES = ("MyLangLexer.py", "MyLangParser.py", "MyLangVisitor.py")
+
+def grammar_hash(grammar_path):
+    """Skrót gramatyki + wersji jara ANTLR + opcji generowania."""
+    h = hashlib.sha256()
+    with open(grammar_path, "rb") as f:
+        h.update(f.read())
+    # nazwa jara zawiera wersję ANTLR, rozmiar łapie podmianę pliku
+    h.update(os.path.basename(ANTLR_JAR).encode())
+    h.update(str(os.path.getsize(ANTLR_JAR)).encode())
+    h.update(ANTLR_OPTIONS.encode())
+    return h.hexdigest()
+
+def grammar_up_to_date(output_folder, digest):
+    stamp_path = os.path.join(output_folder, GRAMMAR_STAMP)
+    if not os.path.exists(stamp_path):
+        return False
+    if not all(os.path.exists(os.path.join(output_folder, f)) for f in GENERATED_FILES):
+        return False
+    with open(stamp_path, encoding="utf-8") as f:
+        return f.read().strip() == digest
 
 def build_grammar(grammar_path):
     output_folder = "LexerParser"
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    cmd = f'java -jar Grammar/antlr-4.13.2-complete.jar -Dlanguage=Python3 -o {output_folder} {grammar_path} -visitor'
-    print("[1...] Building grammar:", cmd)
+    digest = grammar_hash(grammar_path)
+    if grammar_up_to_date(output_folder, digest):
+        print(f"[1===] Gramatyka bez zmian (cache hit, {digest[:12]}), pomijam generowanie")
+        return True
+
+    cmd = f'java -jar {ANTLR_JAR} {ANTLR_OPTIONS} -o {output_folder} {grammar_path}'
+    print(f"[1...] Building grammar (cache miss, {digest[:12]}):", cmd)
     result = subprocess.run(cmd, shell=True)
     if result.returncode != 0:
         print("Błąd podczas budowania gramatyki")
         sys.exit(1)
+    with open(os.path.join(output_folder, GRAMMAR_STAMP), "w", encoding="utf-8") as f:
+        f.write(digest + "\n")
     print("[1+++] Gramatyka zbudowana poprawnie, wyniki w folderze:", output_folder)
+    return False
 
-def run_main(source_path):
+def run_main(source_path, main_flags=()):
     out_folder = "Output"
     main_script = "Main/main.py"  # Ścieżka do main.py w folderze Main
     if not os.path.exists(out_folder):
         os.makedirs(out_folder)
     output_ll = os.path.join(out_folder, "program.ll")  # Zapisz wynikowy plik .ll do Output
 
-    cmd = ["python", main_script, source_path, output_ll]
+    cmd = ["python", main_script, source_path, output_ll, *main_flags]
     print("[2...] Running main:", " ".join(cmd))
     result = subprocess.run(cmd)
     if result.returncode != 0:
@@ -30,11 +69,62 @@ def run_main(source_path):
         sys.exit(1)
     print("[2+++] main.py uruchomiony poprawnie, LLVM IR zapisany w folderze:", out_folder)
 
-def run_clang():
+def run_main_jit(source_path, main_flags=()):
+    """Generuje IR i od razu wykonuje go w pamięci (main.py --jit) – bez plików i clanga."""
+    cmd = ["python", "Main/main.py", source_path, *main_flags, "--jit"]
+    print("[2...] Running main (JIT):", " ".join(cmd))
+    result = subprocess.run(cmd)
+    sys.exit(result.returncode)
+
+def run_main_server(source_path, socket_path):
+    """Zleca kompilację działającemu serwerowi (Main/server.py) zamiast uruchamiać nowy proces."""
+    out_folder = "Output"
+    output_ll = os.path.join(out_folder, "program.ll")
+    request = {"source": os.path.abspath(source_path), "output": os.path.abspath(output_ll)}
+    print("[2...] Sending to compile server:", socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with conn.makefile("r", encoding="utf-8") as reader:
+            response = json.loads(reader.readline())
+    if response["log"]:
+        print(response["log"], end="")
+    if not response["ok"]:
+        print("[2---] Błąd kompilacji na serwerze:")
+        for ln, col, msg in response["errors"]:
+            print(f"   line {ln}:{col}  {msg}")
+        sys.exit(1)
+    print("[2+++] Serwer skompilował program, LLVM IR zapisany w folderze:", out_folder)
+
+OPT_LEVELS = ("0", "1", "2", "3", "s")
+
+def clang_command(ll_file, exe_file, opt_level="0"):
+    return ["clang", f"-O{opt_level}", ll_file, "-o", exe_file, "-llegacy_stdio_definitions"]
+
+def opt_command(ll_file, opt_ll_file, passes):
+    return ["opt", "-S", f"-passes={passes}", ll_file, "-o", opt_ll_file]
+
+def optimized_path(ll_file):
+    # Output/program.ll → Output/program.opt.ll (oryginał zostaje obok)
+    root, ext = os.path.splitext(ll_file)
+    return f"{root}.opt{ext}"
+
+def run_opt(passes, ll_file=os.path.join("Output", "program.ll")):
+    """Przepuszcza program.ll przez potok przebiegów `opt`; zwraca ścieżkę zoptymalizowanego IR."""
+    opt_ll_file = optimized_path(ll_file)
+    cmd = opt_command(ll_file, opt_ll_file, passes)
+    print("[3o..] Running opt:", " ".join(cmd))
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        print("Błąd podczas optymalizacji (opt)")
+        sys.exit(1)
+    print("[3o++] Zoptymalizowany IR zapisany w:", opt_ll_file)
+    return opt_ll_file
+
+def run_clang(opt_level="0", ll_file=os.path.join("Output", "program.ll")):
     out_folder = "Output"
-    ll_file = os.path.join(out_folder, "program.ll")
     exe_file = os.path.join(out_folder, "program.exe")
-    cmd = ["clang ", ll_file, "-o", exe_file, "-llegacy_stdio_definitions"]
+    cmd = clang_command(ll_file, exe_file, opt_level)
     print("[3...] Running clang:", " ".join(cmd))
     result = subprocess.run(cmd)
     if result.returncode != 0:
@@ -42,13 +132,459 @@ def run_clang():
         sys.exit(1)
     print("[3+++] Clang zakończył działanie poprawnie, wygenerowany program:", exe_file)
 
+# region Separate compilation
+
+MODULES_DIR = os.path.join("Output", "modules")
+
+def clang_object_command(ll_file, obj_file, opt_level="0"):
+    return ["clang", "-c", f"-O{opt_level}", ll_file, "-o", obj_file]
+
+def link_command(obj_files, exe_file):
+    return ["clang", *obj_files, "-o", exe_file, "-llegacy_stdio_definitions"]
+
+def object_key(ll_file, opt_level, passes):
+    """Skrót .ll + ustawień optymalizacji – zapisywany obok obiektu jako <moduł>.o.key."""
+    digest = hashlib.sha256()
+    with open(ll_file, "rb") as f:
+        digest.update(f.read())
+    digest.update(f"\0-O{opt_level}\0{passes or ''}".encode("utf-8"))
+    return digest.hexdigest()
+
+def compile_module(ll_file, opt_level="0", passes=None):
+    """
+    opt (opcjonalnie) + clang -c dla jednego modułu. Zwraca (obiekt, skompilowany?, błąd).
+    Obiekt, którego klucz zgadza się z aktualnym .ll, jest używany bez kompilacji.
+    """
+    root, _ = os.path.splitext(ll_file)
+    obj_file = root + ".o"
+    key = object_key(ll_file, opt_level, passes)
+    try:
+        with open(obj_file + ".key", encoding="utf-8") as f:
+            if f.read() == key and os.path.exists(obj_file):
+                return obj_file, False, None
+    except OSError:
+        pass
+
+    source = ll_file
+    if passes:
+        source = optimized_path(ll_file)
+        result = subprocess.run(opt_command(ll_file, source, passes), capture_output=True, text=True)
+        if result.returncode != 0:
+            return obj_file, True, f"opt: {result.stderr.strip()}"
+    result = subprocess.run(clang_object_command(source, obj_file, opt_level), capture_output=True, text=True)
+    if result.returncode != 0:
+        return obj_file, True, f"clang: {result.stderr.strip()}"
+    with open(obj_file + ".key", "w", encoding="utf-8") as f:
+        f.write(key)
+    return obj_file, True, None
+
+def run_separate(source_path, main_flags=(), opt_level="0", passes=None, jobs=None, timer=None):
+    """
+    Kompilacja rozdzielna: main.py zapisuje osobny .ll dla każdego modułu, moduły są
+    kompilowane do .o równolegle (tylko zmienione), a na końcu jest jeden link.
+    """
+    run_main(source_path, [*main_flags, "--separate", MODULES_DIR])
+    with open(os.path.join(MODULES_DIR, "modules.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    with timer.phase("opt + clang -c (moduły)"):
+        print(f"[3...] Kompilacja modułów ({len(manifest)}) do plików .o")
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            results = list(pool.map(lambda entry: compile_module(entry["ll"], opt_level, passes), manifest))
+    failed = False
+    for entry, (obj_file, rebuilt, error) in zip(manifest, results):
+        if error:
+            failed = True
+            print(f"[3---] {entry['module']}: {error}")
+        else:
+            print(f"[3{'+++' if rebuilt else '==='}] {entry['module']}: "
+                  f"{'skompilowany' if rebuilt else 'bez zmian'} → {obj_file}")
+    if failed:
+        print("Błąd podczas kompilacji modułów")
+        sys.exit(1)
+
+    exe_file = os.path.join("Output", "program.exe")
+    cmd = link_command([obj_file for obj_file, _, _ in results], exe_file)
+    with timer.phase("link"):
+        print("[3...] Linking:", " ".join(cmd))
+        result = subprocess.run(cmd)
+    if result.returncode != 0:
+        print("Błąd podczas linkowania")
+        sys.exit(1)
+    print("[3+++] Program zlinkowany:", exe_file)
+
+# endregion
+
+def open_artifact_cache(max_mb=512):
+    main_dir = os.path.abspath("Main")
+    if main_dir not in sys.path:
+        sys.path.insert(0, main_dir)
+    from ArtifactCache import ArtifactCache
+    return ArtifactCache(max_bytes=max_mb * 1024 * 1024)
+
+def open_phase_timer(enabled):
+    main_dir = os.path.abspath("Main")
+    if main_dir not in sys.path:
+        sys.path.insert(0, main_dir)
+    from PhaseTimer import PhaseTimer
+    # peak RSS procesów potomnych: main.py, opt, clang
+    return PhaseTimer(enabled=enabled, children=True)
+
+def exe_cache_flags(opt_level, passes):
+    return ("exe", opt_level, passes or "")
+
+def cached_paths(out_dir, passes):
+    paths = [os.path.join(out_dir, "program.ll"), os.path.join(out_dir, "program.exe")]
+    if passes:
+        paths.append(optimized_path(paths[0]))
+    return paths
+
+def print_cache_stats(cache):
+    st = cache.stats()
+    print("[C...] Cache artefaktów:", cache.cache_dir)
+    print(f"   trafienia:    {st['hits']}")
+    print(f"   chybienia:    {st['misses']}")
+    print(f"   hit rate:     {st['hit_rate']:.1%}")
+    print(f"   zaoszczędzone bajty: {st['bytes_saved']}")
+    print(f"   wpisy:        {st['entries']} ({st['bytes_stored']} / {st['max_bytes']} B)")
+
+def artifact_dir(source_path, out_root="Output"):
+    # a.jd i a.js, x/a.jd i y/a.jd, a.b.jd i a_b.jd muszą trafić do różnych katalogów
+    stem = os.path.basename(source_path).replace(".", "_")
+    path_hash = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:8]
+    return os.path.join(out_root, f"{stem}_{path_hash}")
+
+def compile_worker(source_path, out_dir, opt_level="0", passes=None, cache_mb=None):
+    """Pełna kompilacja jednego pliku w procesie roboczym: parse → LLVMActions → clang."""
+    main_dir = os.path.abspath("Main")
+    if main_dir not in sys.path:
+        sys.path.insert(0, main_dir)
+    from server import compile_request
+
+    start = time.perf_counter()
+    ll_file = os.path.join(out_dir, "program.ll")
+    exe_file = os.path.join(out_dir, "program.exe")
+    result = {"source": source_path, "output": out_dir, "ok": False, "stage": "compile", "message": ""}
+
+    cache = open_artifact_cache(cache_mb) if cache_mb else None
+    if cache is not None:
+        key = cache.key(source_path, exe_cache_flags(opt_level, passes))
+        if cache.lookup(key, out_dir):
+            result.update(ok=True, stage="cached", seconds=time.perf_counter() - start)
+            return result
+
+    # już jesteśmy w procesie roboczym – importy parsujemy sekwencyjnie
+    response = compile_request({"source": source_path, "output": ll_file, "jobs": 1})
+    if not response["ok"]:
+        errors = [f"line {ln}:{col}  {msg}" for ln, col, msg in response["errors"]]
+        log_tail = response["log"].strip().splitlines()[-1:]
+        result["message"] = "; ".join(errors + log_tail)
+    else:
+        stage, message = run_native_commands(ll_file, exe_file, opt_level, passes)
+        result["stage"] = stage
+        if message is not None:
+            result["message"] = message
+        else:
+            result["ok"] = True
+            if cache is not None:
+                cache.store(key, cached_paths(out_dir, passes))
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def native_commands(ll_file, exe_file, opt_level="0", passes=None):
+    """Kroki (etap, polecenie) z .ll do programu: opcjonalnie opt, potem clang."""
+    commands = []
+    if passes:
+        commands.append(("opt", opt_command(ll_file, optimized_path(ll_file), passes)))
+        ll_file = optimized_path(ll_file)
+    commands.append(("clang", clang_command(ll_file, exe_file, opt_level)))
+    return commands
+
+def run_native_commands(ll_file, exe_file, opt_level="0", passes=None):
+    """Uruchamia native_commands bez kończenia procesu; zwraca (etap, None) albo (etap, komunikat błędu)."""
+    stage = "clang"
+    for stage, cmd in native_commands(ll_file, exe_file, opt_level, passes):
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+        except FileNotFoundError:
+            return stage, f"{stage} not found"
+        if proc.returncode != 0:
+            return stage, proc.stderr.strip().splitlines()[0] if proc.stderr.strip() else ""
+    return "done", None
+
+def run_batch(sources, jobs=None, opt_level="0", passes=None, cache_mb=None):
+    """Kompiluje wiele plików równolegle; każdy dostaje własny katalog w Output/."""
+    print(f"[B...] Batch: {len(sources)} plików, procesy robocze: {jobs or os.cpu_count()}")
+    out_dirs = [artifact_dir(src) for src in sources]
+    # ten sam plik podany dwa razy – dwa procesy pisałyby do jednego katalogu
+    seen = {}
+    for src, out_dir in zip(sources, out_dirs):
+        if out_dir in seen:
+            print(f"[B---] {src} i {seen[out_dir]} to ten sam plik – podaj go raz")
+            sys.exit(1)
+        seen[out_dir] = src
+    for out_dir in out_dirs:
+        os.makedirs(out_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        n = len(sources)
+        results = list(pool.map(compile_worker, sources, out_dirs,
+                                [opt_level] * n, [passes] * n, [cache_mb] * n))
+
+    for r in results:
+        status = "OK " if r["ok"] else "ERR"
+        line = f"  [{status}] {r['source']:<40} {r['seconds']:6.2f}s  {r['output']}"
+        if not r["ok"]:
+            line += f"  ({r['stage']}: {r['message']})"
+        print(line)
+    failed = sum(1 for r in results if not r["ok"])
+    print(f"[B+++] Batch zakończony: {len(results) - failed} ok, {failed} błędów")
+    return results
+
+# region Watch mode
+
+def file_signatures(paths):
+    """(mtime, rozmiar) każdego pliku – tani test przed liczeniem skrótów."""
+    signatures = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signatures[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signatures[path] = None
+    return signatures
+
+def display_path(path):
+    relative = os.path.relpath(path)
+    return path if relative.startswith("..") else relative
+
+def file_digests(paths):
+    digests = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                digests[path] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            digests[path] = None
+    return digests
+
+def watch_build(source_path, opt_level="0", passes=None, jit=False, jobs=None):
+    """
+    Jedna przebudowa w bieżącym procesie (parser i cache modułów pozostają rozgrzane).
+    Zwraca (IR albo ścieżka programu, czasy etapów) – None zamiast wyniku przy błędzie.
+    """
+    from server import compile_request
+    times = {}
+    out_dir = "Output"
+    ll_file = os.path.join(out_dir, "program.ll")
+    exe_file = os.path.join(out_dir, "program.exe")
+
+    start = time.perf_counter()
+    response = compile_request({"source": source_path, "output": ll_file, "jobs": jobs, "return_ir": jit})
+    times["frontend"] = time.perf_counter() - start
+    if not response["ok"]:
+        print("[W---] Błąd kompilacji:")
+        for ln, col, msg in response["errors"]:
+            print(f"   line {ln}:{col}  {msg}")
+        for line in response["log"].strip().splitlines()[-3:]:
+            print(f"   {line}")
+        return None, times
+    if jit:
+        return response["ir"], times
+
+    start = time.perf_counter()
+    stage, message = run_native_commands(ll_file, exe_file, opt_level, passes)
+    times["opt + clang"] = time.perf_counter() - start
+    if message is not None:
+        print(f"[W---] Błąd etapu {stage}: {message}")
+        return None, times
+    return exe_file, times
+
+def watch_run(result, jit=False):
+    if jit:
+        from jit import run_jit
+        try:
+            exit_code = run_jit(result)
+        except SystemExit as e:
+            exit_code = e.code
+    else:
+        exit_code = subprocess.run(os.path.abspath(result)).returncode
+    if exit_code:
+        print(f"[W...] Program zakończył się kodem {exit_code}")
+
+def run_watch(source_path, opt_level="0", passes=None, jit=False, jobs=None, interval=0.3):
+    """
+    --watch: odpytuje źródło i jego importy co `interval` s. Zmiana mtime/rozmiaru
+    powoduje policzenie skrótów treści; przebudowa następuje tylko, gdy któryś się
+    zmienił (zapis bez zmian albo `touch` jej nie wywołują). Po udanej przebudowie
+    program jest uruchamiany ponownie. Ctrl+C kończy tryb.
+    """
+    main_dir = os.path.abspath("Main")
+    if main_dir not in sys.path:
+        sys.path.insert(0, main_dir)
+    from ArtifactCache import source_closure
+
+    print(f"[W...] Obserwuję {source_path} i jego importy (Ctrl+C kończy)")
+    built_digests = None
+    signatures = {}
+    try:
+        while True:
+            paths = source_closure(source_path)
+            current = file_signatures(paths)
+            if current != signatures:
+                signatures = current
+                digests = file_digests(paths)
+                if digests != built_digests:
+                    changed = [display_path(p) for p in paths
+                               if built_digests is None or built_digests.get(p) != digests[p]]
+                    print(f"[W...] Przebudowa ({', '.join(changed)})")
+                    start = time.perf_counter()
+                    result, times = watch_build(source_path, opt_level, passes, jit, jobs)
+                    latency = time.perf_counter() - start
+                    stages = ", ".join(f"{name} {t * 1000:.0f} ms" for name, t in times.items())
+                    status = "+++" if result is not None else "---"
+                    print(f"[W{status}] Przebudowa: {latency * 1000:.0f} ms ({stages})")
+                    # po błędzie czekamy na kolejną zmianę, a nie ponawiamy w kółko
+                    built_digests = digests
+                    if result is not None:
+                        watch_run(result, jit)
+                        sys.stdout.flush()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n[W...] Koniec trybu --watch")
+
+# endregion
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="MyLang build driver")
+    arg_parser.add_argument("source", nargs="*")
+    arg_parser.add_argument("--batch", action="store_true",
+                            help="kompiluj wszystkie podane pliki równolegle do Output/<plik>/")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="liczba procesów roboczych w trybie --batch / --separate")
+    arg_parser.add_argument("--server", metavar="SOCKET",
+                            help="kompiluj przez działający Main/server.py zamiast nowego procesu")
+    arg_parser.add_argument("-O", dest="opt_level", choices=OPT_LEVELS, default="0",
+                            help="poziom optymalizacji clanga: -O0 .. -O3, -Os")
+    arg_parser.add_argument("--passes", metavar="PIPELINE",
+                            help="potok przebiegów opt uruchamiany na program.ll, np. 'mem2reg,instcombine' "
+                                 "lub 'default<O2>'; wynik zapisywany jako program.opt.ll")
+    arg_parser.add_argument("--cache", action="store_true",
+                            help="używaj cache artefaktów (Cache/artifacts) dla .ll i program.exe")
+    arg_parser.add_argument("--cache-size", type=int, default=512, metavar="MB",
+                            help="limit rozmiaru cache artefaktów (LRU), domyślnie 512 MB")
+    arg_parser.add_argument("--cache-stats", action="store_true",
+                            help="pokaż statystyki cache artefaktów i zakończ")
+    arg_parser.add_argument("--dump-tree", action="store_true",
+                            help="narysuj drzewo parsowania (Output/Source.pdf)")
+    arg_parser.add_argument("--print-ir", action="store_true",
+                            help="wypisz wygenerowany LLVM IR")
+    arg_parser.add_argument("--jit", action="store_true",
+                            help="wykonaj program w pamięci przez llvmlite zamiast clang + program.exe")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="używaj cache IR dla niezmienionych funkcji, struktur i klas (Cache/ir)")
+    arg_parser.add_argument("--time-report", nargs="?", const="table", choices=("table", "json"),
+                            help="czas i szczytowa pamięć każdej fazy (gramatyka, lex, parse, codegen, "
+                                 "emit, opt, clang) jako tabela albo JSON")
+    arg_parser.add_argument("--profile", nargs="?", const="self", choices=("self", "cum", "calls"),
+                            help="profil metod visitX i emiterów LLVMGenerator (przekazywane do main.py)")
+    arg_parser.add_argument("--profile-folded", metavar="PATH",
+                            help="zapisz profil jako folded stacks do flamegraphu")
+    arg_parser.add_argument("--watch", action="store_true",
+                            help="obserwuj źródło i importy; po zmianie treści przebuduj w tym samym "
+                                 "procesie i uruchom program ponownie")
+    arg_parser.add_argument("--watch-interval", type=float, default=0.3, metavar="S",
+                            help="odstęp odpytywania plików w trybie --watch (sekundy)")
+    arg_parser.add_argument("--separate", action="store_true",
+                            help="kompilacja rozdzielna: osobny .o dla każdego modułu (Output/modules), "
+                                 "równoległy clang -c, ponowna kompilacja tylko zmienionych, jeden link")
+    args = arg_parser.parse_args()
+
+    if args.cache_stats:
+        print_cache_stats(open_artifact_cache(args.cache_size))
+        sys.exit(0)
+    if not args.source:
+        arg_parser.error("brak pliku źródłowego")
+    if args.separate and (args.batch or args.jit or args.server or args.cache):
+        arg_parser.error("--separate nie łączy się z --batch, --jit, --server ani --cache")
+    if args.watch and (args.batch or args.server or args.cache or args.separate):
+        arg_parser.error("--watch nie łączy się z --batch, --server, --cache ani --separate")
+
+    main_flags = []
+    if args.dump_tree:
+        main_flags.append("--dump-tree")
+    if args.print_ir:
+        main_flags.append("--print-ir")
+    if args.incremental:
+        main_flags.append("--incremental")
+    if args.profile:
+        main_flags += ["--profile", args.profile]
+    if args.profile_folded:
+        main_flags += ["--profile-folded", args.profile_folded]
+
+    # w trybie JIT nie ma opt/clanga – raport wypisuje sam main.py
+    timer = open_phase_timer(args.time_report is not None and not (args.batch or args.jit))
+    report_file = os.path.join("Output", "time_report.json")
+    if timer.enabled:
+        os.makedirs("Output", exist_ok=True)
+        main_flags += ["--time-report-file", report_file]
+    elif args.jit and args.time_report:
+        main_flags += ["--time-report", args.time_report]
+
     grammar_file = "Grammar/MyLang.g4"
-    source_file = sys.argv[1]
-    
-    build_grammar(grammar_file)
-    run_main(source_file)
-    run_clang()
-    
+    with timer.phase("grammar"):
+        build_grammar(grammar_file)
+
+    if args.batch:
+        results = run_batch(args.source, args.jobs, args.opt_level, args.passes,
+                            args.cache_size if args.cache else None)
+        sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+    if len(args.source) != 1:
+        arg_parser.error("wiele plików źródłowych wymaga --batch")
+    source_file = args.source[0]
+
+    if args.watch:
+        run_watch(source_file, args.opt_level, args.passes, args.jit, args.jobs, args.watch_interval)
+        sys.exit(0)
+    if args.jit:
+        run_main_jit(source_file, main_flags)
+    if args.separate:
+        with timer.phase("main.py"):
+            run_separate(source_file, main_flags, args.opt_level, args.passes, args.jobs, timer)
+            timer.merge(report_file, "main.py/")
+        if timer.enabled:
+            print("[T...] Raport czasów kompilacji:")
+            timer.report(args.time_report)
+        sys.exit(subprocess.run("Output/program.exe").returncode)
+    cache = open_artifact_cache(args.cache_size) if args.cache else None
+    with timer.phase("cache lookup"):
+        if cache is not None:
+            cache_key = cache.key(source_file, exe_cache_flags(args.opt_level, args.passes))
+        cache_hit = cache is not None and cache.lookup(cache_key, "Output")
+    if cache_hit:
+        print("[C===] Artefakty z cache (hit), pomijam kompilację:", cache_key[:12])
+    else:
+        with timer.phase("main.py"):
+            if args.server:
+                run_main_server(source_file, args.server)
+            else:
+                run_main(source_file, main_flags)
+                # fazy zmierzone wewnątrz main.py; "main.py" zostaje z narzutem procesu
+                timer.merge(report_file, "main.py/")
+        ll_file = os.path.join("Output", "program.ll")
+        if args.passes:
+            with timer.phase("opt"):
+                ll_file = run_opt(args.passes, ll_file)
+        with timer.phase("clang (kompilacja + link)"):
+            run_clang(args.opt_level, ll_file)
+        if cache is not None:
+            with timer.phase("cache store"):
+                cache.store(cache_key, cached_paths("Output", args.passes))
+    if timer.enabled:
+        print("[T...] Raport czasów kompilacji:")
+        timer.report(args.time_report)
+
     result = subprocess.run("Output/program.exe")
     